@@ -1,317 +1,264 @@
-import streamlit as st
-import pandas as pd
-from database import get_connection, create_tables
-import matplotlib.pyplot as plt
-import os
-
-# DB Setup - Only create tables if database file doesn't exist
-if "db_initialized" not in st.session_state:
-    if not os.path.exists("food_waste.db"):
-        create_tables()
-    st.session_state["db_initialized"] = True
-
-
-st.set_page_config(page_title="Local Food Wastage Management System", layout="wide")
-st.title("🍛 Local Food Wastage Management System")
-
-
-
-
-
-# DB Setup
-if "db_initialized" not in st.session_state:
-    create_tables()
-    st.session_state["db_initialized"] = True
-
-# Sidebar
-option = st.sidebar.selectbox(
-    "📌 Select Section",
-    [
-        "🏠 Home",
-        "📝 Donor Register",
-        "📋 View Donors",
-        "🎯 Receiver Register",
-        "🍽️ Add Food Listing",
-        "🔍 Filter/Search",
-        "📊 SQL Query Analysis",
-        "📈 Visual Analytics",
-        "📞 Contact"
-    ]
-)
-
-# Footer
-
-
-
-if option == "🏠 Home":
-    
-    st.write("""
-     * This platform helps reduce food wastage by connecting providers like restaurants, households, etc.
-    with receivers like NGOs or individuals in need.
-    """)
-    
-    st.markdown("""
-    ⭐ This system helps connect food providers with those in need.  
-    ⭐ 🔹 Filter donations  
-    ⭐ 🔹 Analyze food trends  
-    ⭐ 🔹 Reduce food waste  
-    ⭐ 🔹 Register Donors and Receivers  
-    ⭐ 🔹 Add and Track Food Listings  
-    ⭐ 🔹 Visualize Data Insights  
-    ⭐ 🔹 Run SQL Queries for Advanced Analysis  
-    ⭐ 🔹 Contact Providers directly  
-    """)
-    
-    st.markdown("---\n📘 Made with ❤️ by **Youraj Kumar (IIT Patna)**")
-
-# 📝 Donor Register Form
-if option == "📝 Donor Register":
-    st.subheader("📝 Register a Food Donor")
-    with st.form("donor_form"):
-        name = st.text_input("Name")
-        donor_type = st.selectbox("Type", ["Restaurant", "Household", "Business", "Other"])
-        address = st.text_input("Address")
-        city = st.text_input("City")
-        contact = st.text_input("Contact")
-        submitted = st.form_submit_button("Register")
-    if submitted:
-        conn = get_connection()
-        conn.execute(
-            "INSERT INTO Providers (Name, Type, Address, City, Contact) VALUES (?, ?, ?, ?, ?)",
-            (name, donor_type, address, city, contact),
-        )
-        conn.commit()
-        conn.close()
-        st.success("Donor registered successfully!")
-        
-        
-# View donors       
-elif option == "📋 View Donors":
-    st.subheader("📋 Registered Food Donors")
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM Providers", conn)
-    conn.close()
-    
-    if not df.empty:
-        st.dataframe(df)
-        st.success(f"{len(df)} donors found.")
-    else:
-        st.warning("No donor data found.")
-      
-
-
-# 🎯 Receiver Register Form
-if option == "🎯 Receiver Register":
-    st.subheader("🎯 Register a Food Receiver")
-    with st.form("receiver_form"):
-        name = st.text_input("Name")
-        receiver_type = st.selectbox("Type", ["NGO", "Individual", "Community", "Other"])
-        city = st.text_input("City")
-        contact = st.text_input("Contact")
-        submitted = st.form_submit_button("Register")
-    if submitted:
-        conn = get_connection()
-        conn.execute(
-            "INSERT INTO Receivers (Name, Type, City, Contact) VALUES (?, ?, ?, ?)",
-            (name, receiver_type, city, contact),
-        )
-        conn.commit()
-        conn.close()
-        st.success("Receiver registered successfully!")
-
-# 🍽️ Add Food Listing
-if option == "🍽️ Add Food Listing":
-    st.subheader("🍽️ Add Food Listing")
-    conn = get_connection()
-    providers_df = pd.read_sql("SELECT Provider_ID, Name FROM Providers", conn)
-    conn.close()
-    if not providers_df.empty:
-        with st.form("add_food_form"):
-            food_name = st.text_input("Food Name")
-            quantity = st.number_input("Quantity (in units)", min_value=1)
-            expiry_date = st.date_input("Expiry Date")
-            provider = st.selectbox("Provider", providers_df["Name"])
-            provider_id = providers_df[providers_df["Name"] == provider]["Provider_ID"].values[0]
-            provider_type = st.text_input("Provider Type")
-            location = st.text_input("Location")
-            food_type = st.selectbox("Food Type", ["Veg", "Non-Veg"])
-            meal_type = st.selectbox("Meal Type", ["Breakfast", "Lunch", "Dinner", "Snack", "Other"])
-            submitted = st.form_submit_button("Add Food")
-        if submitted:
-            conn = get_connection()
-            conn.execute(
-                "INSERT INTO Food_Listings (Food_Name, Quantity, Expiry_Date, Provider_ID, Provider_Type, Location, Food_Type, Meal_Type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (food_name, quantity, expiry_date.strftime("%Y-%m-%d"), provider_id, provider_type, location, food_type, meal_type),
-            )
-            conn.commit()
-            conn.close()
-            st.success("Food listing added successfully!")
-    else:
-        st.warning("Please add a Donor first.")
-
-# 🔍 Filter/Search Food
-if option == "🔍 Filter/Search":
-    st.subheader("🔍 Filter/Search Food Listings")
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM Food_Listings", conn)
-    conn.close()
-    search = st.text_input("Search by Food Name, Location or Provider Type")
-    if search.strip() != "":
-        df = df[
-            df["Food_Name"].str.contains(search, case=False) |
-            df["Location"].str.contains(search, case=False) |
-            df["Provider_Type"].str.contains(search, case=False)
-        ]
-    st.dataframe(df)
-    st.success(f"{len(df)} results found." if not df.empty else "No results found.")
-
-# 📊 SQL Query Analysis
-if option == "📊 SQL Query Analysis":
-    st.subheader("📊 SQL Query Analysis")
-
-    query_map = {
-        "1. Providers and Receivers count per city": """
-            SELECT City, COUNT(DISTINCT Provider_ID) AS Providers, COUNT(DISTINCT Receiver_ID) AS Receivers
-            FROM Providers LEFT JOIN Receivers USING(City)
-            GROUP BY City
-        """,
-        "2. Provider type contributing most food": """
-            SELECT Provider_Type, COUNT(*) AS Total_Listings
-            FROM Food_Listings
-            GROUP BY Provider_Type
-            ORDER BY Total_Listings DESC
-            LIMIT 1
-        """,
-        "3. Cities with most food listings": """
-            SELECT Location AS City, COUNT(*) AS Total_Listings
-            FROM Food_Listings
-            GROUP BY Location
-            ORDER BY Total_Listings DESC
-            LIMIT 5
-        """,
-        "4. Most common meal type": """
-            SELECT Meal_Type, COUNT(*) AS Count
-            FROM Food_Listings
-            GROUP BY Meal_Type
-            ORDER BY Count DESC
-            LIMIT 1
-        """,
-        "5. Top 5 most listed food items": """
-            SELECT Food_Name, COUNT(*) AS Times_Listed
-            FROM Food_Listings
-            GROUP BY Food_Name
-            ORDER BY Times_Listed DESC
-            LIMIT 5
-        """,
-        "6. Number of food claims per receiver": """
-            SELECT r.Name, COUNT(c.Claim_ID) AS Claims_Made
-            FROM Receivers r
-            LEFT JOIN Claims c ON r.Receiver_ID = c.Receiver_ID
-            GROUP BY r.Name
-            ORDER BY Claims_Made DESC
-        """,
-        "7. Unclaimed food items": """
-            SELECT f.Food_ID, f.Food_Name, f.Quantity, f.Expiry_Date
-            FROM Food_Listings f
-            LEFT JOIN Claims c ON f.Food_ID = c.Food_ID
-            WHERE c.Claim_ID IS NULL
-        """,
-        "8. Providers who contributed most": """
-            SELECT p.Name, COUNT(f.Food_ID) AS Foods_Provided
-            FROM Providers p
-            LEFT JOIN Food_Listings f ON p.Provider_ID = f.Provider_ID
-            GROUP BY p.Name
-            ORDER BY Foods_Provided DESC
-            LIMIT 5
-        """,
-        "9. List all expired food items": """
-            SELECT Food_Name, Expiry_Date
-            FROM Food_Listings
-            WHERE date(Expiry_Date) < date('now')
-        """,
-        "10. Food type (Veg/Non-Veg) summary": """
-            SELECT Food_Type, COUNT(*) AS Count
-            FROM Food_Listings
-            GROUP BY Food_Type
-        """,
-        "11. Meal distribution by city": """
-            SELECT Location AS City, Meal_Type, COUNT(*) AS Count
-            FROM Food_Listings
-            GROUP BY Location, Meal_Type
-            ORDER BY City
-        """,
-        "12. Receivers who claimed most Non-Veg food": """
-            SELECT r.Name, COUNT(c.Claim_ID) AS NonVeg_Claims
-            FROM Claims c
-            JOIN Receivers r ON c.Receiver_ID = r.Receiver_ID
-            JOIN Food_Listings f ON c.Food_ID = f.Food_ID
-            WHERE f.Food_Type = 'Non-Veg'
-            GROUP BY r.Name
-            ORDER BY NonVeg_Claims DESC
-            LIMIT 5
-        """,
-        "13. Datewise total food claims": """
-            SELECT Claim_Date, COUNT(*) AS Total_Claims
-            FROM Claims
-            GROUP BY Claim_Date
-            ORDER BY Claim_Date DESC
-        """,
-        "14. Provider-Receiver city wise mapping": """
-            SELECT p.City AS Provider_City, r.City AS Receiver_City, COUNT(*) AS Total_Transactions
-            FROM Claims c
-            JOIN Food_Listings f ON c.Food_ID = f.Food_ID
-            JOIN Providers p ON f.Provider_ID = p.Provider_ID
-            JOIN Receivers r ON c.Receiver_ID = r.Receiver_ID
-            GROUP BY Provider_City, Receiver_City
-            ORDER BY Total_Transactions DESC
-        """,
-        "15. Food claims status summary": """
-            SELECT Status, COUNT(*) AS Count
-            FROM Claims
-            GROUP BY Status
-        """
-    }
-
-    selected_query = st.selectbox("Select a query to run:", list(query_map.keys()))
-    conn = get_connection()
-    result_df = pd.read_sql(query_map[selected_query], conn)
-    conn.close()
-    st.dataframe(result_df)
-    st.success(f"Query executed: {selected_query}")
-
-# 📈 Visual Analytics
-if option == "📈 Visual Analytics":
-    st.subheader("📈 Visual Analytics")
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM Food_Listings", conn)
-    conn.close()
-    if not df.empty:
-        # 1. Food Type Pie Chart
-        food_type_count = df["Food_Type"].value_counts()
-        fig1, ax1 = plt.subplots()
-        ax1.pie(food_type_count, labels=food_type_count.index, autopct='%1.1f%%', startangle=90)
-        ax1.set_title("Food Type Distribution")
-        st.pyplot(fig1)
-        # 2. Meal Type Bar Chart
-        meal_count = df["Meal_Type"].value_counts()
-        fig2, ax2 = plt.subplots()
-        ax2.bar(meal_count.index, meal_count.values)
-        ax2.set_title("Meal Type Count")
-        st.pyplot(fig2)
-    else:
-        st.warning("No Food Listings data available for analytics.")
-
-# 📞 Contact Section
-if option == "📞 Contact":
-    st.subheader("📞 Contact Food Providers")
-    conn = get_connection()
-    query = "SELECT Provider_ID, Name, Type, City, Contact FROM Providers"
-    df = pd.read_sql(query, conn)
-    conn.close()
-    search = st.text_input("🔎 Search by City or Name")
-    if search.strip() != "":
-        df = df[df["City"].str.contains(search, case=False) | df["Name"].str.contains(search, case=False)]
-    if not df.empty:
-        st.dataframe(df)
-        st.success(f"{len(df)} providers found.")
-    else:
\ No newline at end of file
+import streamlit as st
+import pandas as pd
+from database import get_connection, create_tables
+from query_builder import PAGE_SIZE, fetch_listings_page, fetch_page, like_pattern, page_count
+from search_index import create_search_index, search_listings, search_providers
+from geo import city_point, providers_near_city
+from versions import bump_version, db_version
+from charts import CHART_TITLES, chart_data, render_chart
+from profiling import SLOW_QUERY_MS, profile_frame, profile_summary
+from query_catalog import ENTRY_POINTS, entry_queries, supported_filters
+from bulk_import import CLAIM_STATUSES
+import os
+
+# DB Setup - create_tables is idempotent, so existing databases also get
+# the side tables (expiry, R*Tree) the queries below read
+if "db_initialized" not in st.session_state:
+    create_tables()
+    # FTS5 search index (False when this SQLite has no FTS5 -> LIKE search)
+    conn = get_connection()
+    st.session_state["fts_enabled"] = create_search_index(conn)
+    conn.close()
+    st.session_state["db_initialized"] = True
+
+
+st.set_page_config(page_title="Local Food Wastage Management System", layout="wide")
+st.title("🍛 Local Food Wastage Management System")
+
+# Sidebar
+option = st.sidebar.selectbox(
+    "📌 Select Section",
+    [
+        "🏠 Home",
+        "📝 Donor Register",
+        "📋 View Donors",
+        "🎯 Receiver Register",
+        "🍽️ Add Food Listing",
+        "🔍 Filter/Search",
+        "📊 SQL Query Analysis",
+        "📈 Visual Analytics",
+        "📞 Contact",
+        "🛠️ Query Profile"
+    ]
+)
+
+# Footer
+
+
+
+if option == "🏠 Home":
+    
+    st.write("""
+     * This platform helps reduce food wastage by connecting providers like restaurants, households, etc.
+    with receivers like NGOs or individuals in need.
+    """)
+    
+    st.markdown("""
+    ⭐ This system helps connect food providers with those in need.  
+    ⭐ 🔹 Filter donations  
+    ⭐ 🔹 Analyze food trends  
+    ⭐ 🔹 Reduce food waste  
+    ⭐ 🔹 Register Donors and Receivers  
+    ⭐ 🔹 Add and Track Food Listings  
+    ⭐ 🔹 Visualize Data Insights  
+    ⭐ 🔹 Run SQL Queries for Advanced Analysis  
+    ⭐ 🔹 Contact Providers directly  
+    """)
+    
+    st.markdown("---\n📘 Made with ❤️ by **Youraj Kumar (IIT Patna)**")
+
+# 📝 Donor Register Form
+if option == "📝 Donor Register":
+    st.subheader("📝 Register a Food Donor")
+    with st.form("donor_form"):
+        name = st.text_input("Name")
+        donor_type = st.selectbox("Type", ["Restaurant", "Household", "Business", "Other"])
+        address = st.text_input("Address")
+        city = st.text_input("City")
+        contact = st.text_input("Contact")
+        submitted = st.form_submit_button("Register")
+    if submitted:
+        conn = get_connection()
+        conn.execute(
+            "INSERT INTO providers (Name, Type, Address, City, Contact) VALUES (?, ?, ?, ?, ?)",
+            (name, donor_type, address, city, contact),
+        )
+        bump_version(conn, "providers")
+        conn.commit()
+        conn.close()
+        st.success("Donor registered successfully!")
+        
+        
+# View donors       
+elif option == "📋 View Donors":
+    st.subheader("📋 Registered Food Donors")
+    conn = get_connection()
+    df = pd.read_sql("SELECT * FROM providers", conn)
+    conn.close()
+    
+    if not df.empty:
+        st.dataframe(df)
+        st.success(f"{len(df)} donors found.")
+    else:
+        st.warning("No donor data found.")
+      
+
+
+# 🎯 Receiver Register Form
+if option == "🎯 Receiver Register":
+    st.subheader("🎯 Register a Food Receiver")
+    with st.form("receiver_form"):
+        name = st.text_input("Name")
+        receiver_type = st.selectbox("Type", ["NGO", "Individual", "Community", "Other"])
+        city = st.text_input("City")
+        contact = st.text_input("Contact")
+        submitted = st.form_submit_button("Register")
+    if submitted:
+        conn = get_connection()
+        conn.execute(
+            "INSERT INTO receivers (Name, Type, City, Contact) VALUES (?, ?, ?, ?)",
+            (name, receiver_type, city, contact),
+        )
+        bump_version(conn, "receivers")
+        conn.commit()
+        conn.close()
+        st.success("Receiver registered successfully!")
+
+# 🍽️ Add Food Listing
+if option == "🍽️ Add Food Listing":
+    st.subheader("🍽️ Add Food Listing")
+    conn = get_connection()
+    providers_df = pd.read_sql("SELECT Provider_ID, Name FROM providers", conn)
+    conn.close()
+    if not providers_df.empty:
+        with st.form("add_food_form"):
+            food_name = st.text_input("Food Name")
+            quantity = st.number_input("Quantity (in units)", min_value=1)
+            expiry_date = st.date_input("Expiry Date")
+            provider = st.selectbox("Provider", providers_df["Name"])
+            provider_id = providers_df[providers_df["Name"] == provider]["Provider_ID"].values[0]
+            provider_type = st.text_input("Provider Type")
+            location = st.text_input("Location")
+            food_type = st.selectbox("Food Type", ["Vegetarian", "Non-Vegetarian", "Vegan"])
+            meal_type = st.selectbox("Meal Type", ["Breakfast", "Lunch", "Dinner", "Snack", "Other"])
+            submitted = st.form_submit_button("Add Food")
+        if submitted:
+            conn = get_connection()
+            conn.execute(
+                "INSERT INTO food_listings (Food_Name, Quantity, Expiry_Date, Provider_ID, Provider_Type, Location, Food_Type, Meal_Type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (food_name, quantity, expiry_date.strftime("%Y-%m-%d"), int(provider_id), provider_type, location, food_type, meal_type),
+            )
+            bump_version(conn, "food_listings")
+            conn.commit()
+            conn.close()
+            st.success("Food listing added successfully!")
+    else:
+        st.warning("Please add a Donor first.")
+
+# 🔍 Filter/Search Food
+if option == "🔍 Filter/Search":
+    st.subheader("🔍 Filter/Search Food Listings")
+    search = st.text_input("Search by Food Name, Location or Provider Type")
+    page_no = st.number_input("Page", min_value=1, value=1)
+    # filtering and paging happen in SQL; only the visible page is loaded
+    conn = get_connection()
+    if search.strip() and st.session_state.get("fts_enabled"):
+        # ranked full-text search with prefix matching on the last word
+        df, total = search_listings(conn, search, limit=PAGE_SIZE, offset=(page_no - 1) * PAGE_SIZE)
+    else:
+        df, total = fetch_listings_page(conn, page=page_no, page_size=PAGE_SIZE, search=search)
+    conn.close()
+    st.dataframe(df)
+    st.success(f"{total} results found (page {page_no} of {page_count(total)})." if total else "No results found.")
+
+# 📊 SQL Query Analysis
+if option == "📊 SQL Query Analysis":
+    st.subheader("📊 SQL Query Analysis")
+
+    # Named queries from the shared catalog (query_catalog.py); the filters
+    # apply to the queries that support them
+    c1, c2, c3 = st.columns(3)
+    city = c1.text_input("City (optional)").strip() or None
+    status = c2.selectbox("Claim status", ["All"] + list(CLAIM_STATUSES))
+    dates = c3.date_input("Claim date range", value=())
+    queries = entry_queries(
+        "app", city=city, status=None if status == "All" else status,
+        start=dates[0] if len(dates) > 0 else None, end=dates[1] if len(dates) > 1 else None,
+    )
+    # query numbers each filter reaches; the others ignore it
+    reach = {f: ", ".join(title.split(".")[0] for title, name, _ in ENTRY_POINTS["app"]
+                          if f in supported_filters(name)) for f in ("city", "status")}
+    st.caption(f"City filters queries {reach['city']}; claim status and date range filter queries {reach['status']}.")
+
+    selected_query = st.selectbox("Select a query to run:", list(queries))
+    sql, params = queries[selected_query]
+    conn = get_connection()
+    result_df = pd.read_sql(sql, conn, params=params)
+    conn.close()
+    st.dataframe(result_df)
+    st.success(f"Query executed: {selected_query}")
+
+# 📈 Visual Analytics
+# Figures are rendered from grouped counts and cached as PNG bytes per
+# data version, so reruns without writes only re-send the images
+@st.cache_data(max_entries=32)
+def chart_png(name, version):
+    conn = get_connection()
+    data = chart_data(conn, name)
+    conn.close()
+    return render_chart(name, data)
+
+
+if option == "📈 Visual Analytics":
+    st.subheader("📈 Visual Analytics")
+    conn = get_connection()
+    version = db_version(conn)
+    conn.close()
+    images = {name: chart_png(name, version) for name in CHART_TITLES}
+    if images["food_type"] is not None:
+        for name, png in images.items():
+            if png is not None:
+                st.image(png)
+    else:
+        st.warning("No Food Listings data available for analytics.")
+
+# 📞 Contact Section
+if option == "📞 Contact":
+    st.subheader("📞 Contact Food Providers")
+    search = st.text_input("🔎 Search by City or Name")
+    radius = st.number_input("Within km of the city (0 = name / city match)", min_value=0, value=0)
+    page_no = st.number_input("Page", min_value=1, value=1)
+    offset = (page_no - 1) * PAGE_SIZE
+    conn = get_connection()
+    if search.strip() and radius > 0:
+        # R*Tree lookup around the city's centre, nearest first
+        if city_point(conn, search.strip()) is None:
+            st.info(f"No coordinates for '{search.strip()}'. Add it to city_coordinates.csv "
+                    "(City, Latitude, Longitude) in the data folder to search by distance.")
+        nearby = providers_near_city(conn, search.strip(), radius)
+        df, total = nearby.iloc[offset:offset + PAGE_SIZE], len(nearby)
+    elif search.strip() and st.session_state.get("fts_enabled"):
+        df, total = search_providers(conn, search, limit=PAGE_SIZE, offset=offset)
+    else:
+        where, params = "1", []
+        if search.strip():
+            where = "(City LIKE ? ESCAPE '\\' OR Name LIKE ? ESCAPE '\\')"
+            params = [like_pattern(search.strip())] * 2
+        df, total = fetch_page(conn, "Providers", where, params, "Provider_ID", page_no, PAGE_SIZE,
+                               columns="Provider_ID, Name, Type, City, Contact")
+    conn.close()
+    if not df.empty:
+        st.dataframe(df)
+        st.success(f"{total} providers found.")
+    else:
+        st.warning("No providers found.")
+
+# 🛠️ Query Profile (admin): every statement this app process has run
+if option == "🛠️ Query Profile":
+    st.subheader("🛠️ Query Profile")
+    st.caption(f"Plans are captured for statements slower than {SLOW_QUERY_MS:g} ms; "
+               "Full_Scans lists tables read without an index.")
+    summary = profile_summary()
+    st.dataframe(summary)
+    st.download_button("Download profile as CSV", data=summary.to_csv(index=False),
+                       file_name="query_profile.csv", mime="text/csv")
@@ -0,0 +1,52 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from matching import match
+
+# (listings, receivers) sizes; pass --quick to stop at 10k x 1k
+SCALES = [(1_000, 100), (10_000, 1_000), (50_000, 5_000), (100_000, 10_000)]
+
+CITIES = [f"City {i}" for i in range(50)]
+FOOD_TYPES = ["Vegetarian", "Non-Vegetarian", "Vegan"]
+
+
+# Synthetic listings / receivers / claim history with skewed city sizes
+def synthetic(n_listings, n_receivers, seed=0):
+    rng = np.random.default_rng(seed)
+    city_weights = 1 / np.arange(1, len(CITIES) + 1)
+    city_weights /= city_weights.sum()
+    listings = pd.DataFrame({
+        "Food_ID": np.arange(1, n_listings + 1),
+        "Quantity": rng.integers(1, 50, n_listings),
+        "City": rng.choice(CITIES, n_listings, p=city_weights),
+        "Food_Type": rng.choice(FOOD_TYPES, n_listings),
+        "Expires_In_Hours": rng.uniform(0, 240, n_listings),
+    })
+    receivers = pd.DataFrame({
+        "Receiver_ID": np.arange(1, n_receivers + 1),
+        "City": rng.choice(CITIES, n_receivers, p=city_weights),
+    })
+    n_history = n_receivers * 3
+    history = pd.DataFrame({
+        "Receiver_ID": rng.integers(1, n_receivers + 1, n_history),
+        "Food_Type": rng.choice(FOOD_TYPES, n_history),
+        "Claims": rng.integers(1, 20, n_history),
+        "Avg_Quantity": rng.uniform(1, 50, n_history),
+    }).groupby(["Receiver_ID", "Food_Type"], as_index=False).agg({"Claims": "sum", "Avg_Quantity": "mean"})
+    return listings, receivers, history
+
+
+def main():
+    scales = SCALES[:2] if "--quick" in sys.argv else SCALES
+    print(f"{'listings':>10} {'receivers':>10} {'assigned':>10} {'seconds':>8} {'listings/s':>12}")
+    for n_listings, n_receivers in scales:
+        listings, receivers, history = synthetic(n_listings, n_receivers)
+        start = time.perf_counter()
+        result = match(listings, receivers, history)
+        seconds = time.perf_counter() - start
+        print(f"{n_listings:>10} {n_receivers:>10} {len(result):>10} {seconds:>8.2f} {n_listings / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from database import close_database, create_tables, get_connection
+
+# Rows per table and number of distinct cities; pass --quick for 10k rows
+ROWS = 100_000
+CITIES = 1_000
+
+# The per-city report as it was written before, and its replacements
+Q1_FORMS = {
+    # Streamlit Q1: correlated subqueries per city over a UNION. `p2.City = City`
+    # binds City to p2 itself, so every city gets the table's total count.
+    "correlated_subqueries": """
+        SELECT City,
+               (SELECT COUNT(*) FROM providers p2 WHERE p2.City = City) AS Provider_Count,
+               (SELECT COUNT(*) FROM receivers r2 WHERE r2.City = City) AS Receiver_Count
+        FROM (SELECT City FROM providers UNION SELECT City FROM receivers) AS cities
+        GROUP BY City
+    """,
+    # app.py query 1: per-city cross product before COUNT(DISTINCT ...);
+    # cities with receivers but no providers are dropped
+    "left_join_distinct": """
+        SELECT City, COUNT(DISTINCT Provider_ID) AS Provider_Count, COUNT(DISTINCT Receiver_ID) AS Receiver_Count
+        FROM providers LEFT JOIN receivers USING(City)
+        GROUP BY City
+    """,
+    # one pass over both tables, grouped once
+    "single_pass": """
+        SELECT City, SUM(p) AS Provider_Count, SUM(r) AS Receiver_Count
+        FROM (SELECT City, 1 AS p, 0 AS r FROM providers
+              UNION ALL
+              SELECT City, 0, 1 FROM receivers)
+        GROUP BY City
+    """,
+    # trigger-maintained per-city counters (what the query catalog reads)
+    "city_counts": """
+        SELECT NULLIF(City, '') AS City, Provider_Count, Receiver_Count
+        FROM city_counts
+        WHERE Provider_Count > 0 OR Receiver_Count > 0
+        ORDER BY City
+    """,
+}
+
+
+# Providers / receivers with Zipf-like city sizes
+def populate(conn, rows, cities, seed=0):
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, cities + 1)
+    weights /= weights.sum()
+    for table, cols in (("providers", "Name, Type, City"), ("receivers", "Name, Type, City")):
+        city = rng.choice(cities, rows, p=weights)
+        conn.executemany(
+            f"INSERT INTO {table} ({cols}) VALUES (?, 'NGO', ?)",
+            ((f"{table} {i}", f"City {c}") for i, c in enumerate(city)),
+        )
+    conn.commit()
+    conn.execute("ANALYZE")
+
+
+def main():
+    rows = 10_000 if "--quick" in sys.argv else ROWS
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        create_tables(path)
+        conn = get_connection(path)
+        populate(conn, rows, CITIES)
+        results = {}
+        print(f"{rows} providers / {rows} receivers, {CITIES} cities")
+        print(f"{'form':<24} {'seconds':>8} {'rows':>6}")
+        for name, sql in Q1_FORMS.items():
+            start = time.perf_counter()
+            out = conn.execute(sql).fetchall()
+            seconds = time.perf_counter() - start
+            results[name] = sorted(out)
+            print(f"{name:<24} {seconds:>8.3f} {len(out):>6}")
+        conn.close()
+        close_database(path)
+        same = results["single_pass"] == results["city_counts"]
+        print(f"single_pass == city_counts: {same}")
+        if not same:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
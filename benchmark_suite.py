@@ -0,0 +1,319 @@
+import argparse
+import ast
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from database import close_database, create_tables, get_writer, read_connection
+from csv_sync import sync_all
+from ingest import CHUNK_SIZE, CSV_FILES
+from exports import EXPORT_FORMATS, export_query
+from report_runner import run_exports
+from versions import bump_version
+from geo import CITY_COORDINATES
+import run_queries
+from query_catalog import CATALOG, query_sql, supported_filters
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Listings (and claims) per scale; providers / receivers scale with them
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Rows generated per CSV write, so 10M-row files never sit in memory whole
+GENERATE_CHUNK = 500_000
+
+# Skewed categorical distributions (value -> weight)
+PROVIDER_TYPES = {"Restaurant": 40, "Supermarket": 25, "Grocery Store": 20, "Catering Service": 15}
+RECEIVER_TYPES = {"NGO": 40, "Individual": 30, "Shelter": 20, "Charity": 10}
+FOOD_TYPES = {"Vegetarian": 50, "Non-Vegetarian": 35, "Vegan": 15}
+MEAL_TYPES = {"Lunch": 35, "Dinner": 35, "Breakfast": 20, "Snacks": 10}
+STATUSES = {"Completed": 50, "Pending": 30, "Cancelled": 20}
+FOOD_NAMES = ["Rice", "Bread", "Dal", "Chapati", "Vegetables", "Fruits", "Soup", "Pasta",
+              "Chicken", "Fish", "Paneer", "Salad", "Biryani", "Idli", "Sandwich", "Curd"]
+
+# Cities beyond the geocoded ones; city sizes follow a Zipf-like curve
+EXTRA_CITIES = 480
+
+# CRUD round trips timed per table
+CRUD_OPS = 200
+
+# Slower than this x the baseline (and by more than REGRESSION_MIN_SECONDS,
+# to ignore timer noise on millisecond queries) is reported as a regression
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_SECONDS = 0.005
+
+
+def _choice(rng, weights, size):
+    values = list(weights)
+    p = np.array(list(weights.values()), dtype=float)
+    return np.array(values, dtype=object)[rng.choice(len(values), size, p=p / p.sum())]
+
+
+def _zipf_weights(n, s=1.0):
+    w = 1 / np.arange(1, n + 1) ** s
+    return w / w.sum()
+
+
+def _write(df, path, first):
+    df.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+
+# Providers, receivers, food_listings and claims CSVs (the file names the
+# ingest path expects) for `rows` listings and `rows` claims
+def generate(folder, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    cities = np.array(list(CITY_COORDINATES) + [f"Town {i}" for i in range(EXTRA_CITIES)], dtype=object)
+    city_p = _zipf_weights(len(cities))
+    n_providers, n_receivers = max(rows // 20, 50), max(rows // 10, 50)
+    paths = {table: os.path.join(folder, name) for table, name in CSV_FILES.items()}
+
+    provider_city = cities[rng.choice(len(cities), n_providers, p=city_p)]
+    provider_type = _choice(rng, PROVIDER_TYPES, n_providers)
+    ids = np.arange(1, n_providers + 1)
+    _write(pd.DataFrame({
+        "Provider_ID": ids, "Name": [f"Provider {i}" for i in ids], "Type": provider_type,
+        "Address": [f"{i} Main Road" for i in ids], "City": provider_city,
+        "Contact": [f"provider{i}@example.org" if i % 3 == 0 else f"+91-98{i:08d}" for i in ids],
+    }), paths["providers"], True)
+
+    ids = np.arange(1, n_receivers + 1)
+    _write(pd.DataFrame({
+        "Receiver_ID": ids, "Name": [f"Receiver {i}" for i in ids],
+        "Type": _choice(rng, RECEIVER_TYPES, n_receivers),
+        "City": cities[rng.choice(len(cities), n_receivers, p=city_p)],
+        "Contact": [f"+91-97{i:08d}" for i in ids],
+    }), paths["receivers"], True)
+
+    # two years of listings ending a month from now; busy providers list more
+    end = pd.Timestamp.now().normalize() + pd.Timedelta(days=30)
+    span_days = 730
+    provider_p = _zipf_weights(n_providers, 0.8)
+    receiver_p = _zipf_weights(n_receivers, 0.8)
+    food_p = _zipf_weights(len(FOOD_NAMES))
+    for start in range(0, rows, GENERATE_CHUNK):
+        n = min(GENERATE_CHUNK, rows - start)
+        provider = rng.choice(n_providers, n, p=provider_p)
+        expiry = end - pd.to_timedelta(rng.integers(0, span_days, n), unit="D")
+        _write(pd.DataFrame({
+            "Food_ID": np.arange(start + 1, start + n + 1),
+            "Food_Name": np.array(FOOD_NAMES, dtype=object)[rng.choice(len(FOOD_NAMES), n, p=food_p)],
+            "Quantity": rng.integers(1, 100, n),
+            "Expiry_Date": expiry.strftime("%Y-%m-%d"),
+            "Provider_ID": provider + 1,
+            "Provider_Type": provider_type[provider],
+            "Location": provider_city[provider],
+            "Food_Type": _choice(rng, FOOD_TYPES, n),
+            "Meal_Type": _choice(rng, MEAL_TYPES, n),
+        }), paths["food_listings"], start == 0)
+
+        # claims land on listings in the same chunk, a few days before expiry
+        listing = rng.integers(0, n, n)
+        claimed = expiry[listing] - pd.to_timedelta(rng.integers(0, 5 * 86400, n), unit="s")
+        _write(pd.DataFrame({
+            "Claim_ID": np.arange(start + 1, start + n + 1),
+            "Food_ID": listing + start + 1,
+            "Receiver_ID": rng.choice(n_receivers, n, p=receiver_p) + 1,
+            "Status": _choice(rng, STATUSES, n),
+            "Timestamp": claimed.strftime("%Y-%m-%d %H:%M:%S"),
+        }), paths["claims"], start == 0)
+    return {"providers": n_providers, "receivers": n_receivers, "food_listings": rows, "claims": rows}
+
+
+# Functions defined at the top level of a Streamlit script
+def script_functions(file_name, names, namespace):
+    path = os.path.join(HERE, file_name)
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    defs = [node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name in names]
+    namespace = dict(namespace)
+    exec(compile(ast.Module(body=defs, type_ignores=[]), path, "exec"), namespace)
+    return {name: namespace[name] for name in names}
+
+
+# Every catalog query, unfiltered and with all the filters it supports:
+# label -> (sql, params)
+def catalog_queries(city, start, end):
+    values = {"city": city, "start": start, "end": end, "status": "Completed"}
+    out = {}
+    for name in CATALOG:
+        out[name] = query_sql(name)
+        filters = {f: values[f] for f in sorted(supported_filters(name))}
+        if filters:
+            out[f"{name}[{','.join(filters)}]"] = query_sql(name, **filters)
+    return out
+
+
+class Report:
+    def __init__(self, scale, rows, seed):
+        self.meta = {
+            "scale": scale, "rows": rows, "seed": seed,
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        }
+        self.results = []
+
+    def add(self, stage, name, seconds, rows=None, **extra):
+        entry = {"stage": stage, "name": name, "seconds": round(seconds, 6), "rows": rows, **extra}
+        self.results.append(entry)
+        rate = f" ({rows / seconds:,.0f} rows/s)" if rows and seconds > 0 else ""
+        print(f"{stage:<10} {name[:60]:<60} {seconds:>10.4f}s{rate}")
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"meta": self.meta, "results": self.results}, f, indent=2)
+
+
+def bench_generate(report, folder, rows, seed):
+    start = time.perf_counter()
+    counts = generate(folder, rows, seed)
+    report.add("generate", "csv", time.perf_counter() - start, sum(counts.values()), tables=counts)
+
+
+# setup_database.py: plain connection, full chunked reload of every CSV
+def _full_reload(report, folder, db_path, suffix=""):
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    stats = sync_all(conn, folder, chunk_size=CHUNK_SIZE, full=True, verbose=False)
+    total = time.perf_counter() - start
+    conn.close()
+    for s in stats:
+        report.add("ingest", s["table"] + suffix, s["seconds"], s["rows_changed"])
+    report.add("ingest", "setup_database" + suffix, total, sum(s["rows_changed"] for s in stats))
+
+
+# Fresh load, then create_tables backfills the side tables the apps read;
+# then the same reload again into that initialized database, where the
+# summary / expiry / wastage / rollup triggers and FTS index are all live
+def bench_ingest(report, folder, db_path):
+    _full_reload(report, folder, db_path)
+    start = time.perf_counter()
+    create_tables(db_path)
+    report.add("ingest", "create_tables", time.perf_counter() - start)
+    _full_reload(report, folder, db_path, " (reload)")
+
+
+def bench_queries(report, db_path):
+    with read_connection(db_path) as conn:
+        city = conn.execute("SELECT City FROM city_counts ORDER BY Provider_Count DESC LIMIT 1").fetchone()[0]
+        last = conn.execute("SELECT MAX(Bucket) FROM claim_rollups WHERE Grain = 'day'").fetchone()[0]
+        end = pd.Timestamp(last or datetime.now())
+        for label, (sql, params) in catalog_queries(city, end - pd.Timedelta(days=30), end).items():
+            start = time.perf_counter()
+            try:
+                rows = len(conn.execute(sql, params).fetchall())
+                report.add("query", label, time.perf_counter() - start, rows)
+            except sqlite3.Error as e:
+                report.add("query", label, time.perf_counter() - start, 0, error=str(e))
+
+
+# The Streamlit CRUD helpers, run as jobs on the writer thread like the app does
+def bench_crud(report, db_path, seed):
+    helpers = script_functions("streamlit_food_waste_app.py", ["_insert", "_update", "_delete"],
+                               {"bump_version": bump_version})
+    writer = get_writer(db_path)
+    rng = np.random.default_rng(seed)
+    rows = {
+        "providers": ("Provider_ID", {"Name": "Bench Provider", "Type": "Restaurant", "City": "Pune"},
+                      {"Contact": "+91-0000000000"}),
+        "receivers": ("Receiver_ID", {"Name": "Bench Receiver", "Type": "NGO", "City": "Pune"},
+                      {"Contact": "+91-0000000000"}),
+        "food_listings": ("Food_ID", {"Food_Name": "Rice", "Quantity": 10, "Expiry_Date": "2030-01-01",
+                                      "Provider_ID": 1, "Provider_Type": "Restaurant", "Location": "Pune",
+                                      "Food_Type": "Vegetarian", "Meal_Type": "Lunch"},
+                          {"Quantity": 20}),
+        "claims": ("Claim_ID", {"Food_ID": 1, "Receiver_ID": 1, "Status": "Pending",
+                                "Timestamp": "2030-01-01 12:00:00"},
+                   {"Status": "Completed"}),
+    }
+    for table, (pk, row, change) in rows.items():
+        timings = {"insert": [], "update": [], "delete": []}
+        for _ in range(CRUD_OPS):
+            start = time.perf_counter()
+            new_id = writer.run(helpers["_insert"], table, row)
+            timings["insert"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            writer.run(helpers["_update"], table, pk, new_id, change)
+            timings["update"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            writer.run(helpers["_delete"], table, pk, new_id)
+            timings["delete"].append(time.perf_counter() - start)
+        for op, seconds in timings.items():
+            report.add("crud", f"{table}/{op}", float(np.mean(seconds)), None,
+                       p95_seconds=round(float(np.percentile(seconds, 95)), 6), ops=CRUD_OPS)
+
+
+# Every format for the largest table, then run_queries' parallel xlsx export
+def bench_exports(report, db_path, folder):
+    with read_connection(db_path) as conn:
+        for fmt, (ext, _) in EXPORT_FORMATS.items():
+            start = time.perf_counter()
+            stats = export_query(conn, "SELECT * FROM food_listings", os.path.join(folder, f"listings.{ext}"), fmt)
+            report.add("export", f"food_listings.{ext}", time.perf_counter() - start, stats["rows"])
+    start = time.perf_counter()
+    results = run_exports(db_path, run_queries.queries, folder, "xlsx")
+    report.add("export", "run_queries/xlsx", time.perf_counter() - start, sum(r["rows"] for r in results))
+
+
+# Entries slower than REGRESSION_RATIO x the same entry in a previous report
+def regressions(report, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data["meta"]["rows"] != report.meta["rows"]:
+        print(f"Note: baseline ran at {data['meta']['rows']:,} rows, this run at {report.meta['rows']:,}")
+    baseline = {(r["stage"], r["name"]): r["seconds"] for r in data["results"]}
+    slower = []
+    for r in report.results:
+        before = baseline.get((r["stage"], r["name"]))
+        if before and r["seconds"] > before * REGRESSION_RATIO and r["seconds"] - before > REGRESSION_MIN_SECONDS:
+            slower.append((r["stage"], r["name"], before, r["seconds"]))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic data and time ingestion, queries, CRUD and exports.")
+    parser.add_argument("scale", nargs="?", default="10k", help=f"one of {', '.join(SCALES)} or a row count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="benchmark_report.json", help="JSON report path")
+    parser.add_argument("--baseline", help="previous JSON report to compare against")
+    parser.add_argument("--keep", help="folder to keep the generated CSVs / database in")
+    parser.add_argument("--skip", nargs="*", default=[], choices=["queries", "crud", "exports"])
+    args = parser.parse_args()
+    rows = SCALES.get(args.scale.lower()) or int(args.scale)
+
+    report = Report(args.scale, rows, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = args.keep or tmp
+        os.makedirs(folder, exist_ok=True)
+        db_path = os.path.join(folder, "food_waste.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        bench_generate(report, folder, rows, args.seed)
+        bench_ingest(report, folder, db_path)
+        if "queries" not in args.skip:
+            bench_queries(report, db_path)
+        if "crud" not in args.skip:
+            bench_crud(report, db_path, args.seed)
+        if "exports" not in args.skip:
+            bench_exports(report, db_path, folder)
+        close_database(db_path)
+    report.save(args.out)
+    print(f"\nReport written to {args.out}")
+
+    if args.baseline:
+        slower = regressions(report, args.baseline)
+        for stage, name, before, after in slower:
+            print(f"REGRESSION {stage}/{name}: {before:.4f}s -> {after:.4f}s ({after / before:.2f}x)")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import json
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from schema import COLUMNS, PRIMARY_KEYS
+from versions import bump_version
+from summaries import summaries_delta_sql
+from search_index import index_rows
+from expiry import expiry_delta_sql
+from wastage import wastage_delta_sql
+from timeseries import rollups_delta_sql
+
+CLAIM_STATUSES = ("Pending", "Completed", "Cancelled")
+
+
+# Read an uploaded batch (file path or file-like) as CSV or Parquet
+def read_batch(source, name=None):
+    name = (name or getattr(source, "name", None) or str(source)).lower()
+    if name.endswith(".parquet") or name.endswith(".pq"):
+        return pd.read_parquet(source)
+    return pd.read_csv(source)
+
+
+# Keys from `values` that exist in table.key, in one set-based query
+def existing_keys(conn, table, key, values):
+    values = [int(v) for v in pd.unique(values)]
+    if not values:
+        return set()
+    rows = conn.execute(
+        f"SELECT {key} FROM {table} WHERE {key} IN (SELECT value FROM json_each(?))",
+        (json.dumps(values),),
+    ).fetchall()
+    return {r[0] for r in rows}
+
+
+def _reject(reasons, mask, reason):
+    reasons[mask & (reasons == "")] = reason
+
+
+def _int_column(df, col):
+    return pd.to_numeric(df[col], errors="coerce") if col in df.columns else pd.Series(np.nan, index=df.index)
+
+
+def _split(df, reasons, table):
+    ok = reasons == ""
+    accepted = df.loc[ok, [c for c in COLUMNS[table] if c in df.columns]]
+    rejected = df.loc[~ok].copy()
+    rejected.insert(0, "Reason", reasons[~ok])
+    rejected.insert(0, "Row", rejected.index + 1)
+    return accepted, rejected
+
+
+# Validate a listings batch. Provider_ID may be given directly or resolved
+# from a Provider_Name column; Provider_Type / Location default to the
+# provider's Type / City. Returns (accepted, rejected-with-Reason).
+def validate_listings(conn, df):
+    df = df.copy()
+    df.columns = df.columns.str.strip()
+    df = df.reset_index(drop=True)
+    reasons = np.full(len(df), "", dtype=object)
+
+    if "Provider_ID" not in df.columns and "Provider_Name" in df.columns:
+        names = df["Provider_Name"].dropna().astype(str).unique().tolist()
+        lookup = pd.read_sql_query(
+            "SELECT Name, MIN(Provider_ID) AS Provider_ID FROM providers "
+            "WHERE Name IN (SELECT value FROM json_each(?)) GROUP BY Name",
+            conn, params=(json.dumps(names),),
+        )
+        df["Provider_ID"] = df["Provider_Name"].map(dict(zip(lookup["Name"], lookup["Provider_ID"])))
+
+    provider_id = _int_column(df, "Provider_ID")
+    quantity = _int_column(df, "Quantity")
+    expiry = pd.to_datetime(df["Expiry_Date"], errors="coerce") if "Expiry_Date" in df.columns \
+        else pd.Series(pd.NaT, index=df.index)
+    food_id = _int_column(df, "Food_ID")
+
+    _reject(reasons, df.get("Food_Name", pd.Series(None, index=df.index)).isna().to_numpy(), "missing Food_Name")
+    _reject(reasons, provider_id.isna().to_numpy(), "unknown or missing provider")
+    _reject(reasons, ~(quantity > 0).to_numpy(), "Quantity must be a positive number")
+    _reject(reasons, expiry.isna().to_numpy(), "invalid Expiry_Date")
+    _reject(reasons, (food_id.notna() & food_id.duplicated(keep="last")).to_numpy(), "duplicate Food_ID in batch")
+
+    known = existing_keys(conn, "providers", "Provider_ID", provider_id.dropna())
+    _reject(reasons, ~provider_id.isin(known).to_numpy(), "unknown or missing provider")
+
+    providers = pd.read_sql_query(
+        "SELECT Provider_ID, Type, City FROM providers WHERE Provider_ID IN (SELECT value FROM json_each(?))",
+        conn, params=(json.dumps(sorted(known)),),
+    ).set_index("Provider_ID")
+    for col, src in (("Provider_Type", "Type"), ("Location", "City")):
+        fallback = provider_id.map(providers[src])
+        df[col] = df[col].fillna(fallback) if col in df.columns else fallback
+
+    df["Provider_ID"] = provider_id.astype("Int64")
+    df["Quantity"] = quantity.astype("Int64")
+    df["Expiry_Date"] = expiry.dt.strftime("%Y-%m-%d %H:%M:%S")
+    if "Food_ID" in df.columns:
+        df["Food_ID"] = food_id.astype("Int64")
+    return _split(df, reasons, "food_listings")
+
+
+# Validate a claims batch: Food_ID and Receiver_ID must exist, Status must be
+# one of CLAIM_STATUSES (default Pending), Timestamp defaults to now.
+def validate_claims(conn, df):
+    df = df.copy()
+    df.columns = df.columns.str.strip()
+    df = df.reset_index(drop=True)
+    reasons = np.full(len(df), "", dtype=object)
+
+    food_id = _int_column(df, "Food_ID")
+    receiver_id = _int_column(df, "Receiver_ID")
+    claim_id = _int_column(df, "Claim_ID")
+    status = df["Status"].fillna("Pending") if "Status" in df.columns else pd.Series("Pending", index=df.index)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = pd.to_datetime(df["Timestamp"], errors="coerce") if "Timestamp" in df.columns \
+        else pd.Series(pd.NaT, index=df.index)
+    bad_timestamp = timestamp.isna() & df.get("Timestamp", pd.Series(None, index=df.index)).notna()
+
+    known_food = existing_keys(conn, "food_listings", "Food_ID", food_id.dropna())
+    known_receivers = existing_keys(conn, "receivers", "Receiver_ID", receiver_id.dropna())
+    _reject(reasons, ~food_id.isin(known_food).to_numpy(), "unknown or missing Food_ID")
+    _reject(reasons, ~receiver_id.isin(known_receivers).to_numpy(), "unknown or missing Receiver_ID")
+    _reject(reasons, ~status.isin(CLAIM_STATUSES).to_numpy(), "invalid Status")
+    _reject(reasons, bad_timestamp.to_numpy(), "invalid Timestamp")
+    _reject(reasons, (claim_id.notna() & claim_id.duplicated(keep="last")).to_numpy(), "duplicate Claim_ID in batch")
+
+    df["Food_ID"] = food_id.astype("Int64")
+    df["Receiver_ID"] = receiver_id.astype("Int64")
+    df["Status"] = status
+    df["Timestamp"] = timestamp.dt.strftime("%Y-%m-%d %H:%M:%S").fillna(now)
+    if "Claim_ID" in df.columns:
+        df["Claim_ID"] = claim_id.astype("Int64")
+    return _split(df, reasons, "claims")
+
+
+VALIDATORS = {"food_listings": validate_listings, "claims": validate_claims}
+
+
+# Plain Python rows for executemany (NaN / NA become NULL), built a column
+# at a time
+def _rows(df):
+    columns = [df[c].astype(object).where(df[c].notna(), None).tolist() for c in df.columns]
+    return list(zip(*columns))
+
+
+# Inserts at least this large skip the per-row insert triggers. The side
+# tables then get the same deltas set-based, one statement per table over
+# the inserted rows, so the cost follows the batch, not the table. Below
+# this, dropping / recreating the triggers (a schema change every open
+# connection has to re-prepare for) costs more than it saves.
+BULK_MIN_ROWS = 250
+
+# Insert-trigger name prefix -> the set-based delta for the rows it skipped
+BULK_DELTAS = {
+    "trg_summary_": summaries_delta_sql,
+    "trg_expiry_": expiry_delta_sql,
+    "trg_wastage_": wastage_delta_sql,
+    "trg_claim_rollups_": rollups_delta_sql,
+}
+
+BULK_IDS = "SELECT id FROM temp.bulk_ids"
+
+
+# Next free ID for an AUTOINCREMENT table (caller must hold the write lock)
+def next_id(conn, table):
+    pk = PRIMARY_KEYS[table]
+    row = conn.execute(
+        f"SELECT MAX(IFNULL((SELECT MAX({pk}) FROM {table}), 0), "
+        f"IFNULL((SELECT seq FROM sqlite_sequence WHERE name = ?), 0))",
+        (table,),
+    ).fetchone()
+    return row[0] + 1
+
+
+def _insert_triggers(conn, table):
+    return conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ? "
+        "AND name LIKE '%\\_insert' ESCAPE '\\'",
+        (table,),
+    ).fetchall()
+
+
+def _executemany(conn, table, part, pk, upsert):
+    cols = list(part.columns)
+    sql = f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})"
+    if upsert:
+        updates = ", ".join(f"{c} = excluded.{c}" for c in cols if c != pk)
+        sql += f" ON CONFLICT({pk}) DO UPDATE SET {updates}"
+    conn.executemany(sql, _rows(part))
+
+
+# Write validated rows in the caller's transaction (e.g. a WriteQueue job).
+# Rows whose ID already exists are upserted by primary key (per-row triggers
+# keep the summaries current); new rows get IDs here and are inserted. Large
+# inserts run without the insert triggers, then apply the side-table deltas
+# and FTS entries set-based. Returns the number of rows written.
+def write_batch(conn, table, accepted):
+    if accepted.empty:
+        return 0
+    pk = PRIMARY_KEYS[table]
+    accepted = accepted.copy()
+    if pk not in accepted.columns:
+        accepted.insert(0, pk, pd.Series(pd.NA, index=accepted.index, dtype="Int64"))
+    ids = accepted[pk]
+    is_update = ids.isin(existing_keys(conn, table, pk, ids.dropna()))
+    updates, inserts = accepted[is_update], accepted[~is_update].copy()
+
+    if not updates.empty:
+        _executemany(conn, table, updates, pk, upsert=True)
+
+    if not inserts.empty:
+        missing = inserts[pk].isna()
+        start = max(next_id(conn, table), int(inserts[pk].max()) + 1 if (~missing).any() else 0)
+        inserts.loc[missing, pk] = np.arange(start, start + int(missing.sum()))
+        triggers = _insert_triggers(conn, table)
+        bulk = bool(triggers) and len(inserts) >= BULK_MIN_ROWS
+        if bulk:
+            for name, _ in triggers:
+                conn.execute(f"DROP TRIGGER {name}")
+        _executemany(conn, table, inserts, pk, upsert=False)
+        if bulk:
+            for _, sql in triggers:
+                conn.execute(sql)
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS bulk_ids (id INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM temp.bulk_ids")
+            conn.executemany("INSERT INTO temp.bulk_ids (id) VALUES (?)", ((int(i),) for i in inserts[pk]))
+            for prefix, delta_sql in BULK_DELTAS.items():
+                if any(name.startswith(prefix) for name, _ in triggers):
+                    for sql in delta_sql(table, BULK_IDS):
+                        conn.execute(sql)
+            conn.execute("DELETE FROM temp.bulk_ids")
+            index_rows(conn, table, inserts[pk])
+
+    bump_version(conn, table)
+    return len(accepted)
+
+
+# Validate + write one batch in a single transaction on a plain connection.
+# Returns a report with accepted / rejected counts, rows/sec and the rejects.
+def import_batch(conn, table, df):
+    start = time.perf_counter()
+    accepted, rejected = VALIDATORS[table](conn, df)
+    with conn:
+        written = write_batch(conn, table, accepted)
+    return make_report(table, written, rejected, time.perf_counter() - start)
+
+
+def make_report(table, written, rejected, seconds):
+    total = written + len(rejected)
+    return {
+        "table": table,
+        "accepted": written,
+        "rejected": len(rejected),
+        "seconds": seconds,
+        "rows_per_sec": total / seconds if seconds > 0 else 0.0,
+        "rejected_rows": rejected,
+    }
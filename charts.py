@@ -0,0 +1,102 @@
+import io
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+from timeseries import claims_series
+
+# Every chart reads grouped counts only (summary / rollup tables or an
+# index-only GROUP BY), never raw rows, and renders to PNG bytes that the
+# apps cache per data version.
+CHART_TITLES = {
+    "food_type": "Food Type Distribution",
+    "meal_type": "Meal Type Count",
+    "claims_over_time": "Claims per Day (7-day moving average)",
+    "city_heatmap": "Claims per City and Month",
+    "status_funnel": "Listing and Claim Status Funnel",
+}
+
+HEATMAP_CITIES = 15
+
+DPI = 72
+CHART_MARGINS = {
+    "claims_over_time": {"bottom": 0.2},
+    "city_heatmap": {"left": 0.22, "bottom": 0.2},
+    "status_funnel": {"left": 0.25},
+}
+
+
+def _read(conn, sql):
+    return pd.read_sql_query(sql, conn)
+
+
+# Grouped data behind chart `name`
+def chart_data(conn, name):
+    if name == "food_type":
+        return _read(conn, "SELECT NULLIF(Food_Type, '') AS Food_Type, Count FROM food_type_counts "
+                           "WHERE Count > 0 ORDER BY Count DESC")
+    if name == "meal_type":
+        return _read(conn, "SELECT Meal_Type, COUNT(*) AS Count FROM food_listings "
+                           "WHERE Meal_Type IS NOT NULL GROUP BY Meal_Type ORDER BY Count DESC")
+    if name == "claims_over_time":
+        return claims_series(conn, "day", window=7)
+    if name == "city_heatmap":
+        df = _read(conn, f"""
+            SELECT City, Bucket AS Month, SUM(Claims) AS Claims
+            FROM claim_rollups
+            WHERE Grain = 'month' AND Bucket <> '' AND City IN (
+                SELECT City FROM claim_rollups
+                WHERE Grain = 'month' AND City <> ''
+                GROUP BY City ORDER BY SUM(Claims) DESC LIMIT {HEATMAP_CITIES})
+            GROUP BY City, Bucket""")
+        return df.pivot_table(index="City", columns="Month", values="Claims", aggfunc="sum", fill_value=0)
+    if name == "status_funnel":
+        return _read(conn, """
+            SELECT 'Listings' AS Stage, IFNULL(SUM(Listings_Count), 0) AS Count FROM location_stats
+            UNION ALL SELECT 'Claims', IFNULL(SUM(Count), 0) FROM claim_status_counts
+            UNION ALL SELECT 'Pending + Completed', IFNULL(SUM(Count), 0) FROM claim_status_counts
+                      WHERE Status IN ('Pending', 'Completed')
+            UNION ALL SELECT 'Completed', IFNULL(SUM(Count), 0) FROM claim_status_counts
+                      WHERE Status = 'Completed'""")
+    raise ValueError(f"unknown chart: {name}")
+
+
+def _draw(ax, name, data):
+    if name == "food_type":
+        ax.pie(data["Count"], labels=data["Food_Type"].fillna("(blank)"), autopct='%1.1f%%', startangle=90)
+    elif name == "meal_type":
+        ax.bar(data["Meal_Type"], data["Count"])
+    elif name == "claims_over_time":
+        ax.plot(data.index, data["Claims"], alpha=0.4, label="Claims")
+        ax.plot(data.index, data["Moving_Avg"], label="7-day average")
+        ax.legend()
+        ax.figure.autofmt_xdate()
+    elif name == "city_heatmap":
+        image = ax.imshow(data.to_numpy(), aspect="auto", cmap="YlOrRd")
+        ax.set_yticks(range(len(data.index)), data.index)
+        ax.set_xticks(range(len(data.columns)), data.columns, rotation=45, ha="right")
+        ax.figure.colorbar(image, ax=ax, label="Claims")
+    elif name == "status_funnel":
+        widths = data["Count"].to_numpy()
+        ax.barh(data["Stage"], widths, left=(widths.max() - widths) / 2)
+        for y, count in enumerate(widths):
+            ax.text(widths.max() / 2, y, f"{count:,}", ha="center", va="center")
+        ax.invert_yaxis()
+        ax.set_xticks([])
+
+
+# PNG bytes of chart `name` for `data`, or None when there is nothing to plot
+def render_chart(name, data):
+    if data.empty:
+        return None
+    # fixed margins instead of tight_layout, which draws the figure twice
+    fig, ax = plt.subplots(figsize=(7, 4))
+    fig.subplots_adjust(**CHART_MARGINS.get(name, {}))
+    try:
+        _draw(ax, name, data)
+        ax.set_title(CHART_TITLES[name])
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=DPI)
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import time
+from contextlib import ExitStack
+import pandas as pd
+from schema import create_schema, orphan_counts, warn_orphans, COLUMNS, PRIMARY_KEYS
+from ingest import CHUNK_SIZE, CSV_FILES, prepare_chunk, chunk_rows, stream_csv_to_table, upsert_sql
+from summaries import paused
+from expiry import expiry_paused
+from timeseries import rollups_paused
+from wastage import wastage_paused
+from search_index import fts_paused
+from versions import create_versions, bump_version
+
+# One row per table: fingerprint of the CSV it was last synced from
+SYNC_STATE_DDL = """
+    CREATE TABLE IF NOT EXISTS csv_sync_state (
+        table_name TEXT PRIMARY KEY,
+        path       TEXT,
+        size       INTEGER,
+        mtime_ns   INTEGER,
+        sha1       TEXT
+    )
+"""
+
+
+def file_sha1(path, block_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def get_state(conn, table):
+    return conn.execute(
+        "SELECT path, size, mtime_ns, sha1 FROM csv_sync_state WHERE table_name = ?", (table,)
+    ).fetchone()
+
+
+def save_state(conn, table, path, size, mtime_ns, sha1):
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO csv_sync_state (table_name, path, size, mtime_ns, sha1) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (table, path, size, mtime_ns, sha1),
+        )
+
+
+# Upsert every row of one CSV in chunks; returns the number of rows inserted or changed
+def upsert_csv(conn, csv_path, table, chunk_size=CHUNK_SIZE):
+    changed = 0
+    sql = None
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+        chunk = prepare_chunk(chunk, table)
+        chunk = chunk[[c for c in COLUMNS[table] if c in chunk.columns]]
+        chunk = chunk[chunk[PRIMARY_KEYS[table]].notna()]
+        if sql is None:
+            sql = upsert_sql(table, list(chunk.columns))
+        # rowcount counts the upserted rows only; total_changes would also
+        # count every row the side-table triggers write
+        with conn:
+            changed += conn.executemany(sql, chunk_rows(chunk)).rowcount
+    return changed
+
+
+# Sync one table from its CSV. Unchanged files (same size + mtime, or same
+# content hash) are skipped; otherwise only new or changed rows are written.
+def sync_csv(conn, csv_path, table, chunk_size=CHUNK_SIZE, full=False):
+    start = time.perf_counter()
+    stat = os.stat(csv_path)
+    path = os.path.abspath(csv_path)
+    state = get_state(conn, table)
+    result = {"table": table, "status": "unchanged", "rows_changed": 0}
+
+    if not full and state and state[0] == path and state[1] == stat.st_size and state[2] == stat.st_mtime_ns:
+        result["seconds"] = time.perf_counter() - start
+        result["rows_per_sec"] = 0.0
+        return result
+
+    sha1 = file_sha1(csv_path)
+    if full:
+        loaded = stream_csv_to_table(conn, csv_path, table, chunk_size, if_exists="replace")
+        result.update(status="reloaded", rows_changed=loaded["rows"])
+    elif state and state[0] == path and state[3] == sha1:
+        # touched but identical content
+        pass
+    else:
+        result.update(status="upserted", rows_changed=upsert_csv(conn, csv_path, table, chunk_size))
+    save_state(conn, table, path, stat.st_size, stat.st_mtime_ns, sha1)
+    if result["rows_changed"]:
+        with conn:
+            bump_version(conn, table)
+    elapsed = time.perf_counter() - start
+    result["seconds"] = elapsed
+    result["rows_per_sec"] = result["rows_changed"] / elapsed if elapsed > 0 else 0.0
+    return result
+
+
+# Side tables and search indexes whose per-row triggers a full reload
+# pauses; each is rebuilt set-based once the reload finishes
+PAUSED = (paused, rollups_paused, wastage_paused, expiry_paused, fts_paused)
+
+
+# Sync every CSV found in base_path (full=True forces a delete-and-reload)
+def sync_all(conn, base_path, chunk_size=CHUNK_SIZE, full=False, verbose=True):
+    create_schema(conn)
+    conn.execute(SYNC_STATE_DDL)
+    create_versions(conn)
+    stats = []
+    # a full reload empties parent tables before their children are reloaded,
+    # and one CSV row pointing at a missing parent must not abort the whole
+    # sync, so in both modes foreign keys are checked once at the end instead
+    # of per statement; offending rows are kept and reported
+    enforce = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    if enforce:
+        conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        # a full reload rebuilds the side tables once instead of firing row triggers
+        with ExitStack() as stack:
+            if full:
+                for pause in PAUSED:
+                    stack.enter_context(pause(conn))
+            for table, file_name in CSV_FILES.items():
+                csv_path = os.path.join(base_path, file_name)
+                if not os.path.exists(csv_path):
+                    continue
+                result = sync_csv(conn, csv_path, table, chunk_size, full)
+                if verbose:
+                    print(f"{table}: {result['status']}, {result['rows_changed']} rows "
+                          f"in {result['seconds']:.3f}s ({result['rows_per_sec']:,.0f} rows/sec)")
+                stats.append(result)
+    finally:
+        if enforce:
+            conn.execute("PRAGMA foreign_keys = ON")
+    if enforce:
+        orphans = warn_orphans(conn) if verbose else orphan_counts(conn)
+        for result in stats:
+            result["orphans"] = orphans.get(result["table"], 0)
+    if any(r["rows_changed"] for r in stats):
+        conn.execute("ANALYZE")
+    return stats
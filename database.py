@@ -0,0 +1,260 @@
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from schema import create_schema
+from summaries import create_summaries
+from search_index import create_search_index
+from versions import create_versions
+from expiry import create_expiry
+from geo import create_geo_index
+from wastage import create_wastage
+from timeseries import create_rollups
+from profiling import ProfiledConnection
+
+# Default database file (app.py runs from the project folder)
+DB_PATH = os.environ.get("FOOD_WASTE_DB", "food_waste.db")
+
+# Idle connections kept per database file
+POOL_SIZE = 8
+
+# Seconds a statement waits on a locked database before failing
+BUSY_TIMEOUT = 10.0
+
+# Prepared statements each connection keeps, keyed by SQL text. Catalog
+# queries (query_catalog.py) render to fixed text per filter set, so a
+# pooled connection prepares each one once and reuses it afterwards.
+STATEMENT_CACHE = 256
+
+# Most queued writes folded into one group commit
+WRITE_BATCH = 64
+
+# Applied to every new connection. WAL lets readers run alongside a writer,
+# NORMAL sync is safe under WAL, and the cache / mmap sizes keep hot pages in memory.
+# foreign_keys enforces the REFERENCES declared in schema.py (SQLite leaves
+# them off per connection by default).
+PRAGMAS = [
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",      # 64 MB page cache
+    "PRAGMA mmap_size = 268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+    f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT * 1000)}",
+]
+
+# The writer keeps temp storage in files: every job runs under a SAVEPOINT,
+# and an in-memory savepoint journal gets slower per row the more pages a
+# job touches (a 8k-row insert through the triggers drops to ~100 rows/s).
+WRITER_PRAGMAS = PRAGMAS + ["PRAGMA temp_store = FILE"]
+
+
+# Profiled sqlite3.Connection whose close() hands it back to its pool. It is
+# still a real sqlite3.Connection, so pandas.read_sql and friends accept it as-is.
+class PooledConnection(ProfiledConnection):
+    pool = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
+
+    def discard(self):
+        self.pool = None
+        super().close()
+
+
+class ConnectionPool:
+    def __init__(self, path, size=POOL_SIZE, read_only=False):
+        self.path = path
+        self.size = size
+        self.read_only = read_only
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        # connections move between Streamlit script threads, one thread at a time
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE, factory=PooledConnection)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        if self.read_only:
+            conn.execute("PRAGMA query_only = ON")
+        conn.pool = self
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.discard()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().discard()
+            except queue.Empty:
+                break
+
+
+# Single writer thread per database. Callers submit job(conn) functions;
+# the thread drains whatever is queued (up to WRITE_BATCH jobs) into one
+# transaction, runs each job under its own SAVEPOINT and commits once.
+# A failing job is rolled back to its savepoint without touching the others.
+class WriteQueue:
+    def __init__(self, path, batch=WRITE_BATCH):
+        self.path = path
+        self.batch = batch
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    # Queue a write; returns a Future with the job's return value
+    def submit(self, job, *args, **kwargs):
+        future = Future()
+        self._jobs.put((future, job, args, kwargs))
+        return future
+
+    # Queue a write and wait for its group commit
+    def run(self, job, *args, **kwargs):
+        return self.submit(job, *args, **kwargs).result()
+
+    # Commit what is already queued, then close the connection and stop the thread
+    def close(self):
+        self._jobs.put(None)
+        self._thread.join()
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                               cached_statements=STATEMENT_CACHE, factory=ProfiledConnection)
+        for pragma in WRITER_PRAGMAS:
+            conn.execute(pragma)
+        while True:
+            pending = [self._jobs.get()]
+            while pending[-1] is not None and len(pending) < self.batch:
+                try:
+                    pending.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+            stop = pending[-1] is None
+            if stop:
+                pending.pop()
+            if pending:
+                self._commit_batch(conn, pending)
+            if stop:
+                conn.close()
+                return
+
+    def _commit_batch(self, conn, pending):
+        done = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, job, args, kwargs in pending:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT job")
+                try:
+                    result = job(conn, *args, **kwargs)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    future.set_exception(e)
+                else:
+                    conn.execute("RELEASE job")
+                    done.append((future, result))
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for future, _, _, _ in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in done:
+            future.set_result(result)
+
+
+_pools = {}
+_read_pools = {}
+_writers = {}
+_pools_lock = threading.Lock()
+
+
+def _shared(registry, path, factory):
+    path = os.path.abspath(path or DB_PATH)
+    with _pools_lock:
+        if path not in registry:
+            registry[path] = factory(path)
+        return registry[path]
+
+
+def get_pool(path=None):
+    return _shared(_pools, path, ConnectionPool)
+
+
+# Pool of query_only connections for the read-heavy pages
+def get_read_pool(path=None):
+    return _shared(_read_pools, path, lambda p: ConnectionPool(p, read_only=True))
+
+
+# The serialized writer for a database file
+def get_writer(path=None):
+    return _shared(_writers, path, WriteQueue)
+
+
+# Close the pooled connections and stop the writer for a database file, e.g.
+# before deleting it (Windows will not remove a file that is still open)
+def close_database(path=None):
+    path = os.path.abspath(path or DB_PATH)
+    with _pools_lock:
+        pools = [registry.pop(path) for registry in (_pools, _read_pools) if path in registry]
+        writer = _writers.pop(path, None)
+    for pool in pools:
+        pool.close_all()
+    if writer is not None:
+        writer.close()
+
+
+# Pooled connection; call close() when done to return it to the pool
+def get_connection(path=None):
+    return get_pool(path).acquire()
+
+
+# Read-only pooled connection as a context manager
+def read_connection(path=None):
+    return get_read_pool(path).connection()
+
+
+# Typed tables, summary tables, search index, write-version counters, the
+# expiry index, wastage and claim rollups and the provider / receiver R*Tree
+def create_tables(path=None):
+    conn = get_connection(path)
+    try:
+        create_schema(conn)
+        create_summaries(conn)
+        create_search_index(conn)
+        create_versions(conn)
+        create_expiry(conn)
+        create_wastage(conn)
+        create_rollups(conn)
+        create_geo_index(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,172 @@
+import calendar
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+
+# Expiry as an integer epoch per listing, next to the number of active
+# (Pending / Completed) claims on it. Expiry_Date stays the source of truth;
+# triggers keep this table in step with food_listings and claims.
+# Epochs are local wall-clock times counted as if UTC (Expiry_Date carries no
+# timezone), compared against strftime('%s', 'now', 'localtime'). A date-only
+# Expiry_Date (stored as midnight) lasts until the end of that day.
+EXPIRY_DDL = """
+    CREATE TABLE IF NOT EXISTS listing_expiry (
+        Food_ID       INTEGER PRIMARY KEY,
+        Expiry_Epoch  INTEGER,
+        Active_Claims INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+# The partial index holds only unclaimed listings in expiry order, so the
+# "next N to expire" feed is a B-tree seek plus N steps: O(log n + N)
+EXPIRY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_listing_expiry_epoch ON listing_expiry (Expiry_Epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_listing_expiry_open ON listing_expiry (Expiry_Epoch) WHERE Active_Claims = 0",
+]
+
+ACTIVE_STATUSES = ("Pending", "Completed")
+_ACTIVE = "('" + "', '".join(ACTIVE_STATUSES) + "')"
+
+# Current local time as an epoch, in SQL and in Python
+NOW_EPOCH_SQL = "CAST(strftime('%s', 'now', 'localtime') AS INTEGER)"
+
+
+def epoch_sql(expr):
+    return f"CAST(strftime('%s', {expr}) AS INTEGER)"
+
+
+def expiry_epoch_sql(expr):
+    return f"({epoch_sql(expr)} + CASE WHEN time({expr}) = '00:00:00' THEN 86399 ELSE 0 END)"
+
+
+def now_epoch():
+    return calendar.timegm(datetime.now().timetuple())
+
+
+def _active_count(food_id):
+    return f"(SELECT COUNT(*) FROM claims WHERE Food_ID = {food_id} AND Status IN {_ACTIVE})"
+
+
+def _claim_delta(row, sign):
+    return (f"UPDATE listing_expiry SET Active_Claims = Active_Claims {sign} 1 "
+            f"WHERE Food_ID = {row}.Food_ID AND {row}.Status IN {_ACTIVE};")
+
+
+def trigger_sql():
+    insert = (f"INSERT OR REPLACE INTO listing_expiry (Food_ID, Expiry_Epoch, Active_Claims) "
+              f"VALUES (new.Food_ID, {expiry_epoch_sql('new.Expiry_Date')}, {_active_count('new.Food_ID')});")
+    delete = "DELETE FROM listing_expiry WHERE Food_ID = old.Food_ID;"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_expiry_food_listings_insert AFTER INSERT ON food_listings "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_expiry_food_listings_delete AFTER DELETE ON food_listings "
+        f"BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_expiry_food_listings_update "
+        f"AFTER UPDATE OF Food_ID, Expiry_Date ON food_listings BEGIN {delete} {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_expiry_claims_insert AFTER INSERT ON claims "
+        f"BEGIN {_claim_delta('new', '+')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_expiry_claims_delete AFTER DELETE ON claims "
+        f"BEGIN {_claim_delta('old', '-')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_expiry_claims_update AFTER UPDATE OF Food_ID, Status ON claims "
+        f"BEGIN {_claim_delta('old', '-')} {_claim_delta('new', '+')} END",
+    ]
+
+
+# Expiry rows for the listings matching `where`, counted from their claims
+def _expiry_rows(where):
+    return f"""INSERT OR REPLACE INTO listing_expiry (Food_ID, Expiry_Epoch, Active_Claims)
+        SELECT f.Food_ID, {expiry_epoch_sql('f.Expiry_Date')},
+               COUNT(CASE WHEN c.Status IN {_ACTIVE} THEN 1 END)
+        FROM food_listings f LEFT JOIN claims c ON c.Food_ID = f.Food_ID
+        WHERE ({where})
+        GROUP BY f.Food_ID"""
+
+
+REBUILD_SQL = [
+    "DELETE FROM listing_expiry",
+    _expiry_rows("true"),
+]
+
+
+# What the skipped insert triggers would have written for the `table` rows
+# whose IDs `ids` (a subquery) returns
+def expiry_delta_sql(table, ids):
+    if table == "food_listings":
+        return [_expiry_rows(f"f.Food_ID IN ({ids})")]
+    if table == "claims":
+        new_active = f"SELECT Food_ID FROM claims WHERE Claim_ID IN ({ids}) AND Status IN {_ACTIVE}"
+        return [f"UPDATE listing_expiry SET Active_Claims = Active_Claims + "
+                f"(SELECT COUNT(*) FROM ({new_active}) n WHERE n.Food_ID = listing_expiry.Food_ID) "
+                f"WHERE Food_ID IN ({new_active})"]
+    return []
+
+
+# Recompute inside the caller's transaction (bulk loads that skip the triggers)
+def refresh_expiry(conn):
+    for sql in REBUILD_SQL:
+        conn.execute(sql)
+
+
+def _triggers(conn):
+    return conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_expiry_%'"
+    ).fetchall()
+
+
+# Installed means every trigger is there with its current definition
+def _installed(conn):
+    current = sorted(ddl.replace(" IF NOT EXISTS", "", 1) for ddl in trigger_sql())
+    return sorted(sql for _, sql in _triggers(conn)) == current
+
+
+# Create the table, indexes and triggers; replace outdated triggers and
+# backfill when any were missing or changed
+def create_expiry(conn):
+    installed = _installed(conn)
+    with conn:
+        conn.execute(EXPIRY_DDL)
+        for ddl in EXPIRY_INDEXES:
+            conn.execute(ddl)
+        if not installed:
+            for name, _ in _triggers(conn):
+                conn.execute(f"DROP TRIGGER {name}")
+        for ddl in trigger_sql():
+            conn.execute(ddl)
+        if not installed:
+            refresh_expiry(conn)
+
+
+# Bulk loads: drop the per-row triggers, then rebuild once at the end
+@contextmanager
+def expiry_paused(conn):
+    installed = _installed(conn)
+    if installed:
+        with conn:
+            for name, _ in _triggers(conn):
+                conn.execute(f"DROP TRIGGER {name}")
+    try:
+        yield
+    finally:
+        if installed:
+            create_expiry(conn)
+
+
+LISTING_COLUMNS = ["Food_ID", "Food_Name", "Quantity", "Expiry_Date", "Provider_ID",
+                   "Location", "Food_Type", "Meal_Type"]
+
+
+# Next `limit` unclaimed listings that have not yet expired, soonest first.
+# `within` (seconds) bounds how far ahead to look; `now` defaults to the
+# current local time.
+def expiring_soon(conn, limit=20, within=None, now=None):
+    now = now_epoch() if now is None else now
+    until = now + within if within is not None else None
+    sql = (f"SELECT e.Expiry_Epoch, {', '.join('f.' + c for c in LISTING_COLUMNS)} "
+           f"FROM listing_expiry e JOIN food_listings f ON f.Food_ID = e.Food_ID "
+           f"WHERE e.Active_Claims = 0 AND e.Expiry_Epoch >= ? "
+           + ("AND e.Expiry_Epoch <= ? " if until is not None else "")
+           + "ORDER BY e.Expiry_Epoch LIMIT ?")
+    params = [now] + ([until] if until is not None else []) + [limit]
+    df = pd.read_sql_query(sql, conn, params=params)
+    df.insert(1, "Expires_In_Hours", (df["Expiry_Epoch"] - now) / 3600)
+    return df.drop(columns="Expiry_Epoch")
@@ -0,0 +1,153 @@
+import csv
+import io
+import time
+
+# Rows pulled from the cursor per batch; memory stays at about one batch
+BATCH_ROWS = 50_000
+
+# Format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+# Execute a query and yield (column names, list of row tuples) per batch.
+# A query with no rows still yields its column names once.
+def iter_batches(conn, sql, params=None, batch_rows=BATCH_ROWS):
+    cur = conn.execute(sql, params or ())
+    columns = [d[0] for d in cur.description]
+    first = True
+    while True:
+        rows = cur.fetchmany(batch_rows)
+        if rows or first:
+            yield columns, rows
+        if not rows:
+            break
+        first = False
+
+
+def _write_csv(batches, dest):
+    text = io.TextIOWrapper(dest, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    rows = 0
+    for i, (columns, batch) in enumerate(batches):
+        if i == 0:
+            writer.writerow(columns)
+        writer.writerows(batch)
+        rows += len(batch)
+    text.flush()
+    text.detach()
+    return rows
+
+
+# Append a query's batches to a write_only sheet; only the current batch is
+# in memory (openpyxl spools write_only sheets to temp files until save)
+def _append_sheet(wb, sheet, batches):
+    ws = wb.create_sheet(sheet)
+    rows = 0
+    for i, (columns, batch) in enumerate(batches):
+        if i == 0:
+            ws.append(columns)
+        for row in batch:
+            ws.append(row)
+        rows += len(batch)
+    return rows
+
+
+def _write_excel(batches, dest, sheet="Sheet1"):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    rows = _append_sheet(wb, sheet, batches)
+    wb.save(dest)
+    return rows
+
+
+# Arrow arrays for one batch. The schema comes from the first batch (all-NULL
+# columns become strings, which later batches' values are converted to).
+def _arrow_arrays(pa, columns, batch, schema):
+    arrays = []
+    for i, name in enumerate(columns):
+        values = [row[i] for row in batch]
+        if schema is None:
+            array = pa.array(values)
+            if pa.types.is_null(array.type):
+                array = array.cast(pa.string())
+        else:
+            field = schema.field(name)
+            try:
+                array = pa.array(values, type=field.type)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                if not pa.types.is_string(field.type):
+                    raise ValueError(f"Column {name} has values that don't fit {field.type}")
+                array = pa.array([None if v is None else str(v) for v in values], type=field.type)
+        arrays.append(array)
+    return arrays
+
+
+def _write_arrow(batches, dest, fmt):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, schema, rows = None, None, 0
+    try:
+        for columns, batch in batches:
+            arrays = _arrow_arrays(pa, columns, batch, schema)
+            if schema is None:
+                schema = pa.schema([pa.field(c, a.type) for c, a in zip(columns, arrays)])
+                if fmt == "parquet":
+                    writer = pq.ParquetWriter(dest, schema)
+                else:
+                    writer = pa.ipc.new_file(dest, schema)
+            if batch:
+                writer.write_batch(pa.record_batch(arrays, schema=schema))
+            rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+# Stream a query's result into `dest` (a path or a binary file object) as
+# xlsx / csv / parquet / arrow without building a DataFrame.
+# Returns {"format", "rows", "seconds"}.
+def export_query(conn, sql, dest, fmt="csv", params=None, batch_rows=BATCH_ROWS):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if isinstance(dest, str):
+        with open(dest, "wb") as f:
+            return export_query(conn, sql, f, fmt, params, batch_rows)
+    start = time.perf_counter()
+    batches = iter_batches(conn, sql, params, batch_rows)
+    if fmt == "xlsx":
+        rows = _write_excel(batches, dest)
+    elif fmt == "csv":
+        rows = _write_csv(batches, dest)
+    else:
+        rows = _write_arrow(batches, dest, fmt)
+    return {"format": fmt, "rows": rows, "seconds": time.perf_counter() - start}
+
+
+# Same as export_query, returning the file contents (for download buttons)
+def export_bytes(conn, sql, fmt="csv", params=None, batch_rows=BATCH_ROWS):
+    buf = io.BytesIO()
+    export_query(conn, sql, buf, fmt, params, batch_rows)
+    return buf.getvalue()
+
+
+# Several queries as the sheets of one workbook, each streamed from its
+# cursor. `sheets` is a list of (sheet name, sql, params); `dest` a path or
+# binary file (e.g. a tempfile, so the workbook never sits in memory whole).
+# Returns {sheet name: rows written}.
+def export_workbook(conn, sheets, dest, batch_rows=BATCH_ROWS):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    counts = {}
+    for sheet, sql, params in sheets:
+        counts[sheet] = _append_sheet(wb, sheet, iter_batches(conn, sql, params, batch_rows))
+    wb.save(dest)
+    return counts
@@ -0,0 +1,209 @@
+import math
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# Offline geocoding: city -> (latitude, longitude) of the city centre.
+# Only a handful of real cities are built in (the generated dataset's cities
+# are not among them); extend it with a city_coordinates.csv (City, Latitude,
+# Longitude) in the data folder. Cities missing from both stay unplaced, and
+# the radius / nearest lookups skip their providers and receivers.
+CITY_COORDINATES = {
+    "Mumbai": (19.0760, 72.8777),
+    "Delhi": (28.7041, 77.1025),
+    "New Delhi": (28.6139, 77.2090),
+    "Bengaluru": (12.9716, 77.5946),
+    "Bangalore": (12.9716, 77.5946),
+    "Chennai": (13.0827, 80.2707),
+    "Kolkata": (22.5726, 88.3639),
+    "Hyderabad": (17.3850, 78.4867),
+    "Pune": (18.5204, 73.8567),
+    "Ahmedabad": (23.0225, 72.5714),
+    "Jaipur": (26.9124, 75.7873),
+    "Lucknow": (26.8467, 80.9462),
+    "Surat": (21.1702, 72.8311),
+    "Kanpur": (26.4499, 80.3319),
+    "Nagpur": (21.1458, 79.0882),
+    "Indore": (22.7196, 75.8577),
+    "Bhopal": (23.2599, 77.4126),
+    "Patna": (25.5941, 85.1376),
+    "Chandigarh": (30.7333, 76.7794),
+    "Kochi": (9.9312, 76.2673),
+}
+
+# Providers / receivers get a point in an R*Tree keyed by their ID
+GEO_INDEXES = {
+    "provider_geo": {"table": "providers", "key": "Provider_ID"},
+    "receiver_geo": {"table": "receivers", "key": "Receiver_ID"},
+}
+
+COORDINATES_DDL = """
+    CREATE TABLE IF NOT EXISTS city_coordinates (
+        City      TEXT PRIMARY KEY,
+        Latitude  REAL NOT NULL,
+        Longitude REAL NOT NULL
+    )
+"""
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+def _index_sql(name, spec):
+    table, key = spec["table"], spec["key"]
+    insert = (f"INSERT OR REPLACE INTO {name} (id, min_lat, max_lat, min_lon, max_lon) "
+              f"SELECT new.{key}, Latitude, Latitude, Longitude, Longitude "
+              f"FROM city_coordinates WHERE City = new.City;")
+    delete = f"DELETE FROM {name} WHERE id = old.{key};"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{name}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{name}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{name}_update AFTER UPDATE OF {key}, City ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+# Place every provider / receiver whose city has coordinates
+def reindex_geo(conn):
+    with conn:
+        for name, spec in GEO_INDEXES.items():
+            conn.execute(f"DELETE FROM {name}")
+            conn.execute(
+                f"INSERT INTO {name} (id, min_lat, max_lat, min_lon, max_lon) "
+                f"SELECT t.{spec['key']}, c.Latitude, c.Latitude, c.Longitude, c.Longitude "
+                f"FROM {spec['table']} t JOIN city_coordinates c ON c.City = t.City"
+            )
+
+
+# Add / replace city coordinates (dict City -> (lat, lon)) and re-place
+# the providers and receivers in those cities
+def add_city_coordinates(conn, coordinates):
+    with conn:
+        conn.executemany(
+            "INSERT INTO city_coordinates (City, Latitude, Longitude) VALUES (?, ?, ?) "
+            "ON CONFLICT(City) DO UPDATE SET Latitude = excluded.Latitude, Longitude = excluded.Longitude",
+            [(city, lat, lon) for city, (lat, lon) in coordinates.items()],
+        )
+    reindex_geo(conn)
+
+
+def load_city_coordinates(conn, csv_path):
+    df = pd.read_csv(csv_path)
+    df.columns = df.columns.str.strip()
+    add_city_coordinates(conn, {r.City: (r.Latitude, r.Longitude) for r in df.itertuples()})
+
+
+# Create the coordinate table, R*Tree indexes and triggers, seeded from
+# CITY_COORDINATES (plus base_path/city_coordinates.csv when present).
+# Returns False when this SQLite build has no R*Tree module.
+def create_geo_index(conn, base_path=None):
+    try:
+        is_new = not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'provider_geo'").fetchone()
+        with conn:
+            conn.execute(COORDINATES_DDL)
+            for name, spec in GEO_INDEXES.items():
+                for sql in _index_sql(name, spec):
+                    conn.execute(sql)
+            conn.executemany(
+                "INSERT OR IGNORE INTO city_coordinates (City, Latitude, Longitude) VALUES (?, ?, ?)",
+                [(city, lat, lon) for city, (lat, lon) in CITY_COORDINATES.items()],
+            )
+    except sqlite3.OperationalError as e:
+        if "rtree" in str(e):
+            return False
+        raise
+    csv_path = os.path.join(base_path, "city_coordinates.csv") if base_path else None
+    if csv_path and os.path.exists(csv_path):
+        load_city_coordinates(conn, csv_path)
+    elif is_new:
+        reindex_geo(conn)
+    return True
+
+
+# Great-circle distance in km (numpy arrays or scalars)
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+# IDs + coordinates inside the bounding box of a circle (an R*Tree range query)
+def _box(conn, name, lat, lon, radius_km):
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return pd.read_sql_query(
+        f"SELECT id, min_lat AS Latitude, min_lon AS Longitude FROM {name} "
+        f"WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?",
+        conn, params=[lat - dlat, lat + dlat, lon - dlon, lon + dlon],
+    )
+
+
+def _with_rows(conn, kind, hits):
+    spec = GEO_INDEXES[f"{kind}_geo"]
+    if hits.empty:
+        return pd.DataFrame(columns=[spec["key"], "Name", "Type", "City", "Contact", "Distance_km"])
+    rows = pd.read_sql_query(
+        f"SELECT {spec['key']}, Name, Type, City, Contact FROM {spec['table']} "
+        f"WHERE {spec['key']} IN ({', '.join('?' for _ in hits['id'])})",
+        conn, params=[int(i) for i in hits["id"]],
+    )
+    out = hits[["id", "Distance_km"]].rename(columns={"id": spec["key"]}).merge(rows, on=spec["key"])
+    return out[[spec["key"], "Name", "Type", "City", "Contact", "Distance_km"]]
+
+
+# `kind` ("provider" / "receiver") rows within radius_km of a point, nearest first
+def within_radius(conn, kind, lat, lon, radius_km):
+    hits = _box(conn, f"{kind}_geo", lat, lon, radius_km)
+    hits["Distance_km"] = haversine_km(lat, lon, hits["Latitude"], hits["Longitude"])
+    hits = hits[hits["Distance_km"] <= radius_km].sort_values("Distance_km", kind="stable")
+    return _with_rows(conn, kind, hits)
+
+
+# k nearest `kind` rows to a point: box queries that double in size until k
+# points fall inside the circle the box encloses (or max_km is reached)
+def nearest(conn, kind, lat, lon, k=5, start_km=5.0, max_km=20_000.0):
+    radius = start_km
+    while True:
+        hits = _box(conn, f"{kind}_geo", lat, lon, radius)
+        hits["Distance_km"] = haversine_km(lat, lon, hits["Latitude"], hits["Longitude"])
+        inside = hits[hits["Distance_km"] <= radius]
+        if len(inside) >= k or radius >= max_km:
+            return _with_rows(conn, kind, inside.sort_values("Distance_km", kind="stable").head(k))
+        radius *= 2
+
+
+# Coordinates of a listing: its provider's point, else its Location's city centre
+def listing_point(conn, food_id):
+    row = conn.execute(
+        "SELECT COALESCE(g.min_lat, c.Latitude), COALESCE(g.min_lon, c.Longitude) "
+        "FROM food_listings f "
+        "LEFT JOIN provider_geo g ON g.id = f.Provider_ID "
+        "LEFT JOIN city_coordinates c ON c.City = f.Location "
+        "WHERE f.Food_ID = ?",
+        (food_id,),
+    ).fetchone()
+    return None if row is None or row[0] is None else (row[0], row[1])
+
+
+# k receivers nearest to a listing (empty when the listing can't be placed)
+def nearest_receivers(conn, food_id, k=5):
+    point = listing_point(conn, food_id)
+    if point is None:
+        return _with_rows(conn, "receiver", pd.DataFrame(columns=["id", "Distance_km"]))
+    return nearest(conn, "receiver", point[0], point[1], k)
+
+
+# (latitude, longitude) of a city's centre, None when it has no coordinates
+def city_point(conn, city):
+    return conn.execute("SELECT Latitude, Longitude FROM city_coordinates WHERE City = ?", (city,)).fetchone()
+
+
+# Providers within radius_km of a city's centre
+def providers_near_city(conn, city, radius_km):
+    row = city_point(conn, city)
+    if row is None:
+        return _with_rows(conn, "provider", pd.DataFrame(columns=["id", "Distance_km"]))
+    return within_radius(conn, "provider", row[0], row[1], radius_km)
@@ -0,0 +1,108 @@
+import os
+import time
+import pandas as pd
+from schema import create_schema, COLUMNS, PRIMARY_KEYS
+
+# Rows read from a CSV (and written to SQLite) per chunk
+CHUNK_SIZE = 50_000
+
+# Date columns parsed per chunk, stored as 'YYYY-MM-DD HH:MM:SS' text like to_sql does
+DATE_COLUMNS = {
+    "food_listings": ["Expiry_Date"],
+    "claims": ["Timestamp"],
+}
+
+# CSV file name for each table
+CSV_FILES = {
+    "providers": "providers_data.csv",
+    "receivers": "receivers_data.csv",
+    "food_listings": "food_listings_data.csv",
+    "claims": "claims_data.csv",
+}
+
+
+# Clean one chunk: strip column names and parse dates
+def prepare_chunk(chunk, table):
+    chunk.columns = chunk.columns.str.strip()
+    for col in DATE_COLUMNS.get(table, []):
+        if col in chunk.columns:
+            parsed = pd.to_datetime(chunk[col], errors="coerce")
+            chunk[col] = parsed.dt.strftime("%Y-%m-%d %H:%M:%S")
+    return chunk
+
+
+# Plain Python rows for executemany (NaN/NaT become NULL)
+def chunk_rows(chunk):
+    return chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+# Upsert keyed on the table's primary key; a row is only rewritten when a column changed
+def upsert_sql(table, cols):
+    pk = PRIMARY_KEYS[table]
+    others = [c for c in cols if c != pk]
+    col_list = ", ".join(cols)
+    placeholders = ", ".join("?" for _ in cols)
+    sql = f"INSERT INTO {table} ({col_list}) VALUES ({placeholders}) ON CONFLICT({pk}) DO "
+    if not others:
+        return sql + "NOTHING"
+    set_clause = ", ".join(f"{c} = excluded.{c}" for c in others)
+    changed = " OR ".join(f"{c} IS NOT excluded.{c}" for c in others)
+    return sql + f"UPDATE SET {set_clause} WHERE {changed}"
+
+
+def count_rows(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+# Empty the typed table (schema.py) before a full reload
+def clear_table(conn, table, if_exists="replace"):
+    if if_exists == "replace":
+        with conn:
+            conn.execute(f"DELETE FROM {table}")
+
+
+# Stream one CSV into a table: one transaction + executemany per chunk.
+# Reports the rows the load added to the table.
+def stream_csv_to_table(conn, csv_path, table, chunk_size=CHUNK_SIZE, if_exists="replace"):
+    start = time.perf_counter()
+    before = None
+    insert_sql = None
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+        chunk = prepare_chunk(chunk, table)
+        chunk = chunk[[c for c in COLUMNS[table] if c in chunk.columns]]
+        if insert_sql is None:
+            clear_table(conn, table, if_exists)
+            before = count_rows(conn, table)
+            # duplicate IDs within a dump keep the last row; an upsert (not
+            # INSERT OR REPLACE) so the update triggers move the side tables
+            # off the replaced row
+            insert_sql = upsert_sql(table, list(chunk.columns))
+        with conn:
+            conn.executemany(insert_sql, chunk_rows(chunk))
+    rows = count_rows(conn, table) - before if before is not None else 0
+    elapsed = time.perf_counter() - start
+    return {
+        "table": table,
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+# Load every CSV found in base_path; returns per-table stats
+def stream_all(conn, base_path, chunk_size=CHUNK_SIZE, if_exists="replace", verbose=True):
+    create_schema(conn)
+    stats = []
+    for table, file_name in CSV_FILES.items():
+        csv_path = os.path.join(base_path, file_name)
+        if not os.path.exists(csv_path):
+            continue
+        result = stream_csv_to_table(conn, csv_path, table, chunk_size, if_exists)
+        if verbose:
+            print(f"{table}: {result['rows']} rows in {result['seconds']:.2f}s "
+                  f"({result['rows_per_sec']:,.0f} rows/sec)")
+        stats.append(result)
+    # refresh planner statistics for the new indexes
+    conn.execute("ANALYZE")
+    return stats
+
@@ -0,0 +1,170 @@
+import heapq
+import numpy as np
+import pandas as pd
+from expiry import now_epoch
+
+# Listings are scored per class (city, food type, quantity bin) instead of
+# one by one; quantities are binned into at most this many bins
+QUANTITY_BINS = 32
+
+# Most listings assigned to one receiver in a single run
+MAX_PER_RECEIVER = 5
+
+# Score = food-type preference + quantity fit; urgency scales the priority
+WEIGHTS = {"food_type": 1.0, "quantity": 0.5, "urgency": 1.0}
+
+
+# Unclaimed, unexpired listings (from the listing_expiry partial index)
+def load_open_listings(conn, now=None):
+    now = now_epoch() if now is None else now
+    df = pd.read_sql_query(
+        "SELECT f.Food_ID, f.Quantity, f.Location AS City, f.Food_Type, e.Expiry_Epoch "
+        "FROM listing_expiry e JOIN food_listings f ON f.Food_ID = e.Food_ID "
+        "WHERE e.Active_Claims = 0 AND e.Expiry_Epoch >= ? ORDER BY e.Expiry_Epoch",
+        conn, params=[now],
+    )
+    df["Expires_In_Hours"] = (df.pop("Expiry_Epoch") - now) / 3600
+    return df
+
+
+# Receivers plus their claim history per food type (count, mean quantity)
+def load_receivers(conn):
+    receivers = pd.read_sql_query("SELECT Receiver_ID, City FROM receivers", conn)
+    history = pd.read_sql_query(
+        "SELECT c.Receiver_ID, f.Food_Type, COUNT(*) AS Claims, AVG(f.Quantity) AS Avg_Quantity "
+        "FROM claims c JOIN food_listings f ON f.Food_ID = c.Food_ID "
+        "GROUP BY c.Receiver_ID, f.Food_Type",
+        conn,
+    )
+    return receivers, history
+
+
+# Receiver x food-type preference (smoothed share of past claims) and the
+# receiver's typical quantity (default: median listing quantity)
+def _receiver_features(receivers, history, food_types, default_quantity):
+    counts = (history.pivot_table(index="Receiver_ID", columns="Food_Type", values="Claims", aggfunc="sum")
+              .reindex(index=receivers["Receiver_ID"], columns=food_types).fillna(0).to_numpy())
+    pref = (counts + 1) / (counts.sum(axis=1, keepdims=True) + len(food_types))
+    history = history.assign(Total=history["Claims"] * history["Avg_Quantity"])
+    totals = history.groupby("Receiver_ID")[["Total", "Claims"]].sum()
+    capacity = (totals["Total"] / totals["Claims"]).reindex(receivers["Receiver_ID"])
+    return pref, capacity.fillna(default_quantity).to_numpy(dtype=float)
+
+
+# Score of food types `ft` with quantities `q` (rows) against receivers `r_pos` (columns)
+def _scores(ft, q, r_pos, pref, capacity):
+    q = np.maximum(q, 1e-9)[:, None]
+    cap = np.maximum(capacity[r_pos], 1e-9)[None, :]
+    return (WEIGHTS["food_type"] * pref[r_pos].T[ft]
+            + WEIGHTS["quantity"] * np.minimum(q, cap) / np.maximum(q, cap))
+
+
+# Quantity bin per listing and each bin's representative (mean) quantity
+def _quantity_bins(quantity):
+    edges = np.unique(np.quantile(quantity, np.linspace(0, 1, QUANTITY_BINS + 1)))
+    bins = np.clip(np.searchsorted(edges, quantity, side="right") - 1, 0, max(len(edges) - 2, 0))
+    means = pd.Series(quantity).groupby(bins).mean()
+    return bins, means.reindex(range(bins.max() + 1)).fillna(0).to_numpy()
+
+
+# Assign open listings to receivers in the same city. Listings are grouped
+# into classes (city, food type, quantity bin); each class is scored against
+# its city's receivers in one numpy pass (food-type preference from claim
+# history + quantity fit) and gets its receivers sorted best first. A greedy
+# pass over a heap of classes, keyed by best score x urgency of the class's
+# most urgent waiting listing, then hands that listing the best receiver of
+# its class that still has capacity (stale keys are re-pushed lazily).
+# Returns one row per assignment.
+def match(listings, receivers, history, max_per_receiver=MAX_PER_RECEIVER):
+    columns = ["Food_ID", "Receiver_ID", "City", "Food_Type", "Quantity", "Expires_In_Hours", "Score"]
+    if listings.empty or receivers.empty:
+        return pd.DataFrame(columns=columns)
+    listings = listings.reset_index(drop=True)
+    receivers = receivers.reset_index(drop=True)
+
+    ft_codes, food_types = pd.factorize(listings["Food_Type"].fillna(""))
+    quantity = listings["Quantity"].fillna(0).to_numpy(dtype=float)
+    pref, capacity = _receiver_features(receivers, history, list(food_types), float(np.median(quantity)))
+    q_bins, q_means = _quantity_bins(quantity)
+
+    cities = pd.Index(receivers["City"].dropna().unique())
+    l_city = cities.get_indexer(listings["City"])
+    r_city = cities.get_indexer(receivers["City"])
+    city_receivers = {c: np.flatnonzero(r_city == c) for c in range(len(cities))}
+
+    # classes of listings that have receivers in their city
+    open_pos = np.flatnonzero(l_city >= 0)
+    keys = pd.DataFrame({"city": l_city[open_pos], "ft": ft_codes[open_pos], "q": q_bins[open_pos]})
+    listing_class = np.full(len(listings), -1)
+    listing_class[open_pos] = keys.groupby(["city", "ft", "q"], sort=False).ngroup().to_numpy()
+    classes = keys.drop_duplicates().reset_index(drop=True)
+
+    # per class: receivers of its city best first, with their scores
+    ranked, ranked_scores = {}, {}
+    for c, group in classes.groupby("city"):
+        r_pos = city_receivers[c]
+        score = _scores(group["ft"].to_numpy(), q_means[group["q"].to_numpy()], r_pos, pref, capacity)
+        order = np.argsort(-score, axis=1, kind="stable")
+        for row, k in enumerate(group.index):
+            ranked[k] = r_pos[order[row]].tolist()
+            ranked_scores[k] = score[row, order[row]].tolist()
+
+    # plain Python lists / floats from here: the heap loop is scalar work
+    urgency = (1 + WEIGHTS["urgency"] / (1 + listings["Expires_In_Hours"].clip(lower=0).to_numpy() / 24)).tolist()
+    listing_class = listing_class.tolist()
+    pointer = dict.fromkeys(ranked, 0)
+    remaining = [max_per_receiver] * len(receivers)
+
+    # first receiver of class k that still has capacity (None when all full)
+    def best(k):
+        p, rs = pointer[k], ranked[k]
+        while p < len(rs) and remaining[rs[p]] == 0:
+            p += 1
+        pointer[k] = p
+        return p if p < len(rs) else None
+
+    # each class's listings, most urgent first
+    members = {}
+    for i in sorted(open_pos.tolist(), key=lambda i: -urgency[i]):
+        members.setdefault(listing_class[i], []).append(i)
+    head = dict.fromkeys(members, 0)
+
+    heap = [(-ranked_scores[k][0] * urgency[m[0]], k) for k, m in members.items()]
+    heapq.heapify(heap)
+    assigned = []
+    while heap:
+        key, k = heapq.heappop(heap)
+        p = best(k)
+        if p is None:
+            continue                                # no capacity left for this class
+        i = members[k][head[k]]
+        priority = -ranked_scores[k][p] * urgency[i]
+        if priority > key and heap and priority > heap[0][0]:
+            heapq.heappush(heap, (priority, k))     # its best receiver filled up since it was queued
+            continue
+        r = ranked[k][p]
+        remaining[r] -= 1
+        assigned.append((i, r))
+        head[k] += 1
+        if head[k] < len(members[k]):
+            p = best(k)
+            if p is not None:
+                heapq.heappush(heap, (-ranked_scores[k][p] * urgency[members[k][head[k]]], k))
+
+    if not assigned:
+        return pd.DataFrame(columns=columns)
+    li, ri = (np.array(a) for a in zip(*assigned))
+    result = listings.loc[li, ["Food_ID", "City", "Food_Type", "Quantity", "Expires_In_Hours"]].reset_index(drop=True)
+    result.insert(1, "Receiver_ID", receivers["Receiver_ID"].to_numpy()[ri])
+    # exact score of each assigned pair
+    q, cap = np.maximum(quantity[li], 1e-9), np.maximum(capacity[ri], 1e-9)
+    result["Score"] = (WEIGHTS["food_type"] * pref[ri, ft_codes[li]]
+                       + WEIGHTS["quantity"] * np.minimum(q, cap) / np.maximum(q, cap))
+    return result.sort_values("Expires_In_Hours", ignore_index=True)[columns]
+
+
+# Load open listings and receivers and compute assignments
+def match_open_listings(conn, max_per_receiver=MAX_PER_RECEIVER, now=None):
+    listings = load_open_listings(conn, now)
+    receivers, history = load_receivers(conn)
+    return match(listings, receivers, history, max_per_receiver)
@@ -0,0 +1,276 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+import pandas as pd
+
+# Every statement run through a ProfiledConnection (all pooled and writer
+# connections in database.py) is recorded: wall time from execute to the
+# last fetch, rows returned and an estimate of the bytes materialized.
+# Statements slower than SLOW_QUERY_MS also get their EXPLAIN QUERY PLAN,
+# with full-table scans flagged. Bookkeeping statements (_SKIPPED) are not
+# recorded.
+SLOW_QUERY_MS = float(os.environ.get("FOOD_WASTE_SLOW_MS", 100))
+
+# Records kept in memory per process (oldest dropped first)
+MAX_RECORDS = 5000
+
+# Rows sampled per statement (its first rows) to estimate the bytes of all
+SAMPLE_ROWS = 200
+
+# Statements worth an EXPLAIN QUERY PLAN
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+# Pragmas, transaction control and the write-version / schema lookups the
+# pools and caches run around every real query
+_SKIPPED = re.compile(
+    r"^\s*(PRAGMA|BEGIN|COMMIT|END|ROLLBACK|SAVEPOINT|RELEASE)\b|\b(table_versions|sqlite_master)\b",
+    re.IGNORECASE,
+)
+
+_records = deque(maxlen=MAX_RECORDS)
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _normalize(sql):
+    return " ".join(sql.split())
+
+
+# Normalized text of a statement worth recording, None for bookkeeping
+@lru_cache(maxsize=1024)
+def _statement(sql):
+    return None if _SKIPPED.search(sql) else _normalize(sql)
+
+
+def _row_bytes(rows):
+    return sum(len(v) if isinstance(v, (str, bytes)) else 8 for row in rows for v in row)
+
+
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_NOT_ALIAS = {"where", "on", "using", "join", "left", "inner", "cross", "group", "order", "limit",
+              "natural", "union", "having", "window"}
+
+
+# alias -> table for the FROM / JOIN clauses of a statement (newer SQLite
+# versions name tables by their alias in query plans)
+def _aliases(sql):
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        if alias and alias.lower() not in _NOT_ALIAS:
+            aliases[alias] = table
+    return aliases
+
+
+# Tables read with "SCAN <table>" (no index) in a query plan. CTEs and
+# subqueries materialized by the plan are not counted.
+def full_scans(plan, sql=""):
+    aliases = _aliases(sql)
+    derived = {m.group(2) for d in plan for m in [re.match(r"^(MATERIALIZE|CO-ROUTINE) (\S+)", d)] if m}
+    scans = []
+    for detail in plan:
+        m = re.match(r"^SCAN (?:TABLE )?(\S+)", detail)
+        if m and "USING" not in detail and "VIRTUAL TABLE" not in detail \
+                and m.group(1) not in derived and m.group(1) != "CONSTANT":
+            scans.append(aliases.get(m.group(1), m.group(1)))
+    return scans
+
+
+def _explain(conn, sql, parameters):
+    try:
+        cur = sqlite3.Cursor(conn)
+        plan = [row[-1] for row in cur.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+        cur.close()
+        return plan
+    except sqlite3.Error:
+        return []
+
+
+def _record(entry):
+    with _lock:
+        _records.append(entry)
+    for captured in getattr(_local, "captures", ()):
+        captured.append(entry)
+
+
+# Rows are counted as they are fetched; only the first SAMPLE_ROWS are sized,
+# and the byte estimate is scaled up to the full count when the statement ends
+class ProfiledCursor(sqlite3.Cursor):
+    _entry = None
+
+    def _start(self, sql, parameters, many=False):
+        self._finish()
+        text = _statement(sql)
+        if text is None:
+            return
+        self._entry = {
+            "Started": time.time(),
+            "SQL": text,
+            "Params": "(many)" if many else repr(parameters)[:200],
+            "Milliseconds": 0.0, "Rows": 0, "Bytes": 0,
+            "Slow": False, "Full_Scans": "", "Plan": "",
+        }
+        self._sql, self._params = sql, () if many else parameters
+        self._rows = self._sampled_bytes = 0
+        self._started = time.perf_counter()
+
+    def _fetched(self, rows):
+        if self._entry is not None:
+            if self._rows < SAMPLE_ROWS:
+                self._sampled_bytes += _row_bytes(rows[:SAMPLE_ROWS - self._rows])
+            self._rows += len(rows)
+
+    def _finish(self):
+        entry, self._entry = self._entry, None
+        if entry is None:
+            return
+        entry["Milliseconds"] = round((time.perf_counter() - self._started) * 1000, 3)
+        entry["Rows"] = self._rows
+        if self._rows:
+            entry["Bytes"] = self._sampled_bytes * self._rows // min(self._rows, SAMPLE_ROWS)
+        if entry["Milliseconds"] >= SLOW_QUERY_MS:
+            entry["Slow"] = True
+            if _EXPLAINABLE.match(self._sql):
+                plan = _explain(self.connection, self._sql, self._params)
+                entry["Plan"] = "; ".join(plan)
+                entry["Full_Scans"] = ", ".join(full_scans(plan, self._sql))
+        _record(entry)
+
+    def execute(self, sql, parameters=()):
+        self._start(sql, parameters)
+        super().execute(sql, parameters)
+        if self.description is None:
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._start(sql, None, many=True)
+        super().executemany(sql, seq_of_parameters)
+        self._finish()
+        return self
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is None:
+            self._finish()
+        elif self._entry is not None:
+            if self._rows < SAMPLE_ROWS:
+                self._sampled_bytes += _row_bytes((row,))
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._fetched(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._finish()
+            raise
+        if self._entry is not None:
+            if self._rows < SAMPLE_ROWS:
+                self._sampled_bytes += _row_bytes((row,))
+            self._rows += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+# sqlite3.Connection whose cursors (and execute shortcuts) are profiled
+class ProfiledConnection(sqlite3.Connection):
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# Collect the records made on this thread inside the block (worker
+# processes send them back to the parent with their results)
+@contextmanager
+def capture():
+    captured = []
+    stack = getattr(_local, "captures", None)
+    if stack is None:
+        stack = _local.captures = []
+    stack.append(captured)
+    try:
+        yield captured
+    finally:
+        stack.remove(captured)
+
+
+# Add records made elsewhere (e.g. returned by a worker process)
+def add_records(records):
+    with _lock:
+        _records.extend(records)
+
+
+def clear_profile():
+    with _lock:
+        _records.clear()
+
+
+COLUMNS = ["Started", "SQL", "Params", "Milliseconds", "Rows", "Bytes", "Slow", "Full_Scans", "Plan"]
+
+
+# Every record, newest first
+def profile_frame():
+    with _lock:
+        records = list(_records)
+    df = pd.DataFrame(records[::-1], columns=COLUMNS)
+    df["Started"] = [datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S") for t in df["Started"]]
+    return df
+
+
+# One row per distinct statement, most total time first, with the plan of
+# its slowest run
+def profile_summary(frame=None):
+    df = profile_frame() if frame is None else frame
+    if df.empty:
+        return pd.DataFrame(columns=["SQL", "Calls", "Total_ms", "Mean_ms", "Max_ms", "Rows", "Bytes",
+                                     "Slow_Calls", "Full_Scans", "Plan"])
+    slowest = df.sort_values("Milliseconds").groupby("SQL").tail(1).set_index("SQL")
+    summary = df.groupby("SQL").agg(
+        Calls=("Milliseconds", "size"),
+        Total_ms=("Milliseconds", "sum"),
+        Mean_ms=("Milliseconds", "mean"),
+        Max_ms=("Milliseconds", "max"),
+        Rows=("Rows", "sum"),
+        Bytes=("Bytes", "sum"),
+        Slow_Calls=("Slow", "sum"),
+    )
+    summary = summary.join(slowest[["Full_Scans", "Plan"]])
+    return summary.sort_values("Total_ms", ascending=False).round(3).reset_index()
+
+
+# Write every record (or the per-statement summary) to a CSV file
+def export_profile(path, summary=False):
+    (profile_summary() if summary else profile_frame()).to_csv(path, index=False)
@@ -0,0 +1,77 @@
+import pandas as pd
+
+# Default number of rows shown per page
+PAGE_SIZE = 50
+
+# Columns matched by the free-text search box
+LISTING_SEARCH_COLUMNS = ("Food_Name", "Location", "Provider_Type")
+
+
+# Escape LIKE wildcards so user text is matched literally
+def like_pattern(text):
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+# WHERE clause + params for food_listings. "All"/None/"" mean no filter.
+def listing_filters(location=None, provider_name=None, food_type=None, search=None):
+    clauses, params = [], []
+    if location not in (None, "", "All"):
+        clauses.append("Location = ?")
+        params.append(location)
+    if provider_name not in (None, "", "All"):
+        clauses.append("Provider_ID IN (SELECT Provider_ID FROM providers WHERE Name = ?)")
+        params.append(provider_name)
+    if food_type not in (None, "", "All"):
+        clauses.append("Food_Type = ?")
+        params.append(food_type)
+    if search and search.strip():
+        pattern = like_pattern(search.strip())
+        clauses.append("(" + " OR ".join(f"{c} LIKE ? ESCAPE '\\'" for c in LISTING_SEARCH_COLUMNS) + ")")
+        params.extend([pattern] * len(LISTING_SEARCH_COLUMNS))
+    return " AND ".join(clauses) or "1", params
+
+
+def count_rows(conn, table, where="1", params=()):
+    return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", list(params)).fetchone()[0]
+
+
+# One page with LIMIT/OFFSET; returns (page DataFrame, total matching rows)
+def fetch_page(conn, table, where="1", params=(), order_by="rowid", page=1, page_size=PAGE_SIZE, columns="*"):
+    page = max(int(page), 1)
+    sql = (f"SELECT {columns} FROM {table} WHERE {where} "
+           f"ORDER BY {order_by} LIMIT ? OFFSET ?")
+    df = pd.read_sql_query(sql, conn, params=list(params) + [page_size, (page - 1) * page_size])
+    return df, count_rows(conn, table, where, params)
+
+
+# Keyset page: rows with key > after (cheap at any depth, unlike large OFFSETs)
+def fetch_after(conn, table, key, after=None, where="1", params=(), page_size=PAGE_SIZE, columns="*"):
+    params = list(params)
+    if after is not None:
+        where = f"({where}) AND {key} > ?"
+        params.append(after)
+    sql = f"SELECT {columns} FROM {table} WHERE {where} ORDER BY {key} LIMIT ?"
+    return pd.read_sql_query(sql, conn, params=params + [page_size])
+
+
+def fetch_listings_page(conn, page=1, page_size=PAGE_SIZE, **filters):
+    where, params = listing_filters(**filters)
+    return fetch_page(conn, "food_listings", where, params, "Food_ID", page, page_size)
+
+
+def fetch_listings_after(conn, after_id=None, page_size=PAGE_SIZE, **filters):
+    where, params = listing_filters(**filters)
+    return fetch_after(conn, "food_listings", "Food_ID", after_id, where, params, page_size)
+
+
+# Distinct non-null values for a filter dropdown (index-only scan when indexed)
+def distinct_values(conn, table, column):
+    rows = conn.execute(
+        f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY {column}"
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def page_count(total, page_size=PAGE_SIZE):
+    return max((total + page_size - 1) // page_size, 1)
@@ -0,0 +1,486 @@
+from functools import lru_cache
+import pandas as pd
+from expiry import NOW_EPOCH_SQL
+from wastage import wastage_sql
+
+# One catalog of named report queries shared by the Streamlit dashboard,
+# app.py, run_queries.py and analysis_queries.py.
+#
+# "sql" has a {where} (or {and}, when the query already has a WHERE) slot
+# that receives the conditions of the filters a call uses; "filters" maps
+# each supported filter (city, start, end, status) to its condition;
+# "params" are query-specific values with defaults; "limit" a default row
+# limit. Rendered SQL text is memoized, so each (query, filter set) is one
+# fixed statement that sqlite3 prepares once per connection and then reuses
+# from its statement cache (database.STATEMENT_CACHE).
+FILTERS = ("city", "start", "end", "status")
+
+_CLAIM_DATES = {"start": "c.Timestamp >= :start", "end": "c.Timestamp < date(:end, '+1 day')"}
+
+CATALOG = {
+    # --- people and places -------------------------------------------------
+    "providers_receivers_per_city": {
+        "sql": """
+            SELECT NULLIF(City, '') AS City, Provider_Count, Receiver_Count
+            FROM city_counts
+            WHERE (Provider_Count > 0 OR Receiver_Count > 0) {and}
+            ORDER BY City""",
+        "filters": {"city": "City = :city"},
+    },
+    "providers_per_city": {
+        "sql": """
+            SELECT NULLIF(City, '') AS City, Provider_Count
+            FROM city_counts
+            WHERE Provider_Count > 0 {and}
+            ORDER BY Provider_Count DESC""",
+        "filters": {"city": "City = :city"},
+    },
+    "receivers_per_city": {
+        "sql": """
+            SELECT NULLIF(City, '') AS City, Receiver_Count
+            FROM city_counts
+            WHERE Receiver_Count > 0 {and}
+            ORDER BY Receiver_Count DESC""",
+        "filters": {"city": "City = :city"},
+    },
+    "providers_by_type": {
+        "sql": """
+            SELECT NULLIF(Type, '') AS Provider_Type, Count
+            FROM provider_type_counts
+            WHERE Count > 0
+            ORDER BY Count DESC""",
+        "filters": {},
+    },
+    "receivers_by_type": {
+        "sql": """
+            SELECT Type AS Receiver_Type, COUNT(*) AS Count
+            FROM receivers
+            {where}
+            GROUP BY Type
+            ORDER BY Count DESC""",
+        "filters": {"city": "City = :city"},
+    },
+    "providers": {
+        "sql": "SELECT * FROM providers {where} ORDER BY Provider_ID",
+        "filters": {"city": "City = :city"},
+    },
+    "receivers": {
+        "sql": "SELECT * FROM receivers {where} ORDER BY Receiver_ID",
+        "filters": {"city": "City = :city"},
+    },
+    "provider_contacts": {
+        "sql": "SELECT Name, Contact, Address FROM providers {where} ORDER BY Name",
+        "filters": {"city": "City = :city"},
+    },
+
+    # --- listings ----------------------------------------------------------
+    "total_quantity": {
+        "sql": """
+            SELECT SUM(Total_Quantity) AS Total_Quantity
+            FROM location_stats
+            WHERE Listings_Count > 0 {and}""",
+        "filters": {"city": "Location = :city"},
+    },
+    "average_quantity_per_listing": {
+        "sql": """
+            SELECT SUM(Total_Quantity) * 1.0 / NULLIF(SUM(Listings_Count), 0) AS Avg_Quantity
+            FROM location_stats
+            WHERE Listings_Count > 0 {and}""",
+        "filters": {"city": "Location = :city"},
+    },
+    "listings_per_city": {
+        "sql": """
+            SELECT NULLIF(Location, '') AS City, Listings_Count
+            FROM location_stats
+            WHERE Listings_Count > 0 {and}
+            ORDER BY Listings_Count DESC""",
+        "filters": {"city": "Location = :city"},
+    },
+    "quantity_per_city": {
+        "sql": """
+            SELECT NULLIF(Location, '') AS City, Total_Quantity
+            FROM location_stats
+            WHERE Listings_Count > 0 {and}
+            ORDER BY Total_Quantity DESC""",
+        "filters": {"city": "Location = :city"},
+    },
+    "food_type_counts": {
+        "sql": """
+            SELECT NULLIF(Food_Type, '') AS Food_Type, Count
+            FROM food_type_counts
+            WHERE Count > 0
+            ORDER BY Count DESC""",
+        "filters": {},
+    },
+    "listings_by_meal_type": {
+        "sql": """
+            SELECT Meal_Type, COUNT(*) AS Count
+            FROM food_listings
+            {where}
+            GROUP BY Meal_Type
+            ORDER BY Count DESC""",
+        "filters": {"city": "Location = :city"},
+    },
+    "listings_by_provider_type": {
+        "sql": """
+            SELECT Provider_Type, COUNT(*) AS Listings, AVG(Quantity) AS Avg_Quantity
+            FROM food_listings
+            {where}
+            GROUP BY Provider_Type
+            ORDER BY Listings DESC""",
+        "filters": {"city": "Location = :city"},
+    },
+    "meal_distribution_by_city": {
+        "sql": """
+            SELECT Location AS City, Meal_Type, COUNT(*) AS Count
+            FROM food_listings
+            {where}
+            GROUP BY Location, Meal_Type
+            ORDER BY City""",
+        "filters": {"city": "Location = :city"},
+    },
+    "top_food_items": {
+        "sql": """
+            SELECT Food_Name, COUNT(*) AS Times_Listed
+            FROM food_listings
+            {where}
+            GROUP BY Food_Name
+            ORDER BY Times_Listed DESC""",
+        "filters": {"city": "Location = :city"},
+    },
+    "unclaimed_listings": {
+        "sql": """
+            SELECT f.Food_ID, f.Food_Name, f.Quantity, f.Expiry_Date, f.Location
+            FROM food_listings f
+            WHERE NOT EXISTS (SELECT 1 FROM claims c WHERE c.Food_ID = f.Food_ID) {and}
+            ORDER BY f.Food_ID""",
+        "filters": {"city": "f.Location = :city"},
+    },
+    "expired_listings": {
+        "sql": f"""
+            SELECT f.Food_Name, f.Expiry_Date, f.Location
+            FROM listing_expiry e
+            JOIN food_listings f ON f.Food_ID = e.Food_ID
+            WHERE e.Expiry_Epoch < {NOW_EPOCH_SQL} {{and}}
+            ORDER BY e.Expiry_Epoch""",
+        "filters": {"city": "f.Location = :city"},
+    },
+    # everything expiring by now + :days (already expired listings included)
+    "expiring_within_days": {
+        "sql": f"""
+            SELECT f.*
+            FROM listing_expiry e
+            JOIN food_listings f ON f.Food_ID = e.Food_ID
+            WHERE e.Expiry_Epoch <= {NOW_EPOCH_SQL} + :days * 86400 {{and}}
+            ORDER BY e.Expiry_Epoch""",
+        "filters": {"city": "f.Location = :city"},
+        "params": {"days": 3},
+    },
+    "wastage_trend": {
+        "sql": wastage_sql(("Week",)),
+        "filters": {},
+    },
+
+    # --- providers ---------------------------------------------------------
+    "top_providers_by_listings": {
+        "sql": """
+            SELECT p.Name AS Provider, s.Listings_Count AS Listings
+            FROM provider_stats s
+            JOIN providers p ON p.Provider_ID = s.Provider_ID
+            WHERE s.Listings_Count > 0 {and}
+            ORDER BY Listings DESC""",
+        "filters": {"city": "p.City = :city"},
+    },
+    "top_providers_by_quantity": {
+        "sql": """
+            SELECT p.Name AS Provider, s.Total_Donated
+            FROM provider_stats s
+            JOIN providers p ON p.Provider_ID = s.Provider_ID
+            WHERE s.Listings_Count > 0 {and}
+            ORDER BY s.Total_Donated DESC""",
+        "filters": {"city": "p.City = :city"},
+    },
+    "top_providers_by_successful_claims": {
+        "sql": """
+            SELECT p.Name AS Provider, s.Successful_Claims
+            FROM provider_stats s
+            JOIN providers p ON p.Provider_ID = s.Provider_ID
+            WHERE s.Successful_Claims > 0 {and}
+            ORDER BY s.Successful_Claims DESC""",
+        "filters": {"city": "p.City = :city"},
+    },
+
+    # --- claims ------------------------------------------------------------
+    "claim_status_counts": {
+        "sql": """
+            SELECT NULLIF(Status, '') AS Status, Count,
+                   Count * 100.0 / (SELECT SUM(Count) FROM claim_status_counts) AS Percentage
+            FROM claim_status_counts
+            WHERE Count > 0
+            ORDER BY Count DESC""",
+        "filters": {},
+    },
+    "claims_per_food_item": {
+        "sql": """
+            SELECT f.Food_Name, s.Claim_Count
+            FROM food_claim_counts s
+            JOIN food_listings f ON f.Food_ID = s.Food_ID
+            WHERE s.Claim_Count > 0 {and}
+            ORDER BY s.Claim_Count DESC""",
+        "filters": {"city": "f.Location = :city"},
+    },
+    "most_claimed_food_names": {
+        "sql": """
+            SELECT f.Food_Name, COUNT(*) AS Claim_Count
+            FROM claims c
+            JOIN food_listings f ON f.Food_ID = c.Food_ID
+            {where}
+            GROUP BY f.Food_Name
+            ORDER BY Claim_Count DESC""",
+        "filters": {"city": "f.Location = :city", "status": "c.Status = :status", **_CLAIM_DATES},
+    },
+    "claims_by_meal_type": {
+        "sql": """
+            SELECT NULLIF(Meal_Type, '') AS Meal_Type, Claim_Count
+            FROM meal_type_claims
+            WHERE Claim_Count > 0
+            ORDER BY Claim_Count DESC""",
+        "filters": {},
+    },
+    "top_locations_by_claims": {
+        "sql": """
+            SELECT NULLIF(Location, '') AS City, Claim_Count
+            FROM location_stats
+            WHERE Claim_Count > 0
+            ORDER BY Claim_Count DESC""",
+        "filters": {},
+    },
+    "top_receivers_by_claims": {
+        "sql": """
+            SELECT r.Name AS Receiver, s.Claim_Count
+            FROM receiver_claim_stats s
+            JOIN receivers r ON r.Receiver_ID = s.Receiver_ID
+            WHERE s.Claim_Count > 0 {and}
+            ORDER BY s.Claim_Count DESC""",
+        "filters": {"city": "r.City = :city"},
+    },
+    # every receiver, including those without claims
+    "claims_per_receiver": {
+        "sql": """
+            SELECT r.Name AS Receiver, IFNULL(s.Claim_Count, 0) AS Claim_Count
+            FROM receivers r
+            LEFT JOIN receiver_claim_stats s ON s.Receiver_ID = r.Receiver_ID
+            {where}
+            ORDER BY Claim_Count DESC""",
+        "filters": {"city": "r.City = :city"},
+    },
+    "avg_quantity_per_receiver": {
+        "sql": """
+            SELECT r.Name AS Receiver, s.Quantity_Sum * 1.0 / s.Matched_Claims AS Avg_Quantity_Claimed
+            FROM receiver_claim_stats s
+            JOIN receivers r ON r.Receiver_ID = s.Receiver_ID
+            WHERE s.Matched_Claims > 0 {and}
+            ORDER BY Avg_Quantity_Claimed DESC""",
+        "filters": {"city": "r.City = :city"},
+    },
+    "top_receivers_by_food_type": {
+        "sql": """
+            SELECT r.Name AS Receiver, COUNT(*) AS Claim_Count
+            FROM claims c
+            JOIN food_listings f ON f.Food_ID = c.Food_ID
+            JOIN receivers r ON r.Receiver_ID = c.Receiver_ID
+            WHERE f.Food_Type = :food_type {and}
+            GROUP BY r.Receiver_ID
+            ORDER BY Claim_Count DESC""",
+        "filters": {"city": "r.City = :city", "status": "c.Status = :status", **_CLAIM_DATES},
+        "params": {"food_type": "Non-Vegetarian"},
+    },
+    "receivers_most_expired_claims": {
+        "sql": f"""
+            SELECT r.Name AS Receiver, COUNT(*) AS Expired_Claims
+            FROM listing_expiry e
+            JOIN claims c ON c.Food_ID = e.Food_ID
+            JOIN receivers r ON r.Receiver_ID = c.Receiver_ID
+            WHERE e.Expiry_Epoch < {NOW_EPOCH_SQL} {{and}}
+            GROUP BY r.Receiver_ID
+            ORDER BY Expired_Claims DESC""",
+        "filters": {"city": "r.City = :city", "status": "c.Status = :status", **_CLAIM_DATES},
+    },
+    "claims_per_day": {
+        "sql": """
+            SELECT Bucket AS Claim_Date, SUM(Claims) AS Claims
+            FROM claim_rollups
+            WHERE Grain = 'day' AND Bucket <> '' {and}
+            GROUP BY Bucket
+            HAVING SUM(Claims) <> 0
+            ORDER BY Claim_Date DESC""",
+        "filters": {"city": "City = :city", "status": "Status = :status",
+                    "start": "Bucket >= :start", "end": "Bucket <= :end"},
+    },
+    "claims_per_month": {
+        "sql": """
+            SELECT Bucket AS Claim_Month, SUM(Claims) AS Claims
+            FROM claim_rollups
+            WHERE Grain = 'month' AND Bucket <> '' {and}
+            GROUP BY Bucket
+            HAVING SUM(Claims) <> 0
+            ORDER BY Claim_Month""",
+        "filters": {"city": "City = :city", "status": "Status = :status",
+                    "start": "Bucket >= substr(:start, 1, 7)", "end": "Bucket <= substr(:end, 1, 7)"},
+    },
+    "provider_receiver_city_pairs": {
+        "sql": """
+            SELECT p.City AS Provider_City, r.City AS Receiver_City, COUNT(*) AS Claims
+            FROM claims c
+            JOIN food_listings f ON f.Food_ID = c.Food_ID
+            JOIN providers p ON p.Provider_ID = f.Provider_ID
+            JOIN receivers r ON r.Receiver_ID = c.Receiver_ID
+            {where}
+            GROUP BY p.City, r.City
+            ORDER BY Claims DESC""",
+        "filters": {"city": "p.City = :city", "status": "c.Status = :status", **_CLAIM_DATES},
+    },
+    "claims_detail": {
+        "sql": """
+            SELECT c.Claim_ID, p.Name AS Provider, r.Name AS Receiver, c.Status, c.Timestamp
+            FROM claims c
+            JOIN food_listings f ON f.Food_ID = c.Food_ID
+            JOIN providers p ON p.Provider_ID = f.Provider_ID
+            JOIN receivers r ON r.Receiver_ID = c.Receiver_ID
+            {where}
+            ORDER BY c.Claim_ID""",
+        "filters": {"city": "f.Location = :city", "status": "c.Status = :status", **_CLAIM_DATES},
+    },
+}
+
+# What each entry point shows: (title, catalog name, fixed filters / params)
+ENTRY_POINTS = {
+    "streamlit": [
+        ("Q1_Providers_and_Receivers_per_City", "providers_receivers_per_city", {}),
+        ("Q2_Most_common_provider_type", "providers_by_type", {"limit": 1}),
+        ("Q3_Provider_contacts_in_city", "provider_contacts", {"city": "Mumbai"}),
+        ("Q4_Receivers_with_most_claims", "top_receivers_by_claims", {}),
+        ("Q5_Total_quantity_available", "total_quantity", {}),
+        ("Q6_City_with_most_listings", "listings_per_city", {"limit": 1}),
+        ("Q7_Most_common_food_types", "food_type_counts", {}),
+        ("Q8_Claims_per_food_item", "claims_per_food_item", {}),
+        ("Q9_Provider_with_highest_successful_claims", "top_providers_by_successful_claims", {"limit": 1}),
+        ("Q10_Claim_status_percentages", "claim_status_counts", {}),
+        ("Q11_Avg_quantity_claimed_per_receiver", "avg_quantity_per_receiver", {}),
+        ("Q12_Most_claimed_meal_type", "claims_by_meal_type", {"limit": 1}),
+        ("Q13_Total_quantity_donated_by_provider", "top_providers_by_quantity", {}),
+        ("Q14_Highest_demand_location_based_on_claims", "top_locations_by_claims", {"limit": 1}),
+        ("Q15_Trends_in_wastage", "wastage_trend", {}),
+    ],
+    "app": [
+        ("1. Providers and Receivers count per city", "providers_receivers_per_city", {}),
+        ("2. Provider type contributing most food", "listings_by_provider_type", {"limit": 1}),
+        ("3. Cities with most food listings", "listings_per_city", {"limit": 5}),
+        ("4. Most common meal type", "listings_by_meal_type", {"limit": 1}),
+        ("5. Top 5 most listed food items", "top_food_items", {"limit": 5}),
+        ("6. Number of food claims per receiver", "claims_per_receiver", {}),
+        ("7. Unclaimed food items", "unclaimed_listings", {}),
+        ("8. Providers who contributed most", "top_providers_by_listings", {"limit": 5}),
+        ("9. List all expired food items", "expired_listings", {}),
+        ("10. Food type (Veg/Non-Veg) summary", "food_type_counts", {}),
+        ("11. Meal distribution by city", "meal_distribution_by_city", {}),
+        ("12. Receivers who claimed most Non-Veg food", "top_receivers_by_food_type", {"limit": 5}),
+        ("13. Datewise total food claims", "claims_per_day", {}),
+        ("14. Provider-Receiver city wise mapping", "provider_receiver_city_pairs", {}),
+        ("15. Food claims status summary", "claim_status_counts", {}),
+    ],
+    "run_queries": [
+        ("providers_per_city", "providers_per_city", {}),
+        ("receivers_per_city", "receivers_per_city", {}),
+        ("providers_by_type", "providers_by_type", {}),
+        ("receivers_by_type", "receivers_by_type", {}),
+        ("listings_by_provider_type", "listings_by_provider_type", {}),
+        ("most_common_food_type", "food_type_counts", {}),
+        ("claims_by_status", "claim_status_counts", {}),
+        ("top_providers_by_listings", "top_providers_by_listings", {}),
+        ("top_receivers_by_claims", "top_receivers_by_claims", {}),
+        ("avg_quantity_by_provider_type", "listings_by_provider_type", {}),
+        ("claims_by_month", "claims_per_month", {}),
+        ("expired_food_listings", "expired_listings", {}),
+        ("receivers_most_expired_claims", "receivers_most_expired_claims", {}),
+        ("meals_by_meal_type", "listings_by_meal_type", {}),
+        ("top_providers_by_quantity", "top_providers_by_quantity", {}),
+    ],
+    "analysis": [
+        ("All Providers", "providers", {}),
+        ("All Receivers", "receivers", {}),
+        ("Total Quantity of Food Available", "total_quantity", {}),
+        ("Count of Food Items by Type", "food_type_counts", {}),
+        ("Count of Food Items by Meal Type", "listings_by_meal_type", {}),
+        ("Food Expiring in Next 3 Days", "expiring_within_days", {"days": 3}),
+        ("Top 5 Providers by Quantity Donated", "top_providers_by_quantity", {"limit": 5}),
+        ("Claims Count by Status", "claim_status_counts", {}),
+        ("Most Claimed Food Items", "most_claimed_food_names", {}),
+        ("Providers in Delhi", "providers", {"city": "Delhi"}),
+        ("Receivers in Delhi", "receivers", {"city": "Delhi"}),
+        ("Food Availability by City", "quantity_per_city", {}),
+        ("Average Quantity per Listing", "average_quantity_per_listing", {}),
+        ("Receivers Who Claimed Most Items", "top_receivers_by_claims", {}),
+        ("Completed Claims with Provider & Receiver", "claims_detail", {"status": "Completed"}),
+        ("Providers and Receivers per City", "providers_receivers_per_city", {}),
+    ],
+}
+
+
+@lru_cache(maxsize=None)
+def _render(name, active, limited):
+    spec = CATALOG[name]
+    conditions = [spec["filters"][f] for f in active]
+    sql = spec["sql"].replace("{where}", "WHERE " + " AND ".join(conditions) if conditions else "")
+    sql = sql.replace("{and}", "AND " + " AND ".join(conditions) if conditions else "")
+    return sql + ("\n            LIMIT :limit" if limited else "")
+
+
+def _date(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+# Filters catalog query `name` supports
+def supported_filters(name):
+    return set(CATALOG[name]["filters"])
+
+
+# (sql, params) for catalog query `name`. Filters left as None are not
+# applied; a filter the query does not support raises ValueError. Query
+# specific params (e.g. days, food_type) override the query's defaults.
+def query_sql(name, city=None, start=None, end=None, status=None, limit=None, **params):
+    spec = CATALOG[name]
+    values = {"city": city, "start": start, "end": end, "status": status}
+    active = tuple(f for f in FILTERS if values[f] is not None)
+    unsupported = [f for f in active if f not in spec["filters"]]
+    if unsupported:
+        raise ValueError(f"{name} does not support filter(s): {', '.join(unsupported)}")
+    unknown = set(params) - set(spec.get("params", {}))
+    if unknown:
+        raise ValueError(f"{name} has no parameter(s): {', '.join(sorted(unknown))}")
+    limit = limit if limit is not None else spec.get("limit")
+    bound = {**spec.get("params", {}), **params}
+    bound.update({f: _date(values[f]) if f in ("start", "end") else values[f] for f in active})
+    if limit:
+        bound["limit"] = int(limit)
+    return _render(name, active, bool(limit)), bound
+
+
+# Run catalog query `name` into a DataFrame
+def run_query(conn, name, **filters):
+    sql, params = query_sql(name, **filters)
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+# title -> (sql, params) for an entry point. `filters` (city, start, end,
+# status, limit) apply to the queries that support them and override each
+# entry's own values, except that the smaller row limit wins.
+def entry_queries(entry_point, **filters):
+    out = {}
+    for title, name, fixed in ENTRY_POINTS[entry_point]:
+        applicable = {k: v for k, v in filters.items()
+                      if v is not None and (k == "limit" or k in CATALOG[name]["filters"])}
+        if applicable.get("limit") and fixed.get("limit"):
+            applicable["limit"] = min(applicable["limit"], fixed["limit"])
+        out[title] = query_sql(name, **{**fixed, **applicable})
+    return out
@@ -0,0 +1,110 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import pandas as pd
+from database import read_connection
+from exports import EXPORT_FORMATS, export_query
+from profiling import add_records, capture
+
+# Default number of concurrent queries / serializer processes
+WORKERS = os.cpu_count() or 4
+
+
+# Run one query on a pooled read-only connection. SQLite releases the GIL
+# while stepping a statement, so queries on separate connections overlap.
+def _run_query(db_path, sql, params):
+    start = time.perf_counter()
+    try:
+        with read_connection(db_path) as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+        error = None
+    except Exception as e:
+        df, error = None, str(e)
+    return df, error, time.perf_counter() - start
+
+
+# Runs in a worker process (module-level so it pickles)
+def _serialize(serialize, name, df):
+    start = time.perf_counter()
+    output = serialize(name, df)
+    return output, time.perf_counter() - start
+
+
+# Serializer for text reports (module-level so it can run in the process pool)
+def format_text(name, df):
+    if df.empty:
+        return f"\n=== {name} ===\nNo data found.\n"
+    return f"\n=== {name} ===\n{df.to_string(index=False)}\n"
+
+
+# Run every query concurrently on read-only connections and hand each result
+# to `serialize` in a process pool as soon as it arrives. `queries` maps
+# name -> sql or name -> (sql, params). Returns one record per query, in
+# catalog order: name, rows, query_seconds, write_seconds, output, error.
+def run_reports(db_path, queries, serialize, workers=None, processes=None):
+    workers = workers or WORKERS
+    processes = processes or WORKERS
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as threads, \
+            ProcessPoolExecutor(max_workers=processes) as pool:
+        running = {}
+        for name, query in queries.items():
+            sql, params = query if isinstance(query, tuple) else (query, None)
+            running[threads.submit(_run_query, db_path, sql, params)] = name
+
+        writing = {}
+        for future in as_completed(running):
+            name = running[future]
+            df, error, seconds = future.result()
+            results[name] = {"name": name, "rows": 0 if df is None else len(df),
+                             "query_seconds": seconds, "write_seconds": 0.0,
+                             "output": None, "error": error}
+            if df is not None:
+                writing[name] = pool.submit(_serialize, serialize, name, df)
+
+        for name, future in writing.items():
+            try:
+                output, seconds = future.result()
+                results[name].update(output=output, write_seconds=seconds)
+            except Exception as e:
+                results[name]["error"] = str(e)
+    return [results[name] for name in queries]
+
+
+# Per-query timings as a DataFrame (for printing / saving alongside the report)
+def timings_frame(results):
+    return pd.DataFrame(results, columns=["name", "rows", "query_seconds", "write_seconds", "error"])
+
+
+# Runs in a worker process: stream one query straight from its cursor to a
+# file; the statement's profile records travel back with the stats
+def _export_file(db_path, sql, params, path, fmt):
+    with capture() as records, read_connection(db_path) as conn:
+        stats = export_query(conn, sql, path, fmt, params)
+    stats["profile"] = records
+    return stats
+
+
+# Export every query to folder/<name>.<ext> in a process pool. Each worker
+# has its own read-only connection and streams rows in batches, so no result
+# is ever held whole in memory or pickled between processes.
+def run_exports(db_path, queries, folder, fmt="xlsx", processes=None):
+    ext = EXPORT_FORMATS[fmt][0]
+    results = {}
+    with ProcessPoolExecutor(max_workers=processes or WORKERS) as pool:
+        running = {}
+        for name, query in queries.items():
+            sql, params = query if isinstance(query, tuple) else (query, None)
+            path = os.path.join(folder, f"{name}.{ext}")
+            running[pool.submit(_export_file, os.path.abspath(db_path), sql, params, path, fmt)] = (name, path)
+        for future in as_completed(running):
+            name, path = running[future]
+            try:
+                stats = future.result()
+                add_records(stats.pop("profile"))
+                results[name] = {"name": name, "rows": stats["rows"], "query_seconds": stats["seconds"],
+                                 "write_seconds": 0.0, "output": path, "error": None}
+            except Exception as e:
+                results[name] = {"name": name, "rows": 0, "query_seconds": 0.0,
+                                 "write_seconds": 0.0, "output": None, "error": str(e)}
+    return [results[name] for name in queries]
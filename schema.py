@@ -0,0 +1,205 @@
+import sqlite3
+
+# Bumped whenever the DDL below changes; stored in PRAGMA user_version
+SCHEMA_VERSION = 3
+
+# Typed tables. Each *_ID is an INTEGER PRIMARY KEY (an alias for SQLite's
+# rowid), so lookups and joins on it are B-tree seeks instead of scans.
+# AUTOINCREMENT makes the database hand out new IDs atomically inside the
+# INSERT and never reuses the ID of a deleted row.
+TABLES = {
+    "providers": """
+        CREATE TABLE IF NOT EXISTS providers (
+            Provider_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Name        TEXT,
+            Type        TEXT,
+            Address     TEXT,
+            City        TEXT,
+            Contact     TEXT
+        )
+    """,
+    "receivers": """
+        CREATE TABLE IF NOT EXISTS receivers (
+            Receiver_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Name        TEXT,
+            Type        TEXT,
+            City        TEXT,
+            Contact     TEXT
+        )
+    """,
+    "food_listings": """
+        CREATE TABLE IF NOT EXISTS food_listings (
+            Food_ID       INTEGER PRIMARY KEY AUTOINCREMENT,
+            Food_Name     TEXT,
+            Quantity      INTEGER,
+            Expiry_Date   TEXT,
+            Provider_ID   INTEGER REFERENCES providers(Provider_ID),
+            Provider_Type TEXT,
+            Location      TEXT,
+            Food_Type     TEXT,
+            Meal_Type     TEXT
+        )
+    """,
+    "claims": """
+        CREATE TABLE IF NOT EXISTS claims (
+            Claim_ID    INTEGER PRIMARY KEY AUTOINCREMENT,
+            Food_ID     INTEGER REFERENCES food_listings(Food_ID),
+            Receiver_ID INTEGER REFERENCES receivers(Receiver_ID),
+            Status      TEXT,
+            Timestamp   TEXT
+        )
+    """,
+}
+
+# Column order per table (used by loaders and the migration)
+COLUMNS = {
+    "providers": ["Provider_ID", "Name", "Type", "Address", "City", "Contact"],
+    "receivers": ["Receiver_ID", "Name", "Type", "City", "Contact"],
+    "food_listings": ["Food_ID", "Food_Name", "Quantity", "Expiry_Date", "Provider_ID",
+                      "Provider_Type", "Location", "Food_Type", "Meal_Type"],
+    "claims": ["Claim_ID", "Food_ID", "Receiver_ID", "Status", "Timestamp"],
+}
+
+PRIMARY_KEYS = {
+    "providers": "Provider_ID",
+    "receivers": "Receiver_ID",
+    "food_listings": "Food_ID",
+    "claims": "Claim_ID",
+}
+
+# Indexes chosen from the WHERE / JOIN / GROUP BY columns of the existing queries
+INDEXES = [
+    # City filters (Q3, Contact search) and per-city counts
+    "CREATE INDEX IF NOT EXISTS idx_providers_city ON providers(City)",
+    "CREATE INDEX IF NOT EXISTS idx_providers_type ON providers(Type)",
+    # provider-name filter on the Dashboard
+    "CREATE INDEX IF NOT EXISTS idx_providers_name ON providers(Name)",
+    "CREATE INDEX IF NOT EXISTS idx_receivers_city ON receivers(City)",
+    "CREATE INDEX IF NOT EXISTS idx_receivers_type ON receivers(Type)",
+    # listings -> providers join; Quantity included so SUM/COUNT per provider is covered
+    "CREATE INDEX IF NOT EXISTS idx_listings_provider ON food_listings(Provider_ID, Quantity)",
+    "CREATE INDEX IF NOT EXISTS idx_listings_location ON food_listings(Location, Meal_Type)",
+    "CREATE INDEX IF NOT EXISTS idx_listings_food_type ON food_listings(Food_Type)",
+    "CREATE INDEX IF NOT EXISTS idx_listings_meal_type ON food_listings(Meal_Type)",
+    "CREATE INDEX IF NOT EXISTS idx_listings_provider_type ON food_listings(Provider_Type, Quantity)",
+    "CREATE INDEX IF NOT EXISTS idx_listings_expiry ON food_listings(Expiry_Date)",
+    # claims -> listings / receivers joins, status filters and monthly grouping
+    "CREATE INDEX IF NOT EXISTS idx_claims_food ON claims(Food_ID, Status)",
+    "CREATE INDEX IF NOT EXISTS idx_claims_receiver ON claims(Receiver_ID)",
+    "CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(Status)",
+    "CREATE INDEX IF NOT EXISTS idx_claims_timestamp ON claims(Timestamp)",
+]
+
+
+# Create any missing tables and indexes (safe to call on every start)
+def create_schema(conn):
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    migrate(conn)
+    with conn:
+        for ddl in TABLES.values():
+            conn.execute(ddl)
+        for ddl in INDEXES:
+            conn.execute(ddl)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    if current != SCHEMA_VERSION:
+        conn.execute("ANALYZE")
+
+
+def _table_exists(conn, table):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+# Tables created by DataFrame.to_sql (no PK) or by schema v1/v2 (no AUTOINCREMENT)
+def _needs_rebuild(conn, table):
+    has_pk = any(col[5] for col in conn.execute(f"PRAGMA table_info({table})"))
+    sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    return not has_pk or "AUTOINCREMENT" not in sql.upper()
+
+
+# Rows whose foreign keys point at missing parents, as {table: count}
+def orphan_counts(conn):
+    counts = {}
+    for row in conn.execute("PRAGMA foreign_key_check"):
+        counts[row[0]] = counts.get(row[0], 0) + 1
+    return counts
+
+
+def warn_orphans(conn):
+    counts = orphan_counts(conn)
+    if counts:
+        tables = ", ".join(f"{t}: {n}" for t, n in sorted(counts.items()))
+        print(f"Warning: {sum(counts.values())} rows reference missing parents ({tables})")
+    return counts
+
+
+# Copy the rows of `source` into `table`; `conflict` is REPLACE (last row per
+# ID wins) or IGNORE (rows already in `table` win)
+def _copy_rows(conn, table, source, conflict):
+    old_cols = {col[1] for col in conn.execute(f"PRAGMA table_info({source})")}
+    col_list = ", ".join(c for c in COLUMNS[table] if c in old_cols)
+    conn.execute(
+        f"INSERT OR {conflict} INTO {table} ({col_list}) "
+        f"SELECT {col_list} FROM {source} WHERE {PRIMARY_KEYS[table]} IS NOT NULL"
+    )
+
+
+# Rebuild outdated tables in place. Rows are copied into the typed table;
+# duplicate IDs keep the last row seen. Each table is rebuilt in one
+# transaction with foreign keys off (SQLite commits DDL outside the implicit
+# transaction sqlite3 opens, so a failing copy would strand the rows), and
+# rows pointing at missing parents are reported afterwards, not rejected.
+# A {table}_legacy left behind by an interrupted run is merged back first.
+# Indexes and triggers go with the old table and are recreated by
+# create_schema() / create_tables().
+def migrate(conn):
+    steps = []
+    for table, ddl in TABLES.items():
+        legacy = f"{table}_legacy"
+        if _table_exists(conn, legacy):
+            steps.append((table, ddl, legacy, False))
+        elif _table_exists(conn, table) and _needs_rebuild(conn, table):
+            steps.append((table, ddl, legacy, True))
+    if not steps:
+        return
+    enforce = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    # keep FK references in other tables pointing at the new table
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        for table, ddl, legacy, rebuild in steps:
+            conn.execute("BEGIN")
+            try:
+                if rebuild:
+                    conn.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+                    conn.execute(ddl)
+                    _copy_rows(conn, table, legacy, "REPLACE")
+                else:
+                    # rows written to the new table since the interrupted run win
+                    conn.execute(ddl)
+                    _copy_rows(conn, table, legacy, "IGNORE")
+                conn.execute(f"DROP TABLE {legacy}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            # a resumed table may itself still be outdated
+            if not rebuild and _needs_rebuild(conn, table):
+                steps.append((table, ddl, legacy, True))
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+        if enforce:
+            conn.execute("PRAGMA foreign_keys = ON")
+    warn_orphans(conn)
+
+if __name__ == "__main__":
+    import sys
+    db = sys.argv[1] if len(sys.argv) > 1 else "food_waste.db"
+    conn = sqlite3.connect(db)
+    create_schema(conn)
+    conn.close()
+    print("Schema ready at:", db)
@@ -0,0 +1,140 @@
+import json
+import re
+import sqlite3
+from contextlib import contextmanager
+import pandas as pd
+
+# FTS5 indexes over the searchable text columns. They are external-content
+# tables (the text lives only in the base table) kept in sync by triggers,
+# with 2- and 3-character prefix indexes so "bre*" style queries are cheap.
+FTS_INDEXES = {
+    "listings_fts": {
+        "table": "food_listings",
+        "key": "Food_ID",
+        "columns": ["Food_Name", "Location", "Provider_Type"],
+    },
+    "providers_fts": {
+        "table": "providers",
+        "key": "Provider_ID",
+        "columns": ["Name", "City"],
+    },
+}
+
+
+def _index_sql(name, spec):
+    table, key, cols = spec["table"], spec["key"], spec["columns"]
+    col_list = ", ".join(cols)
+    new_vals = ", ".join(f"new.{c}" for c in cols)
+    old_vals = ", ".join(f"old.{c}" for c in cols)
+    delete = (f"INSERT INTO {name} ({name}, rowid, {col_list}) "
+              f"VALUES ('delete', old.{key}, {old_vals});")
+    insert = f"INSERT INTO {name} (rowid, {col_list}) VALUES (new.{key}, {new_vals});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5("
+        f"{col_list}, content='{table}', content_rowid='{key}', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{name}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{name}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{name}_update AFTER UPDATE OF {key}, {col_list} ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def _exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+
+# Create the indexes and triggers; a new index is filled from its base table.
+# Returns False when this SQLite build has no FTS5 (callers fall back to LIKE).
+def create_search_index(conn):
+    try:
+        for name, spec in FTS_INDEXES.items():
+            is_new = not _exists(conn, name)
+            with conn:
+                for sql in _index_sql(name, spec):
+                    conn.execute(sql)
+                if is_new:
+                    conn.execute(f"INSERT INTO {name} ({name}) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e):
+            return False
+        raise
+    return True
+
+
+def _trigger_names(conn):
+    names = [f"trg_{name}_{op}" for name in FTS_INDEXES for op in ("insert", "delete", "update")]
+    return [name for name in names if _exists(conn, name)]
+
+
+# Re-index every row of the base tables in one pass
+def rebuild_search_index(conn):
+    with conn:
+        for name in FTS_INDEXES:
+            if _exists(conn, name):
+                conn.execute(f"INSERT INTO {name} ({name}) VALUES ('rebuild')")
+
+
+# Full reloads: drop the per-row sync triggers, then one 'rebuild' at the end
+@contextmanager
+def fts_paused(conn):
+    names = _trigger_names(conn)
+    if names:
+        with conn:
+            for name in names:
+                conn.execute(f"DROP TRIGGER {name}")
+    try:
+        yield
+    finally:
+        if names:
+            create_search_index(conn)
+            rebuild_search_index(conn)
+
+
+# Add rows of `table` with the given keys to its FTS indexes, in the caller's
+# transaction (bulk loads that skip the per-row insert triggers)
+def index_rows(conn, table, keys):
+    for name, spec in FTS_INDEXES.items():
+        if spec["table"] != table or not _exists(conn, name):
+            continue
+        col_list = ", ".join(spec["columns"])
+        conn.execute(
+            f"INSERT INTO {name} (rowid, {col_list}) SELECT {spec['key']}, {col_list} FROM {table} "
+            f"WHERE {spec['key']} IN (SELECT value FROM json_each(?))",
+            (json.dumps([int(k) for k in keys]),),
+        )
+
+
+# User text -> FTS5 query: every word must match as a prefix ("sou mum" -> soup in Mumbai)
+def fts_query(text):
+    terms = re.findall(r"\w+", text or "")
+    if not terms:
+        return None
+    return " ".join('"' + t + '"*' for t in terms)
+
+
+def _search(conn, name, columns, text, limit, offset):
+    spec = FTS_INDEXES[name]
+    match = fts_query(text)
+    if match is None:
+        return pd.DataFrame(columns=columns), 0
+    sql = (f"SELECT {', '.join('t.' + c for c in columns)} FROM {name} "
+           f"JOIN {spec['table']} t ON t.{spec['key']} = {name}.rowid "
+           f"WHERE {name} MATCH ? ORDER BY bm25({name}) LIMIT ? OFFSET ?")
+    df = pd.read_sql_query(sql, conn, params=[match, limit, offset])
+    total = conn.execute(f"SELECT COUNT(*) FROM {name} WHERE {name} MATCH ?", (match,)).fetchone()[0]
+    return df, total
+
+
+LISTING_COLUMNS = ["Food_ID", "Food_Name", "Quantity", "Expiry_Date", "Provider_ID",
+                   "Provider_Type", "Location", "Food_Type", "Meal_Type"]
+PROVIDER_COLUMNS = ["Provider_ID", "Name", "Type", "City", "Contact"]
+
+
+# Ranked listing search; returns (page DataFrame, total matches)
+def search_listings(conn, text, limit=50, offset=0):
+    return _search(conn, "listings_fts", LISTING_COLUMNS, text, limit, offset)
+
+
+# Ranked provider search by name or city; returns (page DataFrame, total matches)
+def search_providers(conn, text, limit=50, offset=0):
+    return _search(conn, "providers_fts", PROVIDER_COLUMNS, text, limit, offset)
@@ -1,462 +1,521 @@
-
-
-import streamlit as st
-import pandas as pd
-import sqlite3
-import os
-from io import BytesIO
-from datetime import datetime
-
-st.set_page_config(page_title="Local Food Waste Dashboard", layout="wide")
-
-BASE_PATH = os.path.expanduser(r"C:/Users/Shweta/OneDrive/Desktop/local-food-waste")
-DB_PATH = os.path.join(BASE_PATH, "food_waste.db")
-
-# Utility: ensure DB exists and tables loaded from CSVs
-@st.cache_resource
-def init_db(load_csv=True):
-    # Create DB folder if needed
-    os.makedirs(BASE_PATH, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    if load_csv:
-        # load CSVs if present
-        try:
-            providers_fp = os.path.join(BASE_PATH, "providers_data.csv")
-            receivers_fp = os.path.join(BASE_PATH, "receivers_data.csv")
-            listings_fp = os.path.join(BASE_PATH, "food_listings_data.csv")
-            claims_fp = os.path.join(BASE_PATH, "claims_data.csv")
-            if os.path.exists(providers_fp):
-                pd.read_csv(providers_fp).to_sql("providers", conn, if_exists="replace", index=False)
-            if os.path.exists(receivers_fp):
-                pd.read_csv(receivers_fp).to_sql("receivers", conn, if_exists="replace", index=False)
-            if os.path.exists(listings_fp):
-                pd.read_csv(listings_fp).to_sql("food_listings", conn, if_exists="replace", index=False)
-            if os.path.exists(claims_fp):
-                pd.read_csv(claims_fp).to_sql("claims", conn, if_exists="replace", index=False)
-        except Exception as e:
-            st.error(f"Error loading CSVs: {e}")
-    return conn
-
-conn = init_db(load_csv=True)
-
-# Helper to read tables
-@st.cache_data
-def read_table(table):
-    return pd.read_sql_query(f"SELECT * FROM {table}", conn)
-
-# Helper to run query and return df
-def run_sql(query):
-    return pd.read_sql_query(query, conn)
-
-# CRUD helpers
-def insert_row(table, row_dict):
-    cols = ", ".join(row_dict.keys())
-    placeholders = ", ".join(["?" for _ in row_dict])
-    vals = tuple(row_dict.values())
-    sql = f"INSERT INTO {table} ({cols}) VALUES ({placeholders})"
-    cur = conn.cursor()
-    cur.execute(sql, vals)
-    conn.commit()
-    return cur.lastrowid
-
-def update_row(table, pk_col, pk_val, update_dict):
-    set_clause = ", ".join([f"{k} = ?" for k in update_dict.keys()])
-    vals = tuple(update_dict.values()) + (pk_val,)
-    sql = f"UPDATE {table} SET {set_clause} WHERE {pk_col} = ?"
-    conn.execute(sql, vals)
-    conn.commit()
-
-def delete_row(table, pk_col, pk_val):
-    sql = f"DELETE FROM {table} WHERE {pk_col} = ?"
-    conn.execute(sql, (pk_val,))
-    conn.commit()
-
-# Queries dictionary (15 queries adjusted to your column names)
-QUERIES = {
-    "Q1_Providers_and_Receivers_per_City": """
-        SELECT City,
-               (SELECT COUNT(*) FROM providers p2 WHERE p2.City = City) AS Provider_Count,
-               (SELECT COUNT(*) FROM receivers r2 WHERE r2.City = City) AS Receiver_Count
-        FROM (
-            SELECT City FROM providers
-            UNION
-            SELECT City FROM receivers
-        ) as cities
-        GROUP BY City
-    """,
-
-    "Q2_Most_common_provider_type": """
-        SELECT Type AS Provider_Type, COUNT(*) AS Count
-        FROM providers
-        GROUP BY Type
-        ORDER BY Count DESC
-        LIMIT 1
-    """,
-
-    "Q3_Provider_contacts_in_city": """
-        SELECT Name, Contact, Address
-        FROM providers
-        WHERE City = :city
-    """,
-
-    "Q4_Receivers_with_most_claims": """
-        SELECT r.Name AS ReceiverName, COUNT(c.Claim_ID) AS ClaimCount
-        FROM claims c
-        JOIN receivers r ON c.Receiver_ID = r.Receiver_ID
-        GROUP BY r.Receiver_ID
-        ORDER BY ClaimCount DESC
-    """,
-
-    "Q5_Total_quantity_available": """
-        SELECT SUM(Quantity) AS Total_Quantity
-        FROM food_listings
-    """,
-
-    "Q6_City_with_most_listings": """
-        SELECT Location AS City, COUNT(*) AS Listings_Count
-        FROM food_listings
-        GROUP BY Location
-        ORDER BY Listings_Count DESC
-        LIMIT 1
-    """,
-
-    "Q7_Most_common_food_types": """
-        SELECT Food_Type, COUNT(*) AS Count
-        FROM food_listings
-        GROUP BY Food_Type
-        ORDER BY Count DESC
-    """,
-
-    "Q8_Claims_per_food_item": """
-        SELECT f.Food_Name, COUNT(c.Claim_ID) AS Claim_Count
-        FROM claims c
-        JOIN food_listings f ON c.Food_ID = f.Food_ID
-        GROUP BY f.Food_ID
-        ORDER BY Claim_Count DESC
-    """,
-
-    "Q9_Provider_with_highest_successful_claims": """
-        SELECT p.Name AS ProviderName, COUNT(c.Claim_ID) AS Successful_Claims
-        FROM claims c
-        JOIN food_listings f ON c.Food_ID = f.Food_ID
-        JOIN providers p ON f.Provider_ID = p.Provider_ID
-        WHERE c.Status = 'Completed'
-        GROUP BY p.Provider_ID
-        ORDER BY Successful_Claims DESC
-        LIMIT 1
-    """,
-
-    "Q10_Claim_status_percentages": """
-        SELECT Status, COUNT(*) * 100.0 / (SELECT COUNT(*) FROM claims) AS Percentage
-        FROM claims
-        GROUP BY Status
-    """,
-
-    "Q11_Avg_quantity_claimed_per_receiver": """
-        SELECT r.Name AS ReceiverName, AVG(f.Quantity) AS Avg_Quantity_Claimed
-        FROM claims c
-        JOIN receivers r ON c.Receiver_ID = r.Receiver_ID
-        JOIN food_listings f ON c.Food_ID = f.Food_ID
-        GROUP BY r.Receiver_ID
-    """,
-
-    "Q12_Most_claimed_meal_type": """
-        SELECT f.Meal_Type, COUNT(c.Claim_ID) AS ClaimCount
-        FROM claims c
-        JOIN food_listings f ON c.Food_ID = f.Food_ID
-        GROUP BY f.Meal_Type
-        ORDER BY ClaimCount DESC
-        LIMIT 1
-    """,
-
-    "Q13_Total_quantity_donated_by_provider": """
-        SELECT p.Name AS ProviderName, SUM(f.Quantity) AS Total_Donated
-        FROM food_listings f
-        JOIN providers p ON f.Provider_ID = p.Provider_ID
-        GROUP BY p.Provider_ID
-        ORDER BY Total_Donated DESC
-    """,
-
-    "Q14_Highest_demand_location_based_on_claims": """
-        SELECT f.Location AS City, COUNT(c.Claim_ID) AS Total_Claims
-        FROM claims c
-        JOIN food_listings f ON c.Food_ID = f.Food_ID
-        GROUP BY f.Location
-        ORDER BY Total_Claims DESC
-        LIMIT 1
-    """,
-
-    "Q15_Trends_in_wastage": """
-        SELECT Location,
-               SUM(Quantity) - IFNULL(SUM(claimed_count), 0) AS Wasted_Quantity
-        FROM (
-            SELECT f.Food_ID, f.Location, f.Quantity, COUNT(c.Claim_ID) AS claimed_count
-            FROM food_listings f
-            LEFT JOIN claims c ON f.Food_ID = c.Food_ID AND c.Status = 'Completed'
-            GROUP BY f.Food_ID
-        ) sub
-        GROUP BY Location
-        ORDER BY Wasted_Quantity DESC
-    """,
-}
-
-# Sidebar navigation
-st.sidebar.title("Navigation")
-page = st.sidebar.radio("Go to", ["Dashboard", "Manage Data", "Queries & Export", "About"])
-
-# Dashboard page
-if page == "Dashboard":
-    st.title("Local Food Waste Dashboard")
-    st.markdown("Use the sidebar to manage data, run queries, and export results.")
-
-    # Filters
-    st.sidebar.subheader("Filters for Food Listings")
-    providers_df = read_table("providers")
-    listings_df = read_table("food_listings")
-
-    city_options = ["All"] + sorted(listings_df['Location'].dropna().unique().tolist())
-    sel_city = st.sidebar.selectbox("Location", city_options)
-
-    provider_options = ["All"] + sorted(providers_df['Name'].dropna().unique().tolist())
-    sel_provider = st.sidebar.selectbox("Provider (Name)", provider_options)
-
-    food_type_options = ["All"] + sorted(listings_df['Food_Type'].dropna().unique().tolist())
-    sel_food_type = st.sidebar.selectbox("Food Type", food_type_options)
-
-    # Apply filters
-    df_display = listings_df.copy()
-    if sel_city != "All":
-        df_display = df_display[df_display['Location'] == sel_city]
-    if sel_provider != "All":
-        # join to get provider ID for chosen name
-        pid = providers_df[providers_df['Name'] == sel_provider]['Provider_ID'].iloc[0]
-        df_display = df_display[df_display['Provider_ID'] == pid]
-    if sel_food_type != "All":
-        df_display = df_display[df_display['Food_Type'] == sel_food_type]
-
-    st.subheader("Filtered Food Listings")
-    st.dataframe(df_display)
-
-    # Contact quick actions (provider + receivers)
-    st.subheader("Contact Providers in Filter")
-    providers_in_view = providers_df[providers_df['Provider_ID'].isin(df_display['Provider_ID'].unique())]
-    for _, row in providers_in_view.iterrows():
-        contact = row.get('Contact', '')
-        st.markdown(f"**{row['Name']}** — {row.get('Address','')} — {contact}  ")
-        if contact and '@' in str(contact):
-            st.markdown(f"[Email]({ 'mailto:' + contact })")
-        else:
-            st.markdown(f"Contact: {contact}")
-
-# Manage Data page for CRUD
-if page == "Manage Data":
-    st.title("Manage Data (CRUD)")
-    st.markdown("Add / Update / Delete records for Providers, Receivers, Listings, and Claims.")
-
-    tab = st.tabs(["Providers", "Receivers", "Listings", "Claims"])
-
-    # Providers tab
-    with tab[0]:
-        st.subheader("Providers")
-        df = read_table('providers')
-        st.dataframe(df)
-
-        with st.expander("Add Provider"):
-            with st.form("add_provider"):
-                name = st.text_input("Name")
-                ptype = st.text_input("Type")
-                address = st.text_input("Address")
-                city = st.text_input("City")
-                contact = st.text_input("Contact")
-                submitted = st.form_submit_button("Add")
-                if submitted:
-                    # infer new Provider_ID
-                    try:
-                        new_id = int(df['Provider_ID'].max()) + 1
-                    except Exception:
-                        new_id = 1
-                    insert_row('providers', {
-                        'Provider_ID': new_id,
-                        'Name': name,
-                        'Type': ptype,
-                        'Address': address,
-                        'City': city,
-                        'Contact': contact
-                    })
-                    st.success("Provider added. Refresh the page to see updates.")
-
-        with st.expander("Delete Provider"):
-            prov_options = df['Provider_ID'].astype(str).tolist()
-            sel = st.selectbox("Provider_ID to delete", options=prov_options)
-            if st.button("Delete Provider"):
-                delete_row('providers', 'Provider_ID', int(sel))
-                st.success("Deleted. Refresh to see updates.")
-
-    # Receivers tab
-    with tab[1]:
-        st.subheader("Receivers")
-        df = read_table('receivers')
-        st.dataframe(df)
-
-        with st.expander("Add Receiver"):
-            with st.form("add_receiver"):
-                name = st.text_input("Name")
-                rtype = st.text_input("Type")
-                city = st.text_input("City")
-                contact = st.text_input("Contact")
-                submitted = st.form_submit_button("Add")
-                if submitted:
-                    try:
-                        new_id = int(df['Receiver_ID'].max()) + 1
-                    except Exception:
-                        new_id = 1
-                    insert_row('receivers', {
-                        'Receiver_ID': new_id,
-                        'Name': name,
-                        'Type': rtype,
-                        'City': city,
-                        'Contact': contact
-                    })
-                    st.success("Receiver added. Refresh to see updates.")
-
-        with st.expander("Delete Receiver"):
-            rec_options = df['Receiver_ID'].astype(str).tolist()
-            sel = st.selectbox("Receiver_ID to delete", options=rec_options)
-            if st.button("Delete Receiver"):
-                delete_row('receivers', 'Receiver_ID', int(sel))
-                st.success("Deleted. Refresh to see updates.")
-
-    # Listings tab
-    with tab[2]:
-        st.subheader("Food Listings")
-        df = read_table('food_listings')
-        st.dataframe(df)
-
-        with st.expander("Add Listing"):
-            with st.form("add_listing"):
-                fname = st.text_input("Food_Name")
-                qty = st.number_input("Quantity", min_value=0, value=1)
-                expiry = st.date_input("Expiry_Date")
-                provider_id = st.selectbox("Provider_ID", options=providers_df['Provider_ID'].tolist())
-                provider_type = st.text_input("Provider_Type")
-                location = st.text_input("Location")
-                food_type = st.text_input("Food_Type")
-                meal_type = st.text_input("Meal_Type")
-                submitted = st.form_submit_button("Add")
-                if submitted:
-                    try:
-                        new_id = int(df['Food_ID'].max()) + 1
-                    except Exception:
-                        new_id = 1
-                    insert_row('food_listings', {
-                        'Food_ID': new_id,
-                        'Food_Name': fname,
-                        'Quantity': qty,
-                        'Expiry_Date': expiry.strftime('%Y-%m-%d'),
-                        'Provider_ID': int(provider_id),
-                        'Provider_Type': provider_type,
-                        'Location': location,
-                        'Food_Type': food_type,
-                        'Meal_Type': meal_type
-                    })
-                    st.success("Listing added. Refresh to see updates.")
-
-        with st.expander("Delete Listing"):
-            list_options = df['Food_ID'].astype(str).tolist()
-            sel = st.selectbox("Food_ID to delete", options=list_options)
-            if st.button("Delete Listing"):
-                delete_row('food_listings', 'Food_ID', int(sel))
-                st.success("Deleted. Refresh to see updates.")
-
-    # Claims tab
-    with tab[3]:
-        st.subheader("Claims")
-        df = read_table('claims')
-        st.dataframe(df)
-
-        with st.expander("Add Claim"):
-            with st.form("add_claim"):
-                food_id = st.selectbox("Food_ID", options=read_table('food_listings')['Food_ID'].tolist())
-                receiver_id = st.selectbox("Receiver_ID", options=read_table('receivers')['Receiver_ID'].tolist())
-                status = st.selectbox("Status", options=["Pending", "Completed", "Cancelled"]) 
-                submitted = st.form_submit_button("Add")
-                if submitted:
-                    try:
-                        new_id = int(df['Claim_ID'].max()) + 1
-                    except Exception:
-                        new_id = 1
-                    insert_row('claims', {
-                        'Claim_ID': new_id,
-                        'Food_ID': int(food_id),
-                        'Receiver_ID': int(receiver_id),
-                        'Status': status,
-                        'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                    st.success("Claim added. Refresh to see updates.")
-
-        with st.expander("Delete Claim"):
-            claim_options = df['Claim_ID'].astype(str).tolist()
-            sel = st.selectbox("Claim_ID to delete", options=claim_options)
-            if st.button("Delete Claim"):
-                delete_row('claims', 'Claim_ID', int(sel))
-                st.success("Deleted. Refresh to see updates.")
-
-# Queries & Export page
-if page == "Queries & Export":
-    st.title("Run Analysis Queries & Export Results")
-    st.markdown("Run the 15 predefined SQL queries, browse results, and download them as Excel files.")
-
-    # Run all queries and store results in-memory
-    results = {}
-    for name, sql in QUERIES.items():
-        if ':city' in sql:
-            # prompt for city when query needs parameter
-            city = st.text_input("Enter city for provider contacts (used by Q3)", value="Mumbai")
-            df = pd.read_sql_query(sql, conn, params={"city": city})
-        else:
-            df = pd.read_sql_query(sql, conn)
-        results[name] = df
-
-    # Show results with expanders and download buttons
-    for name, df in results.items():
-        with st.expander(name):
-            st.dataframe(df)
-            # prepare excel bytes
-            towrite = BytesIO()
-            df.to_excel(towrite, index=False, engine='openpyxl')
-            towrite.seek(0)
-            st.download_button(label=f"Download {name} as Excel", data=towrite, file_name=f"{name}.xlsx", mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-
-    # Bulk export all results into single workbook
-    if st.button("Download ALL queries as one workbook"):
-        combined = BytesIO()
-        with pd.ExcelWriter(combined, engine='openpyxl') as writer:
-            for name, df in results.items():
-                # sanitize sheet name length
-                sheet = name[:30]
-                df.to_excel(writer, sheet_name=sheet, index=False)
-        combined.seek(0)
-        st.download_button("Download workbook", data=combined, file_name="all_queries_results.xlsx", mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-
-# About page
-if page == "About":
-    st.title("About this Project")
-    st.markdown("""
-    **Local Food Waste Management** — Streamlit dashboard to analyze and manage donations.
-
-    Features implemented:
-    - Load CSV data into SQLite and show tables
-    - Filter food listings by Location, Provider, Food Type
-    - Contact providers (mailto link when contact contains '@')
-    - CRUD operations for Providers, Receivers, Food Listings, Claims (Add/Delete/Update via SQL)
-    - 15 predefined SQL queries with per-query download
-    - Bulk export all queries into one Excel workbook
-
-    Next improvements:
-    - Authentication for providers/receivers
-    - More advanced charts and time-series analysis
-    - Automated scheduled exports
-    """)
-
-# Ensure connection closed on exit
-# (Streamlit will keep the process alive; you can call conn.close() when needed)
+
+
+import streamlit as st
+import pandas as pd
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+from database import get_connection, get_writer, read_connection, create_tables
+from csv_sync import sync_all
+from versions import bump_version, db_version, table_version
+from query_builder import PAGE_SIZE, fetch_listings_page, distinct_values, page_count
+from bulk_import import VALIDATORS, read_batch, write_batch, make_report
+from exports import EXPORT_FORMATS, export_bytes, export_workbook
+from expiry import expiring_soon
+from matching import MAX_PER_RECEIVER, match_open_listings
+from geo import listing_point, load_city_coordinates, nearest_receivers
+from wastage import WASTAGE_DIMENSIONS, wastage_sql
+from query_catalog import ENTRY_POINTS, entry_queries, supported_filters
+from timeseries import DIMENSIONS, GRAINS, claims_series
+from profiling import SLOW_QUERY_MS, clear_profile, profile_frame, profile_summary
+
+st.set_page_config(page_title="Local Food Waste Dashboard", layout="wide")
+
+BASE_PATH = os.path.expanduser(r"C:/Users/Shweta/OneDrive/Desktop/local-food-waste")
+DB_PATH = os.path.join(BASE_PATH, "food_waste.db")
+
+# Utility: ensure DB exists and tables loaded from CSVs
+@st.cache_resource
+def init_db(load_csv=True):
+    # Create DB folder if needed
+    os.makedirs(BASE_PATH, exist_ok=True)
+    # typed tables with PKs / indexes (upgrading to_sql-created ones in place),
+    # trigger-maintained summaries behind the catalog queries, FTS5 index, write versions
+    create_tables(DB_PATH)
+    if load_csv:
+        # sync CSVs if present: unchanged files are skipped, changed ones upserted
+        conn = get_connection(DB_PATH)
+        try:
+            stats = sync_all(conn, BASE_PATH, verbose=False)
+            orphans = {r["table"]: r["orphans"] for r in stats if r.get("orphans")}
+            if orphans:
+                st.warning("Rows referencing missing parents were loaded anyway: "
+                           + ", ".join(f"{t}: {n}" for t, n in orphans.items()))
+            # extra offline geocoding for the R*Tree, if provided
+            coordinates_csv = os.path.join(BASE_PATH, "city_coordinates.csv")
+            if os.path.exists(coordinates_csv):
+                load_city_coordinates(conn, coordinates_csv)
+        except Exception as e:
+            st.error(f"Error loading CSVs: {e}")
+        finally:
+            conn.close()
+    # all sessions share one serialized writer (group commits); reads use
+    # a pool of query_only connections, so no connection is shared across threads
+    return get_writer(DB_PATH)
+
+writer = init_db(load_csv=True)
+
+def reader():
+    return read_connection(DB_PATH)
+
+# Helper to read tables. The cache is keyed on the table's write generation,
+# so a frame is reused until a CRUD helper (or CSV sync) modifies that table.
+@st.cache_data(max_entries=32)
+def _read_table_cached(table, generation):
+    with reader() as conn:
+        return pd.read_sql_query(f"SELECT * FROM {table}", conn)
+
+def read_table(table):
+    with reader() as conn:
+        generation = table_version(conn, table)
+    return _read_table_cached(table, generation)
+
+# Distinct values for a filter dropdown, cached like read_table
+@st.cache_data(max_entries=32)
+def _filter_options_cached(table, column, generation):
+    with reader() as conn:
+        return distinct_values(conn, table, column)
+
+def filter_options(table, column):
+    with reader() as conn:
+        generation = table_version(conn, table)
+    return _filter_options_cached(table, column, generation)
+
+# Helper to run query and return df
+def run_sql(query, params=None):
+    with reader() as conn:
+        return pd.read_sql_query(query, conn, params=params)
+
+# Cached query results keyed by SQL text, parameters and the DB write version;
+# any CRUD write bumps the version, so stale entries are never served
+@st.cache_data(max_entries=64)
+def run_cached(sql, params, version):
+    with reader() as conn:
+        return pd.read_sql_query(sql, conn, params=dict(params))
+
+# Export file bytes (xlsx / csv / parquet / arrow) streamed from the cursor,
+# cached with the same version key as run_cached
+@st.cache_data(max_entries=64)
+def export_cached(sql, params, version, fmt):
+    with reader() as conn:
+        return export_bytes(conn, sql, fmt, dict(params))
+
+# CRUD helpers. Each write runs as a job on the shared writer thread and
+# bumps the table's write version in the same transaction.
+def _insert(conn, table, row_dict):
+    cols = ", ".join(row_dict.keys())
+    placeholders = ", ".join(["?" for _ in row_dict])
+    vals = tuple(row_dict.values())
+    sql = f"INSERT INTO {table} ({cols}) VALUES ({placeholders})"
+    cur = conn.execute(sql, vals)
+    bump_version(conn, table)
+    return cur.lastrowid
+
+def _update(conn, table, pk_col, pk_val, update_dict):
+    set_clause = ", ".join([f"{k} = ?" for k in update_dict.keys()])
+    vals = tuple(update_dict.values()) + (pk_val,)
+    sql = f"UPDATE {table} SET {set_clause} WHERE {pk_col} = ?"
+    conn.execute(sql, vals)
+    bump_version(conn, table)
+
+def _delete(conn, table, pk_col, pk_val):
+    sql = f"DELETE FROM {table} WHERE {pk_col} = ?"
+    conn.execute(sql, (pk_val,))
+    bump_version(conn, table)
+
+def insert_row(table, row_dict):
+    return writer.run(_insert, table, row_dict)
+
+def update_row(table, pk_col, pk_val, update_dict):
+    writer.run(_update, table, pk_col, pk_val, update_dict)
+
+def delete_row(table, pk_col, pk_val):
+    writer.run(_delete, table, pk_col, pk_val)
+
+# Sidebar navigation
+st.sidebar.title("Navigation")
+page = st.sidebar.radio("Go to", ["Dashboard", "Expiring Soon", "Manage Data", "Queries & Export", "Query Profile", "About"])
+
+# Dashboard page
+if page == "Dashboard":
+    st.title("Local Food Waste Dashboard")
+    st.markdown("Use the sidebar to manage data, run queries, and export results.")
+
+    # Filters (dropdown values are DISTINCT lookups, cached per table generation)
+    st.sidebar.subheader("Filters for Food Listings")
+    city_options = ["All"] + filter_options("food_listings", "Location")
+    sel_city = st.sidebar.selectbox("Location", city_options)
+
+    provider_options = ["All"] + filter_options("providers", "Name")
+    sel_provider = st.sidebar.selectbox("Provider (Name)", provider_options)
+
+    food_type_options = ["All"] + filter_options("food_listings", "Food_Type")
+    sel_food_type = st.sidebar.selectbox("Food Type", food_type_options)
+
+    # Apply filters in SQL and fetch only the visible page
+    filters = {"location": sel_city, "provider_name": sel_provider, "food_type": sel_food_type}
+    page_no = st.number_input("Page", min_value=1, value=1)
+    with reader() as conn:
+        df_display, total = fetch_listings_page(conn, page=page_no, page_size=PAGE_SIZE, **filters)
+
+    st.subheader("Filtered Food Listings")
+    st.dataframe(df_display)
+    st.caption(f"{total} matching listings — page {page_no} of {page_count(total, PAGE_SIZE)}")
+
+    # Contact quick actions (provider + receivers)
+    st.subheader("Contact Providers in Filter")
+    page_provider_ids = [int(p) for p in df_display['Provider_ID'].dropna().unique()]
+    providers_in_view = run_sql(
+        f"SELECT * FROM providers WHERE Provider_ID IN ({', '.join('?' for _ in page_provider_ids)})",
+        page_provider_ids,
+    ) if page_provider_ids else pd.DataFrame(columns=['Name', 'Address', 'Contact'])
+    for _, row in providers_in_view.iterrows():
+        contact = row.get('Contact', '')
+        st.markdown(f"**{row['Name']}** — {row.get('Address','')} — {contact}  ")
+        if contact and '@' in str(contact):
+            st.markdown(f"[Email]({ 'mailto:' + contact })")
+        else:
+            st.markdown(f"Contact: {contact}")
+
+    # Wastage trend from the weekly rollup; keyed by write version and the
+    # hour, since listings expire as time passes without any write
+    st.subheader("Wastage Trend")
+    group_by = st.selectbox("Group wastage by", WASTAGE_DIMENSIONS)
+    with reader() as conn:
+        version = (db_version(conn), datetime.now().strftime('%Y-%m-%d %H'))
+    wastage = run_cached(wastage_sql((group_by,)), (), version)
+    chart = wastage.set_index(group_by)[["Claimed_Quantity", "Expired_Unclaimed_Quantity"]]
+    if group_by == "Week":
+        st.line_chart(chart)
+    else:
+        st.bar_chart(chart)
+    st.dataframe(wastage)
+
+    # Claims over time, read from the hourly / daily / monthly rollups
+    st.subheader("Claims Over Time")
+    col1, col2, col3, col4 = st.columns(4)
+    grain = col1.selectbox("Granularity", list(GRAINS), index=1)
+    split = col2.selectbox("Split by", ["None"] + list(DIMENSIONS))
+    window = col3.number_input("Moving average (buckets)", min_value=0, value=7)
+    dates = col4.date_input("Date range", value=())
+    start, end = (dates[0], dates[1]) if len(dates) == 2 else (None, None)
+    with reader() as conn:
+        series = claims_series(conn, grain, start, end, by=() if split == "None" else (split,),
+                               window=int(window) or None)
+    st.line_chart(series["Moving_Avg"] if window and split != "None" else series)
+
+# Expiring Soon page: unclaimed listings in expiry order, read from the
+# partial index on listing_expiry (not cached, so every poll is current)
+if page == "Expiring Soon":
+    st.title("Expiring Soon")
+    st.markdown("Unclaimed listings that have not expired yet, soonest first.")
+    limit = st.number_input("Listings to show", min_value=1, max_value=500, value=20)
+    hours = st.number_input("Within the next hours (0 = no limit)", min_value=0, value=72)
+    with reader() as conn:
+        feed = expiring_soon(conn, limit=int(limit), within=int(hours) * 3600 if hours else None)
+    st.dataframe(feed)
+    if st.button("Refresh"):
+        st.rerun()
+
+    # Nearest receivers to a listing (R*Tree search around its provider)
+    if not feed.empty:
+        food_id = st.selectbox("Nearest receivers for Food_ID", feed["Food_ID"].tolist())
+        k = st.number_input("Receivers to show", min_value=1, max_value=50, value=5)
+        with reader() as conn:
+            if listing_point(conn, int(food_id)) is None:
+                st.info("No coordinates for this listing's provider city or location. Add them to "
+                        "city_coordinates.csv (City, Latitude, Longitude) in the data folder.")
+            else:
+                st.dataframe(nearest_receivers(conn, int(food_id), int(k)))
+
+    # Suggested receivers for every open listing (same city, by food-type
+    # history, quantity fit and urgency); can be saved as Pending claims
+    st.subheader("Suggested Matches")
+    per_receiver = st.number_input("Max listings per receiver", min_value=1, value=MAX_PER_RECEIVER)
+    if st.button("Compute matches"):
+        with reader() as conn:
+            st.session_state["matches"] = match_open_listings(conn, max_per_receiver=int(per_receiver))
+    matches = st.session_state.get("matches")
+    if matches is not None:
+        st.caption(f"{len(matches)} listings matched")
+        st.dataframe(matches)
+        if len(matches) and st.button("Create Pending claims for these matches"):
+            claims = matches[["Food_ID", "Receiver_ID"]].assign(
+                Status="Pending", Timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            written = writer.run(write_batch, "claims", claims)
+            del st.session_state["matches"]
+            st.success(f"{written} claims created.")
+
+# Manage Data page for CRUD
+if page == "Manage Data":
+    st.title("Manage Data (CRUD)")
+    st.markdown("Add / Update / Delete records for Providers, Receivers, Listings, and Claims.")
+
+    # after a write: rerun so the tables below are re-read, then show the message
+    def done(message):
+        st.session_state["crud_message"] = message
+        st.rerun()
+
+    if "crud_message" in st.session_state:
+        st.success(st.session_state.pop("crud_message"))
+
+    tab = st.tabs(["Providers", "Receivers", "Listings", "Claims", "Bulk Import"])
+
+    # Providers tab
+    with tab[0]:
+        st.subheader("Providers")
+        df = read_table('providers')
+        st.dataframe(df)
+
+        with st.expander("Add Provider"):
+            with st.form("add_provider"):
+                name = st.text_input("Name")
+                ptype = st.text_input("Type")
+                address = st.text_input("Address")
+                city = st.text_input("City")
+                contact = st.text_input("Contact")
+                submitted = st.form_submit_button("Add")
+                if submitted:
+                    # the database assigns Provider_ID (AUTOINCREMENT) and insert_row returns it
+                    new_id = insert_row('providers', {
+                        'Name': name,
+                        'Type': ptype,
+                        'Address': address,
+                        'City': city,
+                        'Contact': contact
+                    })
+                    done(f"Provider {new_id} added.")
+
+        with st.expander("Delete Provider"):
+            prov_options = df['Provider_ID'].astype(str).tolist()
+            sel = st.selectbox("Provider_ID to delete", options=prov_options)
+            if st.button("Delete Provider"):
+                try:
+                    delete_row('providers', 'Provider_ID', int(sel))
+                    done("Deleted.")
+                except sqlite3.IntegrityError:
+                    st.error(f"Provider {sel} still has food listings; delete those first.")
+
+    # Receivers tab
+    with tab[1]:
+        st.subheader("Receivers")
+        df = read_table('receivers')
+        st.dataframe(df)
+
+        with st.expander("Add Receiver"):
+            with st.form("add_receiver"):
+                name = st.text_input("Name")
+                rtype = st.text_input("Type")
+                city = st.text_input("City")
+                contact = st.text_input("Contact")
+                submitted = st.form_submit_button("Add")
+                if submitted:
+                    # the database assigns Receiver_ID (AUTOINCREMENT) and insert_row returns it
+                    new_id = insert_row('receivers', {
+                        'Name': name,
+                        'Type': rtype,
+                        'City': city,
+                        'Contact': contact
+                    })
+                    done(f"Receiver {new_id} added.")
+
+        with st.expander("Delete Receiver"):
+            rec_options = df['Receiver_ID'].astype(str).tolist()
+            sel = st.selectbox("Receiver_ID to delete", options=rec_options)
+            if st.button("Delete Receiver"):
+                try:
+                    delete_row('receivers', 'Receiver_ID', int(sel))
+                    done("Deleted.")
+                except sqlite3.IntegrityError:
+                    st.error(f"Receiver {sel} still has claims; delete those first.")
+
+    # Listings tab
+    with tab[2]:
+        st.subheader("Food Listings")
+        df = read_table('food_listings')
+        st.dataframe(df)
+
+        with st.expander("Add Listing"):
+            with st.form("add_listing"):
+                fname = st.text_input("Food_Name")
+                qty = st.number_input("Quantity", min_value=0, value=1)
+                expiry = st.date_input("Expiry_Date")
+                provider_id = st.selectbox("Provider_ID", options=read_table('providers')['Provider_ID'].tolist())
+                provider_type = st.text_input("Provider_Type")
+                location = st.text_input("Location")
+                food_type = st.text_input("Food_Type")
+                meal_type = st.text_input("Meal_Type")
+                submitted = st.form_submit_button("Add")
+                if submitted:
+                    # the database assigns Food_ID (AUTOINCREMENT) and insert_row returns it
+                    new_id = insert_row('food_listings', {
+                        'Food_Name': fname,
+                        'Quantity': qty,
+                        'Expiry_Date': expiry.strftime('%Y-%m-%d'),
+                        'Provider_ID': int(provider_id),
+                        'Provider_Type': provider_type,
+                        'Location': location,
+                        'Food_Type': food_type,
+                        'Meal_Type': meal_type
+                    })
+                    done(f"Listing {new_id} added.")
+
+        with st.expander("Delete Listing"):
+            list_options = df['Food_ID'].astype(str).tolist()
+            sel = st.selectbox("Food_ID to delete", options=list_options)
+            if st.button("Delete Listing"):
+                try:
+                    delete_row('food_listings', 'Food_ID', int(sel))
+                    done("Deleted.")
+                except sqlite3.IntegrityError:
+                    st.error(f"Listing {sel} still has claims; delete those first.")
+
+    # Claims tab
+    with tab[3]:
+        st.subheader("Claims")
+        df = read_table('claims')
+        st.dataframe(df)
+
+        with st.expander("Add Claim"):
+            with st.form("add_claim"):
+                food_id = st.selectbox("Food_ID", options=read_table('food_listings')['Food_ID'].tolist())
+                receiver_id = st.selectbox("Receiver_ID", options=read_table('receivers')['Receiver_ID'].tolist())
+                status = st.selectbox("Status", options=["Pending", "Completed", "Cancelled"]) 
+                submitted = st.form_submit_button("Add")
+                if submitted:
+                    # the database assigns Claim_ID (AUTOINCREMENT) and insert_row returns it
+                    new_id = insert_row('claims', {
+                        'Food_ID': int(food_id),
+                        'Receiver_ID': int(receiver_id),
+                        'Status': status,
+                        'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    })
+                    done(f"Claim {new_id} added.")
+
+        with st.expander("Delete Claim"):
+            claim_options = df['Claim_ID'].astype(str).tolist()
+            sel = st.selectbox("Claim_ID to delete", options=claim_options)
+            if st.button("Delete Claim"):
+                delete_row('claims', 'Claim_ID', int(sel))
+                done("Deleted.")
+
+    # Bulk Import tab: validate a whole CSV / Parquet file at once, write the
+    # accepted rows in one writer transaction and report the rejected ones
+    with tab[4]:
+        st.subheader("Bulk Import")
+        st.markdown("Upload listings or claims. Rows with an existing ID are updated, rows without one are added.")
+        target = st.radio("Import into", ["Listings", "Claims"], horizontal=True)
+        table = {"Listings": "food_listings", "Claims": "claims"}[target]
+        upload = st.file_uploader("CSV or Parquet file", type=["csv", "parquet"])
+        if upload is not None and st.button("Import"):
+            started = datetime.now()
+            batch = read_batch(upload, upload.name)
+            with reader() as conn:
+                accepted, rejected = VALIDATORS[table](conn, batch)
+            written = writer.run(write_batch, table, accepted)
+            st.session_state["bulk_report"] = make_report(table, written, rejected,
+                                                          (datetime.now() - started).total_seconds())
+            done(f"Imported {written} rows into {table}.")
+
+        report = st.session_state.get("bulk_report")
+        if report:
+            st.write(f"{report['accepted']} accepted, {report['rejected']} rejected "
+                     f"({report['rows_per_sec']:,.0f} rows/sec)")
+            if report["rejected"]:
+                st.dataframe(report["rejected_rows"].head(1000))
+                st.download_button("Download rejected rows", data=report["rejected_rows"].to_csv(index=False),
+                                   file_name=f"{report['table']}_rejected.csv", mime="text/csv")
+
+# Queries & Export page
+if page == "Queries & Export":
+    st.title("Run Analysis Queries & Export Results")
+    st.markdown("Run the 15 predefined SQL queries, browse results, and download them as Excel, CSV, Parquet or Arrow files.")
+
+    # Queries run only when requested; results are cached per write version
+    with reader() as conn:
+        version = db_version(conn)
+    XLSX_MIME = EXPORT_FORMATS["xlsx"][1]
+    fmt = st.selectbox("Download format", list(EXPORT_FORMATS), format_func=str.upper)
+    ext, mime = EXPORT_FORMATS[fmt]
+
+    # Filters apply to every query that supports them; the catalog
+    # (query_catalog.py) renders one fixed statement per filter set. These
+    # queries read the summary tables, which keep no claim status / date
+    # split, so only city and the row limit are offered here.
+    c1, c2 = st.columns(2)
+    city = c1.text_input("City", value="", help="Q3 shows Mumbai when empty").strip() or None
+    limit = c2.number_input("Row limit (0 = no limit)", min_value=0, value=0, step=10)
+    queries = entry_queries("streamlit", city=city, limit=int(limit) or None)
+    names = {title: name for title, name, _ in ENTRY_POINTS["streamlit"]}
+    st.caption("City filters " + ", ".join(
+        title.split("_")[0] for title, name in names.items() if "city" in supported_filters(name)) + ".")
+
+    # Show results with expanders and download buttons
+    for title, (sql, params) in queries.items():
+        with st.expander(title):
+            st.caption("Filters: " + ", ".join(sorted(supported_filters(names[title])) + ["limit"]))
+            if not st.checkbox("Run query", key=f"run_{title}"):
+                continue
+            params = tuple(sorted(params.items()))
+            st.dataframe(run_cached(sql, params, version))
+            st.download_button(label=f"Download {title} as {fmt.upper()}", data=export_cached(sql, params, version, fmt), file_name=f"{title}.{ext}", mime=mime)
+
+    # Bulk export all results into single workbook: every sheet is streamed
+    # from its cursor into a write-only workbook spooled to a temp file
+    if st.button("Download ALL queries as one workbook"):
+        # sanitize sheet name length
+        sheets = [(title[:30], sql, params) for title, (sql, params) in queries.items()]
+        with tempfile.TemporaryFile() as spool:
+            with reader() as conn:
+                export_workbook(conn, sheets, spool)
+            spool.seek(0)
+            st.download_button("Download workbook", data=spool.read(), file_name="all_queries_results.xlsx", mime=XLSX_MIME)
+
+# Query Profile (admin) page: cost of every statement this server process
+# has run (cache hits run nothing), slowest statements with their plans
+if page == "Query Profile":
+    st.title("Query Profile")
+    st.markdown(f"Statements slower than {SLOW_QUERY_MS:g} ms get an `EXPLAIN QUERY PLAN`; "
+                "tables read without an index are listed under Full_Scans.")
+    records = profile_frame()
+    summary = profile_summary(records)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Statements run", len(records))
+    col2.metric("Slow", int(records["Slow"].sum()))
+    col3.metric("With full scans", int((records["Full_Scans"] != "").sum()))
+    if st.checkbox("Only slow statements"):
+        summary = summary[summary["Slow_Calls"] > 0]
+    st.subheader("Per statement (most total time first)")
+    st.dataframe(summary)
+    st.download_button("Download summary as CSV", data=summary.to_csv(index=False),
+                       file_name="query_profile_summary.csv", mime="text/csv")
+    st.subheader("Recent executions")
+    st.dataframe(records.head(500))
+    st.download_button("Download all executions as CSV", data=records.to_csv(index=False),
+                       file_name="query_profile.csv", mime="text/csv")
+    if st.button("Clear profile"):
+        clear_profile()
+        st.rerun()
+
+# About page
+if page == "About":
+    st.title("About this Project")
+    st.markdown("""
+    **Local Food Waste Management** — Streamlit dashboard to analyze and manage donations.
+
+    Features implemented:
+    - Load CSV data into SQLite and show tables
+    - Filter food listings by Location, Provider, Food Type
+    - Contact providers (mailto link when contact contains '@')
+    - CRUD operations for Providers, Receivers, Food Listings, Claims (Add/Delete/Update via SQL)
+    - 15 predefined SQL queries with per-query download
+    - Bulk export all queries into one Excel workbook
+
+    Next improvements:
+    - Authentication for providers/receivers
+    - More advanced charts and time-series analysis
+    - Automated scheduled exports
+    """)
+
+# Connections are pooled per process (database.py); nothing to close here
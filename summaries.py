@@ -0,0 +1,324 @@
+from contextlib import contextmanager
+
+# Materialized aggregates behind query_catalog.py. SQLite triggers keep
+# them current on every INSERT / UPDATE / DELETE (including insert_row,
+# update_row and delete_row), so each report reads a handful of summary rows
+# instead of re-aggregating the base tables.
+#
+# Text keys are stored as '' instead of NULL (a NULL primary key never
+# conflicts); the queries map '' back with NULLIF. Rows whose counts drop to
+# zero are kept and filtered out by the queries.
+SUMMARY_TABLES = {
+    # Q1
+    "city_counts": """
+        CREATE TABLE IF NOT EXISTS city_counts (
+            City           TEXT PRIMARY KEY,
+            Provider_Count INTEGER NOT NULL DEFAULT 0,
+            Receiver_Count INTEGER NOT NULL DEFAULT 0
+        )
+    """,
+    # Q2
+    "provider_type_counts": """
+        CREATE TABLE IF NOT EXISTS provider_type_counts (
+            Type  TEXT PRIMARY KEY,
+            Count INTEGER NOT NULL DEFAULT 0
+        )
+    """,
+    # Q5, Q6, Q14, Q15
+    "location_stats": """
+        CREATE TABLE IF NOT EXISTS location_stats (
+            Location         TEXT PRIMARY KEY,
+            Listings_Count   INTEGER NOT NULL DEFAULT 0,
+            Total_Quantity   INTEGER NOT NULL DEFAULT 0,
+            Claim_Count      INTEGER NOT NULL DEFAULT 0,
+            Completed_Claims INTEGER NOT NULL DEFAULT 0
+        )
+    """,
+    # Q7
+    "food_type_counts": """
+        CREATE TABLE IF NOT EXISTS food_type_counts (
+            Food_Type TEXT PRIMARY KEY,
+            Count     INTEGER NOT NULL DEFAULT 0
+        )
+    """,
+    # Q8 (and the claim counts the listing triggers need)
+    "food_claim_counts": """
+        CREATE TABLE IF NOT EXISTS food_claim_counts (
+            Food_ID          INTEGER PRIMARY KEY,
+            Claim_Count      INTEGER NOT NULL DEFAULT 0,
+            Completed_Claims INTEGER NOT NULL DEFAULT 0
+        )
+    """,
+    # Q9, Q13
+    "provider_stats": """
+        CREATE TABLE IF NOT EXISTS provider_stats (
+            Provider_ID       INTEGER PRIMARY KEY,
+            Listings_Count    INTEGER NOT NULL DEFAULT 0,
+            Total_Donated     INTEGER NOT NULL DEFAULT 0,
+            Successful_Claims INTEGER NOT NULL DEFAULT 0
+        )
+    """,
+    # Q10
+    "claim_status_counts": """
+        CREATE TABLE IF NOT EXISTS claim_status_counts (
+            Status TEXT PRIMARY KEY,
+            Count  INTEGER NOT NULL DEFAULT 0
+        )
+    """,
+    # Q4, Q11 (Matched_Claims = claims whose Food_ID exists in food_listings)
+    "receiver_claim_stats": """
+        CREATE TABLE IF NOT EXISTS receiver_claim_stats (
+            Receiver_ID    INTEGER PRIMARY KEY,
+            Claim_Count    INTEGER NOT NULL DEFAULT 0,
+            Matched_Claims INTEGER NOT NULL DEFAULT 0,
+            Quantity_Sum   INTEGER NOT NULL DEFAULT 0
+        )
+    """,
+    # Q12
+    "meal_type_claims": """
+        CREATE TABLE IF NOT EXISTS meal_type_claims (
+            Meal_Type   TEXT PRIMARY KEY,
+            Claim_Count INTEGER NOT NULL DEFAULT 0
+        )
+    """,
+}
+
+# Ordered reads for the "top N" reports
+SUMMARY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_location_stats_listings ON location_stats(Listings_Count)",
+    "CREATE INDEX IF NOT EXISTS idx_location_stats_claims ON location_stats(Claim_Count)",
+    "CREATE INDEX IF NOT EXISTS idx_receiver_claim_stats_count ON receiver_claim_stats(Claim_Count)",
+    "CREATE INDEX IF NOT EXISTS idx_provider_stats_donated ON provider_stats(Total_Donated)",
+    "CREATE INDEX IF NOT EXISTS idx_provider_stats_claims ON provider_stats(Successful_Claims)",
+]
+
+
+# INSERT ... ON CONFLICT that adds the selected values onto an existing summary row
+def _add(table, key, cols, select_sql):
+    updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in cols)
+    return (f"INSERT INTO {table} ({key}, {', '.join(cols)}) {select_sql} "
+            f"ON CONFLICT({key}) DO UPDATE SET {updates};")
+
+
+def _provider_delta(row, sign):
+    return [
+        _add("city_counts", "City", ["Provider_Count"],
+             f"SELECT IFNULL({row}.City, ''), {sign} WHERE true"),
+        _add("provider_type_counts", "Type", ["Count"],
+             f"SELECT IFNULL({row}.Type, ''), {sign} WHERE true"),
+    ]
+
+
+def _receiver_delta(row, sign):
+    return [
+        _add("city_counts", "City", ["Receiver_Count"],
+             f"SELECT IFNULL({row}.City, ''), {sign} WHERE true"),
+    ]
+
+
+# A listing's contribution, including the claims already made against it
+def _listing_delta(row, sign):
+    claims = f"IFNULL((SELECT Claim_Count FROM food_claim_counts WHERE Food_ID = {row}.Food_ID), 0)"
+    completed = f"IFNULL((SELECT Completed_Claims FROM food_claim_counts WHERE Food_ID = {row}.Food_ID), 0)"
+    qty = f"IFNULL({row}.Quantity, 0)"
+    per_receiver = f"(SELECT COUNT(*) FROM claims c WHERE c.Food_ID = {row}.Food_ID AND c.Receiver_ID = receiver_claim_stats.Receiver_ID)"
+    return [
+        _add("location_stats", "Location",
+             ["Listings_Count", "Total_Quantity", "Claim_Count", "Completed_Claims"],
+             f"SELECT IFNULL({row}.Location, ''), {sign}, {sign} * {qty}, "
+             f"{sign} * {claims}, {sign} * {completed} WHERE true"),
+        _add("food_type_counts", "Food_Type", ["Count"],
+             f"SELECT IFNULL({row}.Food_Type, ''), {sign} WHERE true"),
+        _add("provider_stats", "Provider_ID",
+             ["Listings_Count", "Total_Donated", "Successful_Claims"],
+             f"SELECT {row}.Provider_ID, {sign}, {sign} * {qty}, {sign} * {completed} "
+             f"WHERE {row}.Provider_ID IS NOT NULL"),
+        _add("meal_type_claims", "Meal_Type", ["Claim_Count"],
+             f"SELECT IFNULL({row}.Meal_Type, ''), {sign} * {claims} WHERE true"),
+        f"UPDATE receiver_claim_stats SET "
+        f"Matched_Claims = Matched_Claims + {sign} * {per_receiver}, "
+        f"Quantity_Sum = Quantity_Sum + {sign} * {qty} * {per_receiver} "
+        f"WHERE Receiver_ID IN (SELECT Receiver_ID FROM claims WHERE Food_ID = {row}.Food_ID);",
+    ]
+
+
+# A claim's contribution; listing-derived parts only apply if the listing exists
+def _claim_delta(row, sign):
+    completed = f"({row}.Status = 'Completed')"
+    listing = f"FROM food_listings f WHERE f.Food_ID = {row}.Food_ID"
+    return [
+        _add("food_claim_counts", "Food_ID", ["Claim_Count", "Completed_Claims"],
+             f"SELECT {row}.Food_ID, {sign}, {sign} * IFNULL({completed}, 0) "
+             f"WHERE {row}.Food_ID IS NOT NULL"),
+        _add("claim_status_counts", "Status", ["Count"],
+             f"SELECT IFNULL({row}.Status, ''), {sign} WHERE true"),
+        _add("receiver_claim_stats", "Receiver_ID",
+             ["Claim_Count", "Matched_Claims", "Quantity_Sum"],
+             f"SELECT {row}.Receiver_ID, {sign}, "
+             f"{sign} * EXISTS(SELECT 1 {listing}), "
+             f"{sign} * IFNULL((SELECT f.Quantity {listing}), 0) "
+             f"WHERE {row}.Receiver_ID IS NOT NULL"),
+        _add("location_stats", "Location", ["Claim_Count", "Completed_Claims"],
+             f"SELECT IFNULL(f.Location, ''), {sign}, {sign} * IFNULL({completed}, 0) {listing}"),
+        _add("meal_type_claims", "Meal_Type", ["Claim_Count"],
+             f"SELECT IFNULL(f.Meal_Type, ''), {sign} {listing}"),
+        _add("provider_stats", "Provider_ID", ["Successful_Claims"],
+             f"SELECT f.Provider_ID, {sign} * IFNULL({completed}, 0) {listing} "
+             f"AND f.Provider_ID IS NOT NULL"),
+    ]
+
+
+# table -> (delta builder, columns whose update changes the summaries)
+_DELTAS = {
+    "providers": (_provider_delta, "City, Type"),
+    "receivers": (_receiver_delta, "City"),
+    "food_listings": (_listing_delta, "Food_ID, Quantity, Provider_ID, Location, Food_Type, Meal_Type"),
+    "claims": (_claim_delta, "Food_ID, Receiver_ID, Status"),
+}
+
+
+def trigger_sql():
+    statements = []
+    for table, (delta, update_cols) in _DELTAS.items():
+        body = {
+            "insert": delta("NEW", 1),
+            "delete": delta("OLD", -1),
+            "update": delta("OLD", -1) + delta("NEW", 1),
+        }
+        for event, stmts in body.items():
+            on = f"UPDATE OF {update_cols}" if event == "update" else event.upper()
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS trg_summary_{table}_{event} "
+                f"AFTER {on} ON {table} BEGIN\n    " + "\n    ".join(stmts) + "\nEND"
+            )
+    return statements
+
+
+def trigger_names():
+    return [f"trg_summary_{t}_{e}" for t in _DELTAS for e in ("insert", "delete", "update")]
+
+
+# Set-based contributions of the listings (alias f) and claims (alias c)
+# matching `where`, added onto the summary rows: 'true' for a full rebuild,
+# or the rows of a bulk insert that skipped the triggers (summaries_delta_sql)
+def _listing_parts(where):
+    src = f"FROM food_listings f WHERE ({where})"
+    return [
+        _add("location_stats", "Location", ["Listings_Count", "Total_Quantity"],
+             f"SELECT IFNULL(f.Location, ''), COUNT(*), SUM(IFNULL(f.Quantity, 0)) {src} GROUP BY 1"),
+        _add("food_type_counts", "Food_Type", ["Count"],
+             f"SELECT IFNULL(f.Food_Type, ''), COUNT(*) {src} GROUP BY 1"),
+        _add("provider_stats", "Provider_ID", ["Listings_Count", "Total_Donated"],
+             f"SELECT f.Provider_ID, COUNT(*), SUM(IFNULL(f.Quantity, 0)) {src} "
+             f"AND f.Provider_ID IS NOT NULL GROUP BY 1"),
+        _add("meal_type_claims", "Meal_Type", ["Claim_Count"],
+             f"SELECT IFNULL(f.Meal_Type, ''), 0 {src} GROUP BY 1"),
+    ]
+
+
+def _claim_parts(where):
+    src = f"FROM claims c WHERE ({where})"
+    return [
+        _add("food_claim_counts", "Food_ID", ["Claim_Count", "Completed_Claims"],
+             f"SELECT c.Food_ID, COUNT(*), COUNT(CASE WHEN c.Status = 'Completed' THEN 1 END) {src} "
+             f"AND c.Food_ID IS NOT NULL GROUP BY 1"),
+        _add("claim_status_counts", "Status", ["Count"],
+             f"SELECT IFNULL(c.Status, ''), COUNT(*) {src} GROUP BY 1"),
+        _add("receiver_claim_stats", "Receiver_ID", ["Claim_Count"],
+             f"SELECT c.Receiver_ID, COUNT(*) {src} AND c.Receiver_ID IS NOT NULL GROUP BY 1"),
+    ]
+
+
+# Claims whose listing exists
+def _matched_parts(where):
+    src = f"FROM claims c JOIN food_listings f ON f.Food_ID = c.Food_ID WHERE ({where})"
+    completed = "COUNT(CASE WHEN c.Status = 'Completed' THEN 1 END)"
+    return [
+        _add("receiver_claim_stats", "Receiver_ID", ["Matched_Claims", "Quantity_Sum"],
+             f"SELECT c.Receiver_ID, COUNT(*), SUM(IFNULL(f.Quantity, 0)) {src} "
+             f"AND c.Receiver_ID IS NOT NULL GROUP BY 1"),
+        _add("location_stats", "Location", ["Claim_Count", "Completed_Claims"],
+             f"SELECT IFNULL(f.Location, ''), COUNT(*), {completed} {src} GROUP BY 1"),
+        _add("meal_type_claims", "Meal_Type", ["Claim_Count"],
+             f"SELECT IFNULL(f.Meal_Type, ''), COUNT(*) {src} GROUP BY 1"),
+        _add("provider_stats", "Provider_ID", ["Successful_Claims"],
+             f"SELECT f.Provider_ID, {completed} {src} AND f.Provider_ID IS NOT NULL GROUP BY 1"),
+    ]
+
+
+# Recompute every summary from the base tables (set-based, one pass per table)
+REBUILD_SQL = [
+    "DELETE FROM " + t for t in SUMMARY_TABLES
+] + [
+    """INSERT INTO city_counts (City, Provider_Count, Receiver_Count)
+       SELECT City, SUM(p), SUM(r) FROM (
+           SELECT IFNULL(City, '') AS City, 1 AS p, 0 AS r FROM providers
+           UNION ALL
+           SELECT IFNULL(City, ''), 0, 1 FROM receivers
+       ) GROUP BY City""",
+    """INSERT INTO provider_type_counts (Type, Count)
+       SELECT IFNULL(Type, ''), COUNT(*) FROM providers GROUP BY 1""",
+] + _listing_parts("true") + _claim_parts("true") + _matched_parts("true")
+
+
+# What the skipped insert triggers would have added for the `table` rows
+# whose IDs `ids` (a subquery) returns, one set-based statement per summary
+def summaries_delta_sql(table, ids):
+    if table == "food_listings":
+        where = f"f.Food_ID IN ({ids})"
+        return _listing_parts(where) + _matched_parts(where)
+    if table == "claims":
+        where = f"c.Claim_ID IN ({ids})"
+        return _claim_parts(where) + _matched_parts(where)
+    return []
+
+
+def summaries_installed(conn):
+    row = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_summary_%'"
+    ).fetchone()
+    return row[0] == len(trigger_names())
+
+
+# Recompute inside the caller's transaction (e.g. a WriteQueue job)
+def refresh_summaries(conn):
+    for sql in REBUILD_SQL:
+        conn.execute(sql)
+
+
+def rebuild_summaries(conn):
+    with conn:
+        refresh_summaries(conn)
+
+
+def drop_triggers(conn):
+    with conn:
+        for name in trigger_names():
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+# Create summary tables + triggers; backfill when the triggers were missing
+def create_summaries(conn):
+    installed = summaries_installed(conn)
+    with conn:
+        for ddl in SUMMARY_TABLES.values():
+            conn.execute(ddl)
+        for ddl in SUMMARY_INDEXES:
+            conn.execute(ddl)
+        for ddl in trigger_sql():
+            conn.execute(ddl)
+    if not installed:
+        rebuild_summaries(conn)
+
+
+# Bulk loads: drop the per-row triggers, then rebuild once at the end
+@contextmanager
+def paused(conn):
+    installed = summaries_installed(conn)
+    if installed:
+        drop_triggers(conn)
+    try:
+        yield
+    finally:
+        if installed:
+            create_summaries(conn)
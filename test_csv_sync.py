@@ -0,0 +1,68 @@
+import sqlite3
+import pandas as pd
+import pytest
+from csv_sync import sync_all
+from database import create_tables, get_connection, close_database
+from ingest import CSV_FILES
+from search_index import search_providers
+
+
+# Small CSV set with one claim pointing at a listing that doesn't exist
+def _write_csvs(folder, n=50):
+    ids = list(range(1, n + 1))
+    frames = {
+        "providers": pd.DataFrame({"Provider_ID": ids, "Name": [f"p{i}" for i in ids], "Type": "Restaurant",
+                                   "Address": "a", "City": "c", "Contact": "x"}),
+        "receivers": pd.DataFrame({"Receiver_ID": ids, "Name": [f"r{i}" for i in ids], "Type": "NGO",
+                                   "City": "c", "Contact": "y"}),
+        "food_listings": pd.DataFrame({"Food_ID": ids, "Food_Name": "Rice", "Quantity": 5,
+                                       "Expiry_Date": "2030-01-01", "Provider_ID": ids,
+                                       "Provider_Type": "Restaurant", "Location": "c",
+                                       "Food_Type": "Vegan", "Meal_Type": "Lunch"}),
+        "claims": pd.DataFrame({"Claim_ID": ids, "Food_ID": ids[:-1] + [999999], "Receiver_ID": ids,
+                                "Status": "Pending", "Timestamp": "2025-01-01 10:00:00"}),
+    }
+    for table, df in frames.items():
+        df.to_csv(folder / CSV_FILES[table], index=False)
+
+
+@pytest.mark.parametrize("full", [False, True])
+def test_sync_keeps_and_reports_orphans(tmp_path, capsys, full):
+    _write_csvs(tmp_path)
+    path = str(tmp_path / "food_waste.db")
+    create_tables(path)
+    conn = get_connection(path)
+    try:
+        stats = sync_all(conn, str(tmp_path), full=full)
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    finally:
+        conn.close()
+        close_database(path)
+    assert {r["table"]: r["orphans"] for r in stats}["claims"] == 1
+    assert "1 rows reference missing parents (claims: 1)" in capsys.readouterr().out
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0] == 50
+    conn.close()
+
+
+def test_full_reload_rebuilds_search_index(tmp_path):
+    _write_csvs(tmp_path)
+    path = str(tmp_path / "food_waste.db")
+    create_tables(path)
+    conn = get_connection(path)
+    try:
+        sync_all(conn, str(tmp_path), verbose=False)
+        providers = pd.read_csv(tmp_path / CSV_FILES["providers"])
+        providers.loc[0, "Name"] = "Zanzibar Kitchen"
+        providers.to_csv(tmp_path / CSV_FILES["providers"], index=False)
+        sync_all(conn, str(tmp_path), full=True, verbose=False)
+        assert search_providers(conn, "zanz")[1] == 1
+        assert 1 not in search_providers(conn, "p1")[0]["Provider_ID"].tolist()
+        conn.execute("INSERT INTO providers_fts (providers_fts, rank) VALUES ('integrity-check', 1)")
+        # the per-row triggers are back for the writes after the reload
+        with conn:
+            conn.execute("UPDATE providers SET Name = 'Quokka Cafe' WHERE Provider_ID = 2")
+        assert search_providers(conn, "quok")[1] == 1
+    finally:
+        conn.close()
+        close_database(path)
@@ -0,0 +1,57 @@
+import pandas as pd
+from csv_sync import sync_all
+from database import create_tables, get_connection, close_database
+from geo import city_point, create_geo_index, nearest_receivers, providers_near_city
+from ingest import CSV_FILES
+
+
+# Providers, receivers and listings in made-up cities, like the generated dataset
+def _write_csvs(folder):
+    pd.DataFrame({"Provider_ID": [1, 2, 3], "Name": ["a", "b", "c"], "Type": "Restaurant", "Address": "x",
+                  "City": ["New Jessica", "New Jessica", "Port Carlburgh"], "Contact": "x"}
+                 ).to_csv(folder / CSV_FILES["providers"], index=False)
+    pd.DataFrame({"Receiver_ID": [1, 2], "Name": ["r", "s"], "Type": "NGO",
+                  "City": ["Port Carlburgh", "New Jessica"], "Contact": "y"}
+                 ).to_csv(folder / CSV_FILES["receivers"], index=False)
+    pd.DataFrame({"Food_ID": [1], "Food_Name": "Rice", "Quantity": 5, "Expiry_Date": "2030-01-01",
+                  "Provider_ID": [1], "Provider_Type": "Restaurant", "Location": "New Jessica",
+                  "Food_Type": "Vegan", "Meal_Type": "Lunch"}
+                 ).to_csv(folder / CSV_FILES["food_listings"], index=False)
+
+
+def _load(folder):
+    path = str(folder / "food_waste.db")
+    create_tables(path)
+    conn = get_connection(path)
+    sync_all(conn, str(folder), verbose=False)
+    return path, conn
+
+
+def test_unknown_cities_have_no_point(tmp_path):
+    _write_csvs(tmp_path)
+    path, conn = _load(tmp_path)
+    try:
+        assert city_point(conn, "New Jessica") is None
+        assert providers_near_city(conn, "New Jessica", 50).empty
+    finally:
+        conn.close()
+        close_database(path)
+
+
+def test_coordinates_file_places_cities(tmp_path):
+    _write_csvs(tmp_path)
+    pd.DataFrame({"City": ["New Jessica", "Port Carlburgh"], "Latitude": [19.0, 19.1],
+                  "Longitude": [72.8, 72.9]}).to_csv(tmp_path / "city_coordinates.csv", index=False)
+    path, conn = _load(tmp_path)
+    try:
+        create_geo_index(conn, str(tmp_path))
+        assert city_point(conn, "New Jessica") == (19.0, 72.8)
+        near = providers_near_city(conn, "New Jessica", 5)
+        assert sorted(near["Provider_ID"]) == [1, 2]
+        assert sorted(providers_near_city(conn, "New Jessica", 50)["Provider_ID"]) == [1, 2, 3]
+        receivers = nearest_receivers(conn, 1, k=2)
+        assert receivers["Receiver_ID"].tolist() == [2, 1]
+        assert receivers["Distance_km"].iloc[0] == 0
+    finally:
+        conn.close()
+        close_database(path)
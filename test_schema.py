@@ -0,0 +1,72 @@
+import sqlite3
+import pandas as pd
+from database import create_tables, close_database
+from schema import COLUMNS
+
+
+# Pre-schema database as DataFrame.to_sql wrote it: no keys, no AUTOINCREMENT
+def _legacy_db(path, claims=200):
+    conn = sqlite3.connect(path)
+    pd.DataFrame({"Provider_ID": [1], "Name": ["p"], "Type": ["Restaurant"], "Address": ["a"],
+                  "City": ["c"], "Contact": ["x"]}).to_sql("providers", conn, index=False)
+    pd.DataFrame({"Receiver_ID": [1], "Name": ["r"], "Type": ["NGO"], "City": ["c"],
+                  "Contact": ["y"]}).to_sql("receivers", conn, index=False)
+    pd.DataFrame({"Food_ID": [1], "Food_Name": ["Rice"], "Quantity": [5], "Expiry_Date": ["2030-01-01"],
+                  "Provider_ID": [1], "Provider_Type": ["Restaurant"], "Location": ["c"],
+                  "Food_Type": ["Vegan"], "Meal_Type": ["Lunch"]}).to_sql("food_listings", conn, index=False)
+    ids = list(range(1, claims + 1))
+    pd.DataFrame({"Claim_ID": ids, "Food_ID": [1] * (claims - 1) + [999999], "Receiver_ID": [1] * claims,
+                  "Status": ["Pending"] * claims, "Timestamp": ["2025-01-01 10:00:00"] * claims}
+                 ).to_sql("claims", conn, index=False)
+    conn.close()
+
+
+def _count(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _tables(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+
+
+def test_migrate_keeps_orphan_rows(tmp_path, capsys):
+    path = str(tmp_path / "legacy.db")
+    _legacy_db(path)
+    try:
+        create_tables(path)
+    finally:
+        close_database(path)
+    assert _count(path, "claims") == 200
+    assert "claims_legacy" not in _tables(path)
+    assert "1 rows reference missing parents (claims: 1)" in capsys.readouterr().out
+
+
+def test_migrate_resumes_leftover_legacy_table(tmp_path):
+    path = str(tmp_path / "stranded.db")
+    _legacy_db(path)
+    # what an interrupted migration left behind: an empty typed table plus the old rows
+    conn = sqlite3.connect(path)
+    conn.execute("ALTER TABLE claims RENAME TO claims_legacy")
+    conn.execute("CREATE TABLE claims (Claim_ID INTEGER PRIMARY KEY AUTOINCREMENT, Food_ID INTEGER, "
+                 "Receiver_ID INTEGER, Status TEXT, Timestamp TEXT)")
+    conn.execute("INSERT INTO claims VALUES (1, 1, 1, 'Completed', '2025-02-01 10:00:00')")
+    conn.commit()
+    conn.close()
+    try:
+        create_tables(path)
+    finally:
+        close_database(path)
+    assert _count(path, "claims") == 200
+    assert "claims_legacy" not in _tables(path)
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT Status FROM claims WHERE Claim_ID = 1").fetchone()[0] == "Completed"
+    assert [c[1] for c in conn.execute("PRAGMA table_info(claims)")] == COLUMNS["claims"]
+    conn.close()
@@ -0,0 +1,216 @@
+from contextlib import contextmanager
+import pandas as pd
+
+# Claim counts pre-bucketed per (grain, bucket, status, city, food type).
+# City and Food_Type come from the claimed listing (Location / Food_Type);
+# claims whose listing is missing land under ''. Triggers on claims and
+# food_listings apply each write's delta, so a date-range query reads one
+# row per bucket instead of scanning claims.
+ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS claim_rollups (
+        Grain     TEXT NOT NULL,
+        Bucket    TEXT NOT NULL,
+        Status    TEXT NOT NULL,
+        City      TEXT NOT NULL,
+        Food_Type TEXT NOT NULL,
+        Claims    INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (Grain, Bucket, Status, City, Food_Type)
+    )
+"""
+
+# Bucket label per grain (sortable text, so ranges are plain comparisons),
+# the matching pandas frequency for filling gaps, and the Python format
+GRAINS = {
+    "hour": ("strftime('%Y-%m-%d %H:00', {ts})", "h", "%Y-%m-%d %H:00"),
+    "day": ("date({ts})", "D", "%Y-%m-%d"),
+    "month": ("strftime('%Y-%m', {ts})", "MS", "%Y-%m"),
+}
+
+DIMENSIONS = ("Status", "City", "Food_Type")
+
+_GRAIN_ROWS = " UNION ALL ".join(f"SELECT '{g}' AS Grain" for g in GRAINS)
+
+
+def _bucket_sql(ts):
+    cases = " ".join(f"WHEN '{g}' THEN {sql.format(ts=ts)}" for g, (sql, _, _) in GRAINS.items())
+    return f"IFNULL(CASE g.Grain {cases} END, '')"
+
+
+def _upsert(select):
+    return (f"INSERT INTO claim_rollups (Grain, Bucket, Status, City, Food_Type, Claims) {select} "
+            f"ON CONFLICT(Grain, Bucket, Status, City, Food_Type) DO UPDATE SET Claims = Claims + excluded.Claims;")
+
+
+# One claim row entering (+) / leaving (-) its buckets at every grain
+def _claim_delta(row, sign):
+    return _upsert(
+        f"SELECT g.Grain, {_bucket_sql(row + '.Timestamp')}, IFNULL({row}.Status, ''), "
+        f"IFNULL(f.Location, ''), IFNULL(f.Food_Type, ''), {sign}1 "
+        f"FROM ({_GRAIN_ROWS}) g LEFT JOIN food_listings f ON f.Food_ID = {row}.Food_ID WHERE true"
+    )
+
+
+# A listing row's claims moving from one (City, Food_Type) pair to another
+def _move_claims(row, source, target):
+    return " ".join(_upsert(
+        f"SELECT g.Grain, {_bucket_sql('c.Timestamp')}, IFNULL(c.Status, ''), {city}, {food_type}, {sign}COUNT(*) "
+        f"FROM ({_GRAIN_ROWS}) g JOIN claims c ON c.Food_ID = {row}.Food_ID GROUP BY 1, 2, 3"
+    ) for sign, (city, food_type) in (("-", source), ("", target)))
+
+
+# A listing appearing takes over its claims from ''; one disappearing hands them back
+def _listing_move(row, enter):
+    attrs = (f"IFNULL({row}.Location, '')", f"IFNULL({row}.Food_Type, '')")
+    missing = ("''", "''")
+    return _move_claims(row, missing, attrs) if enter else _move_claims(row, attrs, missing)
+
+
+def trigger_sql():
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_claim_rollups_claims_insert AFTER INSERT ON claims "
+        f"BEGIN {_claim_delta('new', '')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_claim_rollups_claims_delete AFTER DELETE ON claims "
+        f"BEGIN {_claim_delta('old', '-')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_claim_rollups_claims_update "
+        f"AFTER UPDATE OF Food_ID, Status, Timestamp ON claims "
+        f"BEGIN {_claim_delta('old', '-')} {_claim_delta('new', '')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_claim_rollups_food_listings_insert AFTER INSERT ON food_listings "
+        f"BEGIN {_listing_move('new', True)} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_claim_rollups_food_listings_delete AFTER DELETE ON food_listings "
+        f"BEGIN {_listing_move('old', False)} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_claim_rollups_food_listings_update "
+        f"AFTER UPDATE OF Food_ID, Location, Food_Type ON food_listings "
+        f"BEGIN {_listing_move('old', False)} {_listing_move('new', True)} END",
+    ]
+
+
+# Claims matching `where` entering (+) / leaving (-) their buckets at
+# (city, food_type), set-based; `join` LEFT JOIN keeps claims without a listing.
+# Claims are counted per hour first and every grain is cut from the hour
+# label, so each Timestamp is parsed once instead of once per grain.
+def _claim_rows(where, sign="", city="IFNULL(f.Location, '')", food_type="IFNULL(f.Food_Type, '')",
+                join="LEFT JOIN"):
+    hour = GRAINS["hour"][0].format(ts="c.Timestamp")
+    return _upsert(
+        f"SELECT g.Grain, {_bucket_sql('h.Hour')}, h.Status, h.City, h.Food_Type, {sign}SUM(h.Claims) "
+        f"FROM ({_GRAIN_ROWS}) g JOIN ("
+        f"SELECT {hour} AS Hour, IFNULL(c.Status, '') AS Status, {city} AS City, {food_type} AS Food_Type, "
+        f"COUNT(*) AS Claims FROM claims c {join} food_listings f ON f.Food_ID = c.Food_ID "
+        f"WHERE ({where}) GROUP BY 1, 2, 3, 4) h "
+        f"GROUP BY 1, 2, 3, 4, 5"
+    )
+
+
+REBUILD_SQL = [
+    "DELETE FROM claim_rollups",
+    _claim_rows("true"),
+]
+
+
+# What the skipped insert triggers would have added for the `table` rows
+# whose IDs `ids` (a subquery) returns
+def rollups_delta_sql(table, ids):
+    if table == "claims":
+        return [_claim_rows(f"c.Claim_ID IN ({ids})")]
+    if table == "food_listings":
+        # claims already pointing at the new listings move over from ''
+        where = f"f.Food_ID IN ({ids})"
+        return [_claim_rows(where, "-", "''", "''", "JOIN"), _claim_rows(where, join="JOIN")]
+    return []
+
+
+# Recompute inside the caller's transaction (bulk loads that skip the triggers)
+def refresh_rollups(conn):
+    for sql in REBUILD_SQL:
+        conn.execute(sql)
+
+
+def _trigger_names(conn):
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_claim_rollups_%'"
+    ).fetchall()
+    return [name for name, in rows]
+
+
+def _installed(conn):
+    return len(_trigger_names(conn)) == len(trigger_sql())
+
+
+# Create the table and triggers; backfill when triggers were missing
+def create_rollups(conn):
+    installed = _installed(conn)
+    with conn:
+        conn.execute(ROLLUP_DDL)
+        for ddl in trigger_sql():
+            conn.execute(ddl)
+        if not installed:
+            refresh_rollups(conn)
+
+
+# Bulk loads: drop the per-row triggers, then rebuild once at the end
+@contextmanager
+def rollups_paused(conn):
+    installed = _installed(conn)
+    if installed:
+        with conn:
+            for name in _trigger_names(conn):
+                conn.execute(f"DROP TRIGGER {name}")
+    try:
+        yield
+    finally:
+        if installed:
+            create_rollups(conn)
+
+
+# SQL + params for claim counts per bucket of `grain` between start and end
+# (inclusive, anything pandas can parse), filtered by status / city /
+# food_type and split by any of DIMENSIONS in `by`
+def series_sql(grain="day", start=None, end=None, status=None, city=None, food_type=None, by=()):
+    fmt = GRAINS[grain][2]
+    where, params = ["Grain = ?", "Bucket <> ''"], [grain]
+    if start is not None:
+        where.append("Bucket >= ?")
+        params.append(pd.Timestamp(start).strftime(fmt))
+    if end is not None:
+        where.append("Bucket <= ?")
+        params.append(pd.Timestamp(end).strftime(fmt))
+    for column, value in (("Status", status), ("City", city), ("Food_Type", food_type)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+    group = ", ".join(["Bucket"] + list(by))
+    sql = (f"SELECT {group}, SUM(Claims) AS Claims FROM claim_rollups "
+           f"WHERE {' AND '.join(where)} GROUP BY {group} HAVING SUM(Claims) <> 0 ORDER BY {group}")
+    return sql, params
+
+
+def _floor(ts, grain):
+    ts = pd.Timestamp(ts)
+    if grain == "month":
+        return ts.to_period("M").to_timestamp()
+    return ts.floor(GRAINS[grain][1])
+
+
+# Claims per bucket as a DataFrame indexed by bucket start (one column per
+# `by` combination when split), with empty buckets filled as 0 and, when
+# `window` is given, a moving average over that many buckets
+def claims_series(conn, grain="day", start=None, end=None, status=None, city=None, food_type=None,
+                  by=(), window=None):
+    sql, params = series_sql(grain, start, end, status, city, food_type, by)
+    df = pd.read_sql_query(sql, conn, params=params)
+    df["Bucket"] = pd.to_datetime(df["Bucket"], format=GRAINS[grain][2])
+    if by:
+        series = df.pivot_table(index="Bucket", columns=list(by), values="Claims", aggfunc="sum", fill_value=0)
+    else:
+        series = df.set_index("Bucket")[["Claims"]]
+    first = start if start is not None else (series.index.min() if not series.empty else None)
+    last = end if end is not None else (series.index.max() if not series.empty else None)
+    if first is not None and last is not None:
+        first, last = _floor(first, grain), _floor(last, grain)
+        series = series.reindex(pd.date_range(first, last, freq=GRAINS[grain][1], name="Bucket"), fill_value=0)
+    if window:
+        averages = series.rolling(window, min_periods=1).mean()
+        if by:
+            return pd.concat({"Claims": series, "Moving_Avg": averages}, axis=1)
+        series["Moving_Avg"] = averages["Claims"]
+    return series
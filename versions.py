@@ -0,0 +1,34 @@
+# Write-version counters. Every code path that modifies a table bumps its
+# counter in the same transaction; readers key their caches on the counters,
+# so a cache entry is rebuilt only after a write it could observe.
+VERSIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name TEXT PRIMARY KEY,
+        version    INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+
+def create_versions(conn):
+    with conn:
+        conn.execute(VERSIONS_DDL)
+
+
+# Call inside the writer's transaction (before its commit)
+def bump_version(conn, table):
+    conn.execute(
+        "INSERT INTO table_versions (table_name, version) VALUES (?, 1) "
+        "ON CONFLICT(table_name) DO UPDATE SET version = version + 1",
+        (table,),
+    )
+
+
+# Database-wide write version (changes after any write to any table)
+def db_version(conn):
+    return conn.execute("SELECT IFNULL(SUM(version), 0) FROM table_versions").fetchone()[0]
+
+
+# Generation of a single table (0 until its first tracked write)
+def table_version(conn, table):
+    row = conn.execute("SELECT version FROM table_versions WHERE table_name = ?", (table,)).fetchone()
+    return row[0] if row else 0
@@ -0,0 +1,210 @@
+from contextlib import contextmanager
+import pandas as pd
+from expiry import NOW_EPOCH_SQL, epoch_sql
+
+# Weekly wastage buckets: listings, quantity and claimed quantity per
+# (expiry week, Location, Provider_Type). A listing counts as claimed once
+# it has a Completed claim; its whole Quantity is then claimed. Triggers
+# apply each write's delta to the affected buckets only, like summaries.py.
+WASTAGE_DDL = """
+    CREATE TABLE IF NOT EXISTS wastage_weekly (
+        Week             TEXT NOT NULL,
+        Location         TEXT NOT NULL,
+        Provider_Type    TEXT NOT NULL,
+        Listings         INTEGER NOT NULL DEFAULT 0,
+        Total_Quantity   INTEGER NOT NULL DEFAULT 0,
+        Claimed_Quantity INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (Week, Location, Provider_Type)
+    )
+"""
+
+# Monday of the expiry week ('' when the listing has no expiry)
+def week_sql(expr):
+    return f"IFNULL(date({expr}, 'weekday 0', '-6 days'), '')"
+
+
+def _claimed(food_id):
+    return f"EXISTS (SELECT 1 FROM claims WHERE Food_ID = {food_id} AND Status = 'Completed')"
+
+
+def _upsert(select):
+    return (f"INSERT INTO wastage_weekly (Week, Location, Provider_Type, Listings, Total_Quantity, Claimed_Quantity) "
+            f"{select} ON CONFLICT(Week, Location, Provider_Type) DO UPDATE SET "
+            f"Listings = Listings + excluded.Listings, "
+            f"Total_Quantity = Total_Quantity + excluded.Total_Quantity, "
+            f"Claimed_Quantity = Claimed_Quantity + excluded.Claimed_Quantity;")
+
+
+# A listing row entering (+) / leaving (-) its bucket
+def _listing_delta(row, sign):
+    qty = f"IFNULL({row}.Quantity, 0)"
+    return _upsert(
+        f"SELECT {week_sql(row + '.Expiry_Date')}, IFNULL({row}.Location, ''), IFNULL({row}.Provider_Type, ''), "
+        f"{sign}1, {sign}{qty}, CASE WHEN {_claimed(row + '.Food_ID')} THEN {sign}{qty} ELSE 0 END WHERE true"
+    )
+
+
+# A listing becoming claimed (+) / unclaimed (-) when `condition` holds
+def _claimed_delta(food_id, sign, condition):
+    return _upsert(
+        f"SELECT {week_sql('f.Expiry_Date')}, IFNULL(f.Location, ''), IFNULL(f.Provider_Type, ''), "
+        f"0, 0, {sign}IFNULL(f.Quantity, 0) FROM food_listings f WHERE f.Food_ID = {food_id} AND {condition}"
+    )
+
+
+def _completed_count(food_id):
+    return f"(SELECT COUNT(*) FROM claims WHERE Food_ID = {food_id} AND Status = 'Completed')"
+
+
+def trigger_sql():
+    # first Completed claim on a listing claims it; removing the last one un-claims it
+    became_claimed = _claimed_delta(
+        "new.Food_ID", "",
+        f"new.Status = 'Completed' AND {_completed_count('new.Food_ID')} = 1")
+    became_unclaimed = _claimed_delta(
+        "old.Food_ID", "-",
+        f"old.Status = 'Completed' AND NOT {_claimed('old.Food_ID')}")
+    # an update that keeps the same Completed claim on the same listing changes nothing
+    update_claimed = _claimed_delta(
+        "new.Food_ID", "",
+        f"new.Status = 'Completed' AND {_completed_count('new.Food_ID')} = 1 "
+        f"AND NOT (old.Status = 'Completed' AND old.Food_ID IS new.Food_ID)")
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_wastage_food_listings_insert AFTER INSERT ON food_listings "
+        f"BEGIN {_listing_delta('new', '')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_wastage_food_listings_delete AFTER DELETE ON food_listings "
+        f"BEGIN {_listing_delta('old', '-')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_wastage_food_listings_update "
+        f"AFTER UPDATE OF Food_ID, Quantity, Expiry_Date, Location, Provider_Type ON food_listings "
+        f"BEGIN {_listing_delta('old', '-')} {_listing_delta('new', '')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_wastage_claims_insert AFTER INSERT ON claims "
+        f"BEGIN {became_claimed} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_wastage_claims_delete AFTER DELETE ON claims "
+        f"BEGIN {became_unclaimed} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_wastage_claims_update AFTER UPDATE OF Food_ID, Status ON claims "
+        f"BEGIN {became_unclaimed} {update_claimed} END",
+    ]
+
+
+# Buckets of the listings matching `where`, added onto wastage_weekly
+def _listing_rows(where):
+    return _upsert(
+        f"SELECT {week_sql('f.Expiry_Date')}, IFNULL(f.Location, ''), IFNULL(f.Provider_Type, ''), "
+        f"COUNT(*), SUM(IFNULL(f.Quantity, 0)), "
+        f"SUM(CASE WHEN {_claimed('f.Food_ID')} THEN IFNULL(f.Quantity, 0) ELSE 0 END) "
+        f"FROM food_listings f WHERE ({where}) GROUP BY 1, 2, 3"
+    )
+
+
+REBUILD_SQL = [
+    "DELETE FROM wastage_weekly",
+    _listing_rows("true"),
+]
+
+
+# What the skipped insert triggers would have added for the `table` rows
+# whose IDs `ids` (a subquery) returns
+def wastage_delta_sql(table, ids):
+    if table == "food_listings":
+        return [_listing_rows(f"f.Food_ID IN ({ids})")]
+    if table == "claims":
+        # listings whose first Completed claims are in the batch become claimed
+        return [_upsert(
+            f"SELECT {week_sql('f.Expiry_Date')}, IFNULL(f.Location, ''), IFNULL(f.Provider_Type, ''), "
+            f"0, 0, SUM(IFNULL(f.Quantity, 0)) FROM food_listings f "
+            f"WHERE f.Food_ID IN (SELECT Food_ID FROM claims WHERE Claim_ID IN ({ids}) AND Status = 'Completed') "
+            f"AND NOT EXISTS (SELECT 1 FROM claims c WHERE c.Food_ID = f.Food_ID AND c.Status = 'Completed' "
+            f"AND c.Claim_ID NOT IN ({ids})) GROUP BY 1, 2, 3"
+        )]
+    return []
+
+
+# Recompute inside the caller's transaction (bulk loads that skip the triggers)
+def refresh_wastage(conn):
+    for sql in REBUILD_SQL:
+        conn.execute(sql)
+
+
+def _trigger_names(conn):
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_wastage_%'"
+    ).fetchall()
+    return [name for name, in rows]
+
+
+def _installed(conn):
+    return len(_trigger_names(conn)) == len(trigger_sql())
+
+
+# Create the table and triggers; backfill when triggers were missing
+def create_wastage(conn):
+    installed = _installed(conn)
+    with conn:
+        conn.execute(WASTAGE_DDL)
+        for ddl in trigger_sql():
+            conn.execute(ddl)
+        if not installed:
+            refresh_wastage(conn)
+
+
+# Bulk loads: drop the per-row triggers, then rebuild once at the end
+@contextmanager
+def wastage_paused(conn):
+    installed = _installed(conn)
+    if installed:
+        with conn:
+            for name in _trigger_names(conn):
+                conn.execute(f"DROP TRIGGER {name}")
+    try:
+        yield
+    finally:
+        if installed:
+            create_wastage(conn)
+
+
+WASTAGE_DIMENSIONS = ("Week", "Location", "Provider_Type")
+
+
+# Claimed vs expired-unclaimed quantity grouped by any of WASTAGE_DIMENSIONS.
+# Unclaimed quantity in weeks that have ended is expired; in the current
+# week only listings already past their expiry count (read from the
+# listing_expiry index); later weeks are still open.
+def wastage_sql(group_by=("Week",)):
+    cols = ", ".join(f"NULLIF(b.{c}, '') AS {c}" for c in group_by)
+    keys = ", ".join(f"b.{c}" for c in group_by)
+    return f"""
+        WITH cur AS (
+            SELECT date('now', 'localtime', 'weekday 0', '-6 days') AS Week, {NOW_EPOCH_SQL} AS Now
+        ),
+        live AS (
+            SELECT IFNULL(f.Location, '') AS Location, IFNULL(f.Provider_Type, '') AS Provider_Type,
+                   SUM(IFNULL(f.Quantity, 0)) AS Expired
+            FROM cur, listing_expiry e JOIN food_listings f ON f.Food_ID = e.Food_ID
+            WHERE e.Expiry_Epoch >= {epoch_sql('cur.Week')} AND e.Expiry_Epoch < cur.Now
+              AND NOT {_claimed('f.Food_ID')}
+            GROUP BY 1, 2
+        ),
+        b AS (
+            SELECT w.*,
+                   CASE WHEN w.Week = '' THEN 0
+                        WHEN w.Week < cur.Week THEN w.Total_Quantity - w.Claimed_Quantity
+                        WHEN w.Week = cur.Week THEN IFNULL(l.Expired, 0)
+                        ELSE 0 END AS Expired_Unclaimed
+            FROM cur, wastage_weekly w
+            LEFT JOIN live l ON w.Week = cur.Week AND l.Location = w.Location AND l.Provider_Type = w.Provider_Type
+            WHERE w.Listings > 0
+        )
+        SELECT {cols},
+               SUM(b.Listings) AS Listings,
+               SUM(b.Total_Quantity) AS Total_Quantity,
+               SUM(b.Claimed_Quantity) AS Claimed_Quantity,
+               SUM(b.Expired_Unclaimed) AS Expired_Unclaimed_Quantity,
+               ROUND(SUM(b.Expired_Unclaimed) * 100.0 / NULLIF(SUM(b.Total_Quantity), 0), 2) AS Wasted_Percent
+        FROM b
+        GROUP BY {keys}
+        ORDER BY {keys}
+    """
+
+
+def wastage_report(conn, group_by=("Week",)):
+    return pd.read_sql_query(wastage_sql(group_by), conn)